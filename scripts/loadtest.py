@@ -0,0 +1,763 @@
+"""Teste de carga da API do webapp.
+
+Sobe o webapp/app.py contra substitutos locais do Redis e do PostgreSQL
+(ou serviços reais), dispara todas as rotas com concorrência configurável
+e mede vazão e latência p50/p95/p99 por rota. Falha (código de saída 1)
+quando o resultado piora além da tolerância em relação ao baseline gravado
+ou quando fica fora dos limites absolutos informados.
+
+Exemplos:
+    # Cache quente, 16 clientes por 30 s, comparando com o baseline
+    python scripts/loadtest.py run --scenario hot --concurrency 16 --duration 30
+
+    # Grava o resultado como novo baseline desta configuração
+    python scripts/loadtest.py run --scenario cold --save-baseline
+
+    # Quantos workers sustentam o pico? (gunicorn, L1 menor)
+    for w in 1 2 4; do
+        python scripts/loadtest.py run --server gunicorn --workers $w \\
+            --env L1_MAX_BYTES=8388608 --min-throughput 400 --max-p99-ms 250
+    done
+
+    # Servidor já em execução (ex.: docker compose)
+    python scripts/loadtest.py run --url http://localhost:5000
+
+O baseline de cada configuração fica em scripts/loadtest_baseline.json
+(medido numa máquina de desenvolvimento, para uso local). Latência e vazão
+absolutas só se comparam na mesma máquina: o estágio 'Teste de Carga' do
+Jenkinsfile usa um arquivo de baselines do próprio agente (--agent) e grava
+o baseline na primeira execução (--record-missing), só comparando a partir daí.
+
+Substitutos locais: redis-server, se estiver no PATH, ou o servidor TCP do
+fakeredis; para o PostgreSQL, um servidor mínimo do protocolo que aceita
+conexões e confirma comandos simples (o webapp só cria a tabela e testa a
+conexão no /health). Latências do /health não representam um banco real.
+"""
+
+import argparse
+import collections
+import csv
+import http.client
+import json
+import os
+import shutil
+import signal
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from datetime import datetime
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SCRIPTS_DIR)
+WEBAPP_DIR = os.path.join(ROOT_DIR, 'webapp')
+DEFAULT_DATASET = os.path.join(ROOT_DIR, 'crocodile_dataset.csv')
+DEFAULT_BASELINE = os.path.join(SCRIPTS_DIR, 'loadtest_baseline.json')
+
+PERCENTILES = [50, 95, 99]
+
+# Ambiente do servidor no teste; --env sobrescreve. Sem TRUSTED_PROXY_HOPS o
+# servidor ignora o X-Forwarded-For e todos os clientes dividem o balde do
+# rate limit de 127.0.0.1: por padrão ele fica alto demais para barrar alguém.
+# Para medir o rate limit por cliente: --env TRUSTED_PROXY_HOPS=1 --env
+# RATE_LIMIT_CAPACITY=60 (cada cliente passa a mandar seu X-Forwarded-For).
+SERVER_ENV = {
+    'RATE_LIMIT_CAPACITY': '1000000000',
+    'RATE_LIMIT_REFILL_PER_SEC': '1000000',
+}
+
+# Cenário frio: o L1 não admite nada e o Redis guarda cada resultado por 1 s;
+# com o Redis do teste esvaziado a cada COLD_FLUSH_INTERVAL, quase toda
+# requisição é uma falta do começo ao fim da medição
+COLD_ENV = {
+    'WARMUP_ON_STARTUP': '0',
+    'L1_MAX_BYTES': '0',
+    'CACHE_TTL': '1',
+    'CACHE_TTL_MIN': '1',
+    'CACHE_TTL_MAX': '1',
+    'CACHE_TTL_JITTER': '0',
+}
+COLD_FLUSH_INTERVAL = 0.05
+
+# Folga absoluta nas comparações de latência, para ruído em rotas de poucos ms
+LATENCY_SLACK_MS = 2.0
+
+# Um percentil só é comparado com o baseline se houver ao menos tantas amostras
+# acima dele (p99 de 100 requisições é só a maior latência, puro ruído)
+MIN_TAIL_SAMPLES = 10
+
+
+# ---------------------------------------------------------------------------
+# Substitutos locais do Redis e do PostgreSQL
+# ---------------------------------------------------------------------------
+
+def pg_message(kind, payload=b''):
+    return kind + struct.pack('!I', len(payload) + 4) + payload
+
+
+def pg_string(value):
+    return value.encode('utf-8') + b'\x00'
+
+
+class PostgresStandInHandler(socketserver.BaseRequestHandler):
+    """Protocolo do PostgreSQL só o suficiente para o psycopg2: autenticação
+    sem senha e confirmação de consultas simples (sem linhas de resultado)"""
+
+    PARAMETERS = {
+        'server_version': '15.0',
+        'server_encoding': 'UTF8',
+        'client_encoding': 'UTF8',
+        'DateStyle': 'ISO, MDY',
+        'integer_datetimes': 'on',
+        'standard_conforming_strings': 'on',
+    }
+
+    def read_exactly(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError
+            data += chunk
+        return data
+
+    def startup(self):
+        while True:
+            length, code = struct.unpack('!II', self.read_exactly(8))
+            self.read_exactly(length - 8)
+            # SSLRequest / GSSENCRequest: recusa e espera a mensagem de início
+            if code in (80877103, 80877104):
+                self.request.sendall(b'N')
+                continue
+            break
+        reply = pg_message(b'R', struct.pack('!I', 0))
+        for name, value in self.PARAMETERS.items():
+            reply += pg_message(b'S', pg_string(name) + pg_string(value))
+        reply += pg_message(b'K', struct.pack('!II', os.getpid(), 0))
+        self.request.sendall(reply + pg_message(b'Z', b'I'))
+
+    def handle(self):
+        try:
+            self.startup()
+            status = b'I'
+            while True:
+                kind = self.read_exactly(1)
+                length = struct.unpack('!I', self.read_exactly(4))[0]
+                body = self.read_exactly(length - 4)
+                if kind == b'X':
+                    return
+                if kind != b'Q':
+                    continue
+                words = body.rstrip(b'\x00').decode('utf-8').split()
+                command = ' '.join(words[:2]).upper() if words[:1] == ['CREATE'] else ' '.join(words[:1]).upper()
+                reply = b''
+                if command == 'SELECT':
+                    reply += pg_message(b'T', struct.pack('!H', 0))
+                    command = 'SELECT 0'
+                if command in ('BEGIN', 'START'):
+                    status = b'T'
+                elif command in ('COMMIT', 'ROLLBACK', 'END'):
+                    status = b'I'
+                reply += pg_message(b'C', pg_string(command)) if command else pg_message(b'I')
+                self.request.sendall(reply + pg_message(b'Z', status))
+        except (ConnectionError, OSError):
+            return
+
+
+class PostgresStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, PostgresStandInHandler)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve_standins(redis_port, postgres_port):
+    """Executa os substitutos no processo atual até receber SIGTERM"""
+    servers = []
+    if redis_port:
+        try:
+            from fakeredis import TcpFakeServer
+        except ImportError:
+            raise RuntimeError('Sem redis-server no PATH, o substituto do Redis requer o fakeredis '
+                               '(pip install fakeredis lupa)')
+        servers.append(TcpFakeServer(('127.0.0.1', redis_port)))
+    if postgres_port:
+        servers.append(PostgresStandIn(('127.0.0.1', postgres_port)))
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print('Substitutos prontos', flush=True)
+    while True:
+        time.sleep(3600)
+
+
+class Services:
+    """Processos iniciados pelo teste (substitutos e servidor), encerrados no fim"""
+
+    def __init__(self):
+        self.processes = []
+        self.logs = []
+
+    def spawn(self, name, command, env=None):
+        log = tempfile.NamedTemporaryFile('w+', prefix=f'loadtest-{name}-', suffix='.log', delete=False)
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, env=env, cwd=ROOT_DIR)
+        self.processes.append((name, process))
+        self.logs.append((name, log.name))
+        return process
+
+    def check(self):
+        for name, process in self.processes:
+            if process.poll() is not None:
+                raise RuntimeError(f'Processo {name} terminou (código {process.returncode}); veja o log em '
+                                   f'{dict(self.logs)[name]}')
+
+    def stop(self):
+        for _, process in reversed(self.processes):
+            if process.poll() is None:
+                process.terminate()
+        for _, process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def wait_for_port(services, port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        services.check()
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Porta {port} não respondeu em {timeout}s')
+
+
+def start_standins(services, args):
+    """Sobe os substitutos que não foram trocados por serviços reais; retorna (REDIS_URL, DATABASE_URL)"""
+    redis_url, database_url = args.redis_url, args.database_url
+    fake_redis_port = postgres_port = None
+    if not redis_url:
+        port = free_port()
+        redis_server = shutil.which('redis-server')
+        if redis_server:
+            services.spawn('redis', [redis_server, '--port', str(port), '--save', '', '--appendonly', 'no'])
+        else:
+            fake_redis_port = port
+        redis_url = f'redis://127.0.0.1:{port}'
+    if not database_url:
+        postgres_port = free_port()
+        database_url = f'postgresql://loadtest@127.0.0.1:{postgres_port}/loadtest'
+    if fake_redis_port or postgres_port:
+        services.spawn('substitutos', [sys.executable, __file__, 'standins',
+                                       '--redis-port', str(fake_redis_port or 0),
+                                       '--postgres-port', str(postgres_port or 0)])
+    if not args.redis_url:
+        wait_for_port(services, urllib.parse.urlsplit(redis_url).port, args.startup_timeout)
+    if postgres_port:
+        wait_for_port(services, postgres_port, args.startup_timeout)
+    return redis_url, database_url
+
+
+# ---------------------------------------------------------------------------
+# Servidor
+# ---------------------------------------------------------------------------
+
+def create_app():
+    """Fábrica usada pelo gunicorn e pelo modo serve: inicializa como o __main__ do app.py"""
+    if WEBAPP_DIR not in sys.path:
+        sys.path.insert(0, WEBAPP_DIR)
+    import app as webapp
+    webapp.init_db()
+    webapp.start_background_jobs()
+    return webapp.app
+
+
+def start_server(services, args, port, redis_url, database_url):
+    env = dict(os.environ)
+    env.update(SERVER_ENV)
+    env.update({
+        'REDIS_URL': redis_url,
+        'DATABASE_URL': database_url,
+        'DATASET_PATH': os.path.abspath(args.dataset),
+        'WARMUP_ON_STARTUP': '1',
+    })
+    if args.scenario == 'cold':
+        env.update(COLD_ENV)
+    env.update(args.env)
+    if args.server == 'gunicorn':
+        if shutil.which('gunicorn') is None:
+            raise RuntimeError('--server gunicorn requer o pacote gunicorn (pip install gunicorn)')
+        command = ['gunicorn', '--chdir', WEBAPP_DIR, '--pythonpath', SCRIPTS_DIR,
+                   '--workers', str(args.workers), '--threads', str(args.threads),
+                   '--bind', f'127.0.0.1:{port}', '--timeout', '120', 'loadtest:create_app()']
+    else:
+        command = [sys.executable, __file__, 'serve', '--port', str(port)]
+    services.spawn('webapp', command, env=env)
+
+
+def serve(port):
+    """Servidor de desenvolvimento do Flask, como no Dockerfile, mas sem debug/reloader"""
+    os.chdir(WEBAPP_DIR)
+    create_app().run(host='127.0.0.1', port=port, threaded=True)
+
+
+# ---------------------------------------------------------------------------
+# Requisições
+# ---------------------------------------------------------------------------
+
+Request = collections.namedtuple('Request', 'route method path body')
+
+
+def top_values(dataset, columns, count):
+    """Valores mais frequentes de cada coluna no dataset"""
+    counters = {column: collections.Counter() for column in columns}
+    with open(dataset, newline='', encoding='utf-8') as handle:
+        for row in csv.DictReader(handle):
+            for column in columns:
+                if row.get(column):
+                    counters[column][row[column]] += 1
+    return {column: [value for value, _ in counter.most_common(count)] for column, counter in counters.items()}
+
+
+def build_requests(dataset, variants):
+    """Mistura de requisições cobrindo todas as rotas.
+
+    Rotas com filtros recebem variants variações (espécies e países mais
+    frequentes), cada uma com sua própria chave de cache; no cenário frio
+    a primeira passada por cada variação é uma falta.
+    """
+    values = top_values(dataset, ['Common Name', 'Country/Region', 'Conservation Status'], variants)
+    species, countries = values['Common Name'], values['Country/Region']
+
+    def get(route, path, **params):
+        query = urllib.parse.urlencode(params)
+        return Request(route, 'GET', f'{path}?{query}' if query else path, None)
+
+    def post(route, path, body):
+        return Request(route, 'POST', path, json.dumps(body).encode('utf-8'))
+
+    requests = [
+        get('health', '/health'),
+        get('basic_info', '/api/basic-info'),
+        get('species_count', '/api/species-count'),
+        get('size_statistics', '/api/size-statistics'),
+        get('weight_statistics', '/api/weight-statistics'),
+        get('habitat_distribution', '/api/habitat-distribution'),
+        get('conservation_status', '/api/conservation-status'),
+        get('species_correlation', '/api/species-correlation'),
+        get('cache_stats', '/api/cache-stats'),
+        get('batch', '/api/batch'),
+        get('timeseries', '/api/timeseries', resolution='year'),
+        get('timeseries', '/api/timeseries', resolution='month', group_by='status'),
+        get('export', '/api/export', format='ndjson', limit=100),
+        post('predict_weight_post', '/api/predict-weight',
+             {'lengths': [round(0.5 + i * 0.05, 2) for i in range(100)]}),
+    ]
+    for name in species:
+        requests += [
+            get('batch', '/api/batch', reports='basic_info,species_count,size_statistics', species=name),
+            get('timeseries', '/api/timeseries', resolution='month', species=name),
+            get('export', '/api/export', format='csv', limit=100, species=name),
+            get('predict_weight', '/api/predict-weight', lengths='1.5,2.0,3.2', species=name),
+        ]
+    for name in countries:
+        requests += [
+            post('batch_post', '/api/batch', {'filters': {'country': name}}),
+            get('timeseries', '/api/timeseries', resolution='day', country=name),
+        ]
+    return requests
+
+
+def send(connection, request, headers):
+    """Envia a requisição e lê o corpo inteiro; retorna o status HTTP"""
+    request_headers = dict(headers)
+    if request.body is not None:
+        request_headers['Content-Type'] = 'application/json'
+    connection.request(request.method, request.path, body=request.body, headers=request_headers)
+    response = connection.getresponse()
+    response.read()
+    return response.status
+
+
+def client_ip(index):
+    return f'10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}'
+
+
+def client_headers(index, per_client_ip):
+    """Cabeçalhos do cliente; o X-Forwarded-For só conta com TRUSTED_PROXY_HOPS no servidor"""
+    return {'X-Forwarded-For': client_ip(index)} if per_client_ip else {}
+
+
+def run_load(host, port, requests, concurrency, duration, timeout, per_client_ip=False):
+    """Clientes em malha fechada por duration segundos.
+
+    Cada cliente tem sua conexão keep-alive (e, com per_client_ip, seu IP
+    no X-Forwarded-For) e percorre a mistura a partir de um ponto
+    diferente. Retorna (amostras por rota, segundos decorridos);
+    amostra = (latência em ms, status ou nome do erro).
+    """
+    samples = collections.defaultdict(list)
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + duration
+
+    def client(index):
+        connection = http.client.HTTPConnection(host, port, timeout=timeout)
+        headers = client_headers(index, per_client_ip)
+        local = collections.defaultdict(list)
+        position = index * len(requests) // concurrency
+        while time.perf_counter() < deadline:
+            request = requests[position % len(requests)]
+            position += 1
+            begin = time.perf_counter()
+            try:
+                status = send(connection, request, headers)
+            except (OSError, http.client.HTTPException) as e:
+                status = type(e).__name__
+                connection.close()
+            local[request.route].append(((time.perf_counter() - begin) * 1000, status))
+        connection.close()
+        with lock:
+            for route, values in local.items():
+                samples[route].extend(values)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def prime(host, port, requests, timeout, per_client_ip=False):
+    """Uma passada sequencial pela mistura para aquecer o cache"""
+    connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        for request in requests:
+            send(connection, request, client_headers(0, per_client_ip))
+    finally:
+        connection.close()
+
+
+def redis_flusher(redis_url, interval, stop):
+    """Esvazia o Redis do teste (FLUSHDB) a cada interval segundos até stop"""
+    parsed = urllib.parse.urlsplit(redis_url)
+    with socket.create_connection((parsed.hostname, parsed.port or 6379), timeout=5) as sock:
+        while not stop.wait(interval):
+            sock.sendall(b'*1\r\n$7\r\nFLUSHDB\r\n')
+            if not sock.recv(64).startswith(b'+OK'):
+                raise RuntimeError('FLUSHDB recusado pelo Redis do teste')
+
+
+def fetch_json(host, port, path, timeout):
+    connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        connection.request('GET', path)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read() or b'null')
+    finally:
+        connection.close()
+
+
+def wait_until_ready(services, host, port, require_warmup, timeout):
+    """Espera o /health responder (e, se pedido, o aquecimento do cache terminar)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        services.check()
+        try:
+            status, health = fetch_json(host, port, '/health', 5)
+            if status == 200 and health['status'] == 'ok' and (health['ready'] or not require_warmup):
+                return health
+        except (OSError, http.client.HTTPException, ValueError):
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f'Servidor não ficou pronto em {timeout}s')
+
+
+# ---------------------------------------------------------------------------
+# Estatísticas e baseline
+# ---------------------------------------------------------------------------
+
+def percentile(values, q):
+    """Percentil pelo posto mais próximo de uma lista ordenada"""
+    if not values:
+        return None
+    rank = max(1, -(-q * len(values) // 100))
+    return values[int(rank) - 1]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(latency for latency, _ in samples)
+    statuses = collections.Counter(str(status) for _, status in samples)
+    errors = sum(count for status, count in statuses.items() if not status.startswith('2'))
+    summary = {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'statuses': dict(sorted(statuses.items())),
+    }
+    for q in PERCENTILES:
+        value = percentile(latencies, q)
+        summary[f'p{q}_ms'] = round(value, 2) if value is not None else None
+    return summary
+
+
+def summarize_run(samples, elapsed):
+    everything = [sample for values in samples.values() for sample in values]
+    return {
+        'total': summarize(everything, elapsed),
+        'routes': {route: summarize(values, elapsed) for route, values in sorted(samples.items())},
+    }
+
+
+def compare(name, current, baseline, tolerance, max_error_rate):
+    """Regressões de uma rota (ou do total) em relação ao baseline"""
+    regressions = []
+    for q in PERCENTILES:
+        key = f'p{q}_ms'
+        if current.get(key) is None or baseline.get(key) is None:
+            continue
+        if min(current['requests'], baseline['requests']) * (100 - q) / 100 < MIN_TAIL_SAMPLES:
+            continue
+        limit = baseline[key] * (1 + tolerance) + LATENCY_SLACK_MS
+        if current[key] > limit:
+            regressions.append(f'{name}: {key} {current[key]:.2f} > {limit:.2f} (baseline {baseline[key]:.2f})')
+    limit = baseline['throughput_rps'] * (1 - tolerance)
+    if current['throughput_rps'] < limit:
+        regressions.append(f"{name}: vazão {current['throughput_rps']:.2f} req/s < {limit:.2f} "
+                           f"(baseline {baseline['throughput_rps']:.2f})")
+    limit = baseline['error_rate'] + max_error_rate
+    if current['error_rate'] > limit:
+        regressions.append(f"{name}: taxa de erro {current['error_rate']:.4f} > {limit:.4f} "
+                           f"(baseline {baseline['error_rate']:.4f})")
+    return regressions
+
+
+def compare_to_baseline(result, baseline, tolerance, max_error_rate):
+    regressions = compare('total', result['total'], baseline['total'], tolerance, max_error_rate)
+    for route, summary in result['routes'].items():
+        if route in baseline['routes']:
+            regressions += compare(route, summary, baseline['routes'][route], tolerance, max_error_rate)
+    return regressions
+
+
+def check_limits(result, args):
+    """Limites absolutos: o pico que a configuração precisa sustentar"""
+    total = result['total']
+    failures = []
+    if args.min_throughput is not None and total['throughput_rps'] < args.min_throughput:
+        failures.append(f"vazão {total['throughput_rps']:.2f} req/s abaixo do mínimo {args.min_throughput}")
+    if args.max_p99_ms is not None and total['p99_ms'] is not None and total['p99_ms'] > args.max_p99_ms:
+        failures.append(f"p99 {total['p99_ms']:.2f} ms acima do máximo {args.max_p99_ms}")
+    if total['error_rate'] > args.max_error_rate:
+        failures.append(f"taxa de erro {total['error_rate']:.4f} acima do máximo {args.max_error_rate}")
+    return failures
+
+
+def baseline_key(args):
+    if args.baseline_key:
+        return args.baseline_key
+    server = f'gunicorn-w{args.workers}-t{args.threads}' if args.server == 'gunicorn' else args.server
+    key = f'{args.scenario}-{server}-c{args.concurrency}'
+    # Um subconjunto de rotas tem outra mistura: não compara com o baseline completo
+    if args.routes:
+        key = f"{key}-{'+'.join(sorted(args.routes))}"
+    # Números absolutos só são comparáveis na mesma máquina
+    return f'{key}@{args.agent}' if args.agent else key
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def print_report(result, elapsed, cache_stats):
+    header = f"{'Rota':<24} {'Req':>7} {'Erros':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print('-' * len(header))
+    rows = list(result['routes'].items()) + [('TOTAL', result['total'])]
+    for route, summary in rows:
+        latencies = ''.join(f"{summary[f'p{q}_ms']:>10.2f}" for q in PERCENTILES)
+        print(f"{route:<24} {summary['requests']:>7} {summary['errors']:>6} {summary['throughput_rps']:>9.2f}{latencies}")
+    print(f"\nDuração: {elapsed:.1f}s | Status: {result['total']['statuses']}")
+    if cache_stats:
+        print(f"Cache (um worker): acerto geral {cache_stats.get('overall_hit_ratio')}, "
+              f"L1 {cache_stats['l1'].get('hit_ratio')}, L2 {cache_stats['l2'].get('hit_ratio')}")
+
+
+def run(args):
+    services = Services()
+    stop_flusher = threading.Event()
+    per_client_ip = int(args.env.get('TRUSTED_PROXY_HOPS', '0') or 0) > 0
+    try:
+        if args.url:
+            parsed = urllib.parse.urlsplit(args.url)
+            host, port = parsed.hostname, parsed.port or 80
+            if args.scenario == 'cold':
+                print('Aviso: com --url o cache do servidor pode já estar quente', file=sys.stderr)
+        else:
+            redis_url, database_url = start_standins(services, args)
+            host, port = '127.0.0.1', free_port()
+            start_server(services, args, port, redis_url, database_url)
+            if args.scenario == 'cold' and args.redis_url:
+                print('Aviso: com --redis-url o Redis não é esvaziado; só o TTL curto mantém o cache frio',
+                      file=sys.stderr)
+        print(f'Aguardando o servidor em {host}:{port}...')
+        wait_until_ready(services, host, port, args.scenario == 'hot' and not args.url, args.startup_timeout)
+
+        requests = build_requests(args.dataset, args.variants)
+        if args.routes:
+            requests = [request for request in requests if request.route in args.routes]
+            if not requests:
+                raise RuntimeError('Nenhuma rota selecionada')
+        if args.scenario == 'hot':
+            prime(host, port, requests, args.timeout, per_client_ip)
+        elif not args.url and not args.redis_url:
+            threading.Thread(target=redis_flusher, args=(redis_url, COLD_FLUSH_INTERVAL, stop_flusher),
+                             daemon=True).start()
+
+        print(f'Cenário {args.scenario}: {args.concurrency} clientes por {args.duration}s, '
+              f'{len(requests)} requisições distintas')
+        samples, elapsed = run_load(host, port, requests, args.concurrency, args.duration, args.timeout,
+                                    per_client_ip)
+        stop_flusher.set()
+        services.check()
+        result = summarize_run(samples, elapsed)
+        try:
+            cache_stats = fetch_json(host, port, '/api/cache-stats', args.timeout)[1]
+        except (OSError, http.client.HTTPException, ValueError):
+            cache_stats = None
+    finally:
+        stop_flusher.set()
+        services.stop()
+
+    print()
+    print_report(result, elapsed, cache_stats)
+
+    key = baseline_key(args)
+    record = {
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        'config': {
+            'scenario': args.scenario, 'server': args.server, 'workers': args.workers, 'threads': args.threads,
+            'concurrency': args.concurrency, 'duration': args.duration, 'variants': args.variants,
+            'routes': sorted(args.routes) if args.routes else None, 'env': args.env, 'url': args.url,
+        },
+        'total': result['total'],
+        'routes': result['routes'],
+        'cache_stats': cache_stats,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(record, handle, indent=2, ensure_ascii=False)
+
+    failures = check_limits(result, args)
+    baselines = load_baselines(args.baseline)
+    if args.save_baseline or (args.record_missing and key not in baselines):
+        baselines[key] = record
+        with open(args.baseline, 'w', encoding='utf-8') as handle:
+            json.dump(baselines, handle, indent=2, ensure_ascii=False, sort_keys=True)
+        print(f"\nBaseline '{key}' gravado em {args.baseline}")
+    elif key in baselines:
+        failures += compare_to_baseline(result, baselines[key], args.tolerance, args.max_error_rate)
+        print(f"\nComparado ao baseline '{key}' de {baselines[key]['recorded_at']} (tolerância {args.tolerance:.0%})")
+    else:
+        print(f"\nSem baseline '{key}' em {args.baseline}; use --save-baseline para gravar")
+
+    if failures:
+        print('\nFALHOU:')
+        for failure in failures:
+            print(f'  - {failure}')
+        return 1
+    print('OK')
+    return 0
+
+
+def parse_env(value):
+    name, sep, setting = value.partition('=')
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f'Use NOME=VALOR: {value}')
+    return name, setting
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga da API do webapp')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Executa o teste de carga')
+    run_parser.add_argument('--scenario', choices=['hot', 'cold'], default='hot',
+                            help='hot: cache aquecido antes da medição; cold: sem aquecimento, sem L1 e '
+                                 'Redis esvaziado durante toda a medição')
+    run_parser.add_argument('--concurrency', type=int, default=8, help='Clientes simultâneos')
+    run_parser.add_argument('--duration', type=float, default=20.0, help='Segundos de medição')
+    run_parser.add_argument('--timeout', type=float, default=30.0, help='Timeout de cada requisição (s)')
+    run_parser.add_argument('--variants', type=int, default=5,
+                            help='Variações de filtro (espécies/países) por rota filtrável')
+    run_parser.add_argument('--routes', type=lambda value: set(value.split(',')),
+                            help='Só estas rotas (ex.: batch,export)')
+    run_parser.add_argument('--server', choices=['flask', 'gunicorn'], default='flask',
+                            help='flask: servidor do app.py (como no Dockerfile); gunicorn: --workers/--threads')
+    run_parser.add_argument('--workers', type=int, default=1)
+    run_parser.add_argument('--threads', type=int, default=4)
+    run_parser.add_argument('--env', type=parse_env, action='append', default=[],
+                            help='Variável do servidor, ex.: --env L1_MAX_BYTES=8388608 (repetível)')
+    run_parser.add_argument('--url', help='Testa um servidor já em execução em vez de subir um')
+    run_parser.add_argument('--redis-url', help='Redis real em vez do substituto local')
+    run_parser.add_argument('--database-url', help='PostgreSQL real em vez do substituto local')
+    run_parser.add_argument('--dataset', default=DEFAULT_DATASET)
+    run_parser.add_argument('--startup-timeout', type=float, default=120.0)
+    run_parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Arquivo JSON de baselines')
+    run_parser.add_argument('--baseline-key', help='Nome do baseline (padrão: cenário, servidor e concorrência)')
+    run_parser.add_argument('--save-baseline', action='store_true', help='Grava o resultado como baseline')
+    run_parser.add_argument('--record-missing', action='store_true',
+                            help='Grava o resultado como baseline se ainda não houver um para a chave')
+    run_parser.add_argument('--agent', default=os.getenv('LOADTEST_AGENT'),
+                            help='Máquina do teste, acrescentada à chave do baseline (padrão: $LOADTEST_AGENT)')
+    run_parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Piora relativa aceita em latência e vazão (0.25 = 25%%)')
+    run_parser.add_argument('--max-error-rate', type=float, default=0.01,
+                            help='Taxa de erro máxima (e aumento máximo em relação ao baseline)')
+    run_parser.add_argument('--min-throughput', type=float, help='Vazão mínima exigida (req/s)')
+    run_parser.add_argument('--max-p99-ms', type=float, help='p99 máximo exigido (ms)')
+    run_parser.add_argument('--output', help='Grava o resultado completo em JSON')
+
+    serve_parser = commands.add_parser('serve', help='(interno) Sobe o webapp')
+    serve_parser.add_argument('--port', type=int, required=True)
+
+    standins_parser = commands.add_parser('standins', help='(interno) Sobe os substitutos locais')
+    standins_parser.add_argument('--redis-port', type=int, default=0)
+    standins_parser.add_argument('--postgres-port', type=int, default=0)
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        serve(args.port)
+    elif args.command == 'standins':
+        serve_standins(args.redis_port, args.postgres_port)
+    else:
+        args.env = dict(args.env)
+        try:
+            sys.exit(run(args))
+        except RuntimeError as e:
+            print(f'Erro: {e}', file=sys.stderr)
+            sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
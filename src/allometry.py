@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+
+
+SPECIES_COLUMN = 'Common Name'
+LENGTH_COLUMN = 'Observed Length (m)'
+WEIGHT_COLUMN = 'Observed Weight (kg)'
+
+# Colunas lidas pelo modelo (ajuste e imputação)
+IMPUTATION_COLUMNS = [SPECIES_COLUMN, LENGTH_COLUMN, WEIGHT_COLUMN]
+
+# Espécies com menos pares válidos que isso usam o ajuste global
+MIN_FIT_POINTS = 3
+GLOBAL_KEY = '__global__'
+
+
+def fit_allometry(data):
+    """Ajusta log(peso) = a + b * log(comprimento) por espécie, numa única agregação.
+
+    Retorna um DataFrame indexado pela espécie (mais a linha GLOBAL_KEY com
+    o ajuste de todas as espécies) com n, slope (b), intercept (a), r_log
+    (correlação no espaço log-log), r (Pearson nas unidades originais) e rmse
+    (erro do ajuste em log).
+    """
+    valid = data[[SPECIES_COLUMN, LENGTH_COLUMN, WEIGHT_COLUMN]].dropna()
+    valid = valid[(valid[LENGTH_COLUMN] > 0) & (valid[WEIGHT_COLUMN] > 0)]
+    x = np.log(valid[LENGTH_COLUMN].to_numpy(dtype=float))
+    y = np.log(valid[WEIGHT_COLUMN].to_numpy(dtype=float))
+    length = valid[LENGTH_COLUMN].to_numpy(dtype=float)
+    weight = valid[WEIGHT_COLUMN].to_numpy(dtype=float)
+    terms = pd.DataFrame({
+        'species': valid[SPECIES_COLUMN].to_numpy(),
+        'n': 1,
+        'x': x, 'y': y, 'xx': x * x, 'xy': x * y, 'yy': y * y,
+        'l': length, 'w': weight, 'll': length * length, 'lw': length * weight, 'ww': weight * weight,
+    })
+
+    sums = terms.groupby('species').sum()
+    sums.loc[GLOBAL_KEY] = terms.drop(columns='species').sum()
+    return coefficients_from_sums(sums)
+
+
+def coefficients_from_sums(sums):
+    n = sums['n'].astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sxx = n * sums['xx'] - sums['x'] ** 2
+        sxy = n * sums['xy'] - sums['x'] * sums['y']
+        syy = n * sums['yy'] - sums['y'] ** 2
+        slope = sxy / sxx
+        intercept = (sums['y'] - slope * sums['x']) / n
+        r_log = sxy / np.sqrt(sxx * syy)
+        sll = n * sums['ll'] - sums['l'] ** 2
+        slw = n * sums['lw'] - sums['l'] * sums['w']
+        sww = n * sums['ww'] - sums['w'] ** 2
+        r = slw / np.sqrt(sll * sww)
+        # Soma dos resíduos ao quadrado: (Syy - b * Sxy) / n
+        sse = (syy - slope * sxy) / n
+        rmse = np.sqrt(np.clip(sse, 0, None) / (n - 2))
+
+    coefficients = pd.DataFrame({
+        'n': sums['n'].astype(int),
+        'slope': slope,
+        'intercept': intercept,
+        'r_log': r_log,
+        'r': r,
+        'rmse': rmse,
+    })
+    coefficients.index.name = SPECIES_COLUMN
+    fit_ok = (coefficients['n'] >= MIN_FIT_POINTS) & np.isfinite(coefficients['slope']) & (coefficients['slope'] != 0)
+    coefficients.loc[~fit_ok, ['slope', 'intercept']] = np.nan
+    return coefficients
+
+
+def species_coefficients(coefficients, species):
+    """Coeficientes (slope, intercept) de cada espécie, com o ajuste global para as sem ajuste"""
+    species = pd.Series(species)
+    slope = species.map(coefficients['slope'])
+    intercept = species.map(coefficients['intercept'])
+    missing = slope.isna()
+    if GLOBAL_KEY in coefficients.index:
+        slope[missing] = coefficients.at[GLOBAL_KEY, 'slope']
+        intercept[missing] = coefficients.at[GLOBAL_KEY, 'intercept']
+    return slope.to_numpy(dtype=float), intercept.to_numpy(dtype=float)
+
+
+def predict_weight(coefficients, species, lengths):
+    """Peso previsto (kg) para cada par espécie/comprimento"""
+    lengths = np.asarray(lengths, dtype=float)
+    slope, intercept = species_coefficients(coefficients, np.broadcast_to(species, lengths.shape))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.exp(intercept + slope * np.log(lengths))
+
+
+def predict_length(coefficients, species, weights):
+    """Comprimento previsto (m) para cada par espécie/peso (inversa do modelo)"""
+    weights = np.asarray(weights, dtype=float)
+    slope, intercept = species_coefficients(coefficients, np.broadcast_to(species, weights.shape))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.exp((np.log(weights) - intercept) / slope)
+
+
+def impute_measurements(data, coefficients):
+    """Preenche comprimentos/pesos ausentes a partir da outra medida, em lote.
+
+    Retorna (cópia dos dados, {coluna: quantidade de valores imputados}).
+    """
+    data = data.copy()
+    counts = {}
+    for target, source, predict in [
+        (WEIGHT_COLUMN, LENGTH_COLUMN, predict_weight),
+        (LENGTH_COLUMN, WEIGHT_COLUMN, predict_length),
+    ]:
+        mask = (data[target].isna() & data[source].notna()).to_numpy()
+        if mask.any():
+            predicted = predict(coefficients, data.loc[mask, SPECIES_COLUMN].to_numpy(), data.loc[mask, source])
+            data.loc[mask, target] = np.round(predicted, 2)
+        counts[target] = int(np.isfinite(data.loc[mask, target].to_numpy(dtype=float)).sum()) if mask.any() else 0
+    return data, counts
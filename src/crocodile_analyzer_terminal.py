@@ -1,23 +1,234 @@
 #!/usr/bin/env python3
 
-
-import pandas as pd
 import os
 import sys
+import threading
+from query_backends import BACKENDS, PandasBackend
+
+# pandas e o módulo de validação (que depende dele) são importados só no
+# primeiro uso, para o menu aparecer sem esperar o import.
+def import_pandas():
+    import pandas
+    return pandas
+
+def import_validation():
+    import data_validation
+    return data_validation
+
+def import_allometry():
+    import allometry
+    return allometry
+
+def import_outliers():
+    import outliers
+    return outliers
+
+def import_deduplication():
+    import deduplication
+    return deduplication
+
+def import_sampling():
+    import sampling
+    return sampling
+
+def dataset_version(csv_file):
+    """Versão do arquivo de dados (mtime e tamanho), usada como chave de cache"""
+    stat = os.stat(csv_file)
+    return (os.path.abspath(csv_file), stat.st_mtime_ns, stat.st_size)
+
+LOAD_CHUNK_ROWS = 50000
+
+# Colunas usadas por cada relatório (None = todas). Enquanto o carregamento
+# completo não termina, um relatório lê só essas colunas via usecols.
+REPORT_COLUMNS = {
+    'function_1_basic_info': None,
+    'function_2_species_count': ['Common Name'],
+    'function_3_size_statistics': ['Observed Length (m)'],
+    'function_4_weight_statistics': ['Observed Weight (kg)'],
+    'function_5_habitat_distribution': ['Habitat Type'],
+    'function_6_conservation_status': ['Conservation Status'],
+    'function_7_age_class_analysis': ['Age Class'],
+    'function_8_sex_distribution': ['Sex'],
+    'function_9_country_analysis': ['Country/Region'],
+    'function_10_largest_specimens': ['Common Name', 'Observed Length (m)', 'Country/Region'],
+    'function_11_heaviest_specimens': ['Common Name', 'Observed Weight (kg)', 'Country/Region'],
+    'function_12_size_categories': ['Observed Length (m)'],
+    'function_13_yearly_observations': ['Date of Observation'],
+    'function_14_correlation_analysis': ['Observed Length (m)', 'Observed Weight (kg)'],
+    'function_15_species_by_habitat': ['Habitat Type', 'Common Name'],
+    'function_16_adult_vs_juvenile': ['Age Class', 'Observed Length (m)', 'Observed Weight (kg)'],
+    'function_17_endangered_species': ['Common Name', 'Conservation Status'],
+    'function_18_observer_statistics': ['Observer Name'],
+    'function_19_missing_data_analysis': None,
+    'function_20_summary_report': None,
+    'function_21_data_quality_report': [],
+    'function_22_species_allometry': ['Common Name', 'Observed Length (m)', 'Observed Weight (kg)'],
+    'function_23_outlier_detection': ['Common Name', 'Age Class', 'Observed Length (m)', 'Observed Weight (kg)'],
+    'function_24_duplicate_report': None,
+}
+
+# Relatórios que leem o DataFrame diretamente, sem passar pelo backend
+# (não rodam sobre a amostra no modo prévia)
+DATAFRAME_REPORTS = {
+    'function_1_basic_info',
+    'function_21_data_quality_report',
+    'function_22_species_allometry',
+    'function_23_outlier_detection',
+    'function_24_duplicate_report',
+}
+
+# Colunas usadas pelo modelo alométrico na imputação
+IMPUTATION_COLUMNS = ['Common Name', 'Observed Length (m)', 'Observed Weight (kg)']
+
+# Colunas usadas na detecção de outliers (grupos e medidas)
+OUTLIER_COLUMNS = ['Common Name', 'Age Class', 'Observed Length (m)', 'Observed Weight (kg)']
+
+def read_csv_with_progress(csv_file, usecols=None, progress=None):
+    """Lê o CSV em blocos, chamando progress(fração lida do arquivo) a cada bloco"""
+    pd = import_pandas()
+    total_bytes = os.path.getsize(csv_file) or 1
+    with open(csv_file, 'rb') as handle:
+        chunks = []
+        for chunk in pd.read_csv(handle, usecols=usecols, chunksize=LOAD_CHUNK_ROWS):
+            chunks.append(chunk)
+            if progress is not None:
+                progress(min(handle.tell() / total_bytes, 1.0))
+    if not chunks:
+        return pd.read_csv(csv_file, usecols=usecols)
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
 
 class CrocodileAnalyzer:
 
     
-    def __init__(self, csv_file):
+    def __init__(self, csv_file, validate=True, background=False, backend='pandas', impute=False,
+                 exclude_outliers=False, outlier_method='mad', deduplicate=False, preview=False):
         
         self.csv_file = csv_file
-        self.data = None
-        self.load_data()
-    
+        self.backend_name = backend
+        self.impute = impute
+        self.exclude_outliers = exclude_outliers
+        self.outlier_method = outlier_method
+        self.outliers = None
+        self._partial_outliers = None
+        self.deduplicate = deduplicate
+        self.dedup = None
+        self.imputed_counts = {}
+        self._allometry_cache = {}
+        self._data = None
+        self._partial = None
+        self._partial_validation = None
+        self.validate = validate
+        self.validation = None
+        self.progress = 0.0
+        self.load_error = None
+        self.loaded = threading.Event()
+        self._backend = None
+        self.backend_ready = threading.Event()
+        self.backend_error = None
+        if backend != 'pandas' and background:
+            # Abrir um backend SQL importa/varre o arquivo: fica em segundo plano
+            # como a carga do pandas, e o menu aparece na hora
+            self.check_backend_name(backend)
+            threading.Thread(target=self.open_backend_in_background, daemon=True).start()
+        else:
+            self.backend = self.create_backend(backend)
+        self.sample = None
+        self.sample_backend = None
+        self.sample_error = None
+        self.sample_ready = threading.Event()
+        if preview and backend == 'pandas' and background:
+            # A amostra também é sorteada em segundo plano: o menu não espera por ela
+            threading.Thread(target=self.draw_preview_sample, daemon=True).start()
+        else:
+            self.sample_ready.set()
+        if backend != 'pandas':
+            # Os relatórios consultam o arquivo pelo backend; o DataFrame só é
+            # carregado se um relatório exclusivo do pandas (1, 21, 22 e 24) pedir.
+            self.loader = None
+        elif background:
+            self.loader = threading.Thread(target=self.load_in_background, daemon=True)
+            self.loader.start()
+        else:
+            self.loader = None
+            self.load_data()
+
+    @property
+    def data(self):
+        """Dataset completo; em carga em segundo plano, a projeção já lida ou a espera pela carga"""
+        if self._data is None and self._partial is not None:
+            return self._partial
+        if self._data is None and self.loader is not None:
+            self.wait_until_loaded()
+        if self._data is None and self.loader is None and not self.loaded.is_set():
+            self.load_data()
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def backend(self):
+        """Backend de consultas; um backend SQL aberto em segundo plano é esperado no primeiro uso"""
+        if not self.backend_ready.is_set():
+            self.wait_for_backend()
+        return self._backend
+
+    @backend.setter
+    def backend(self, value):
+        self._backend = value
+        self.backend_ready.set()
+
+    def check_backend_name(self, name):
+        if name not in BACKENDS:
+            print(f"Backend desconhecido: {name}. Opções: {', '.join(BACKENDS)}")
+            sys.exit(1)
+
+    def open_sql_backend(self, name):
+        """Backend SQL sobre o arquivo, com as mesmas regras de validação da carga.
+
+        A validação vira predicados SQL (sem arquivo de quarentena); a
+        deduplicação, a exclusão de outliers e a imputação não se aplicam.
+        """
+        rules = import_validation().VALIDATION_RULES if self.validate else None
+        return BACKENDS[name](self.csv_file, rules=rules)
+
+    def create_backend(self, name):
+        """Backend de consultas dos relatórios"""
+        if name == 'pandas':
+            return PandasBackend(lambda: self.data, self.observation_dates)
+        self.check_backend_name(name)
+        try:
+            return self.open_sql_backend(name)
+        except Exception as e:
+            print(f"Erro ao abrir o backend {name}: {e}")
+            sys.exit(1)
+
+    def open_backend_in_background(self):
+        try:
+            self._backend = self.open_sql_backend(self.backend_name)
+        except Exception as e:
+            self.backend_error = e
+        finally:
+            self.backend_ready.set()
+
+    def wait_for_backend(self):
+        """Bloqueia até o backend SQL estar pronto"""
+        while not self.backend_ready.wait(0.2):
+            print(f"\rPreparando o backend {self.backend_name}...", end="", flush=True)
+        if self.backend_error is not None:
+            print(f"Erro ao abrir o backend {self.backend_name}: {self.backend_error}")
+            sys.exit(1)
+
     def load_data(self):
 
         try:
-            self.data = pd.read_csv(self.csv_file)
+            self.data = import_pandas().read_csv(self.csv_file)
+            if self.validate:
+                self.run_validation()
+            self.data = self.apply_dedup(self.data)
+            self.data, self.outliers = self.outlier_filter(self.data)
+            self.data = self.apply_imputation(self.data)
             print(f"Dataset carregado com sucesso! {len(self.data)} observações encontradas.\n")
         except FileNotFoundError:
             print(f"Erro: Arquivo {self.csv_file} não encontrado!")
@@ -25,7 +236,220 @@ class CrocodileAnalyzer:
         except Exception as e:
             print(f"Erro ao carregar dados: {e}")
             sys.exit(1)
+        finally:
+            self.loaded.set()
+
+    def load_in_background(self):
+        """Carrega o dataset completo numa thread, atualizando self.progress"""
+        try:
+            data = read_csv_with_progress(self.csv_file, progress=self.set_progress)
+            if self.validate:
+                validation = self.validate_frame(data)
+                self.validation = validation
+                data = validation.valid_data
+            data = self.apply_dedup(data)
+            data, self.outliers = self.outlier_filter(data)
+            self._data = self.apply_imputation(data)
+            self._partial = None
+            self._partial_validation = None
+            self._partial_outliers = None
+        except Exception as e:
+            self.load_error = e
+        finally:
+            self.loaded.set()
+
+    def set_progress(self, fraction):
+        self.progress = fraction
+
+    def load_status(self):
+        """Texto de status do carregamento para o menu"""
+        if self.backend_name != 'pandas':
+            if self.backend_error is not None:
+                return f"Erro ao abrir o backend {self.backend_name}: {self.backend_error}"
+            if not self.backend_ready.is_set():
+                return f"Preparando o backend de consultas {self.backend_name} em segundo plano..."
+            return f"Backend de consultas: {self.backend_name}"
+        if self.load_error is not None:
+            return f"Erro ao carregar dados: {self.load_error}"
+        if self.loaded.is_set():
+            status = f"Dataset carregado: {len(self._data)} observações."
+            if self.validation is not None and self.validation.quarantined_rows:
+                status += f" {self.validation.quarantined_rows} registros em quarentena."
+            return status
+        status = f"Carregando dataset em segundo plano... {self.progress * 100:3.0f}%"
+        if self.sample_backend is not None:
+            status += " (relatórios em modo prévia, por amostragem)"
+        elif not self.sample_ready.is_set():
+            status += " (sorteando a amostra da prévia...)"
+        return status
+
+    def wait_until_loaded(self):
+        """Bloqueia até o fim da carga completa, exibindo o progresso"""
+        while not self.loaded.wait(0.2):
+            print(f"\rCarregando dataset... {self.progress * 100:3.0f}%", end="", flush=True)
+        if self.load_error is not None:
+            if isinstance(self.load_error, FileNotFoundError):
+                print(f"Erro: Arquivo {self.csv_file} não encontrado!")
+            else:
+                print(f"Erro ao carregar dados: {self.load_error}")
+            sys.exit(1)
+
+    def ensure_columns(self, columns):
+        """Garante que self.data tenha as colunas pedidas.
+
+        Com a carga completa ainda em andamento, lê só as colunas necessárias
+        (mais as usadas na validação, para excluir as mesmas linhas).
+        """
+        if self.backend_name != 'pandas' or self.loaded.is_set() or self.loader is None:
+            return
+        # A deduplicação compara as linhas inteiras: só com a carga completa
+        if columns is None or self.deduplicate:
+            self.wait_until_loaded()
+            return
+        needed = set(columns)
+        if self.validate:
+            needed |= import_validation().rule_columns()
+        if self.impute:
+            needed |= set(IMPUTATION_COLUMNS)
+        if self.exclude_outliers:
+            needed |= set(OUTLIER_COLUMNS)
+        if self._partial is not None and needed <= set(self._partial.columns):
+            return
+        if self._partial is not None:
+            needed |= set(self._partial.columns)
+        header = import_pandas().read_csv(self.csv_file, nrows=0).columns
+        usecols = [col for col in header if col in needed]
+        partial = import_pandas().read_csv(self.csv_file, usecols=usecols)
+        validation = None
+        if self.validate:
+            validation = self.validate_frame(partial, write=False)
+            partial = validation.valid_data
+        partial, outliers = self.outlier_filter(partial)
+        partial = self.apply_imputation(partial)
+        # A carga completa pode ter terminado enquanto a projeção era lida
+        if not self.loaded.is_set():
+            self._partial = partial
+            self._partial_validation = validation
+            self._partial_outliers = outliers
+
+    def draw_preview_sample(self):
+        """Amostra estratificada (espécie x país) lida em até PREVIEW_SECONDS.
+
+        A amostra passa pela mesma validação da carga; deduplicação,
+        exclusão de outliers e imputação valem só para o resultado exato.
+        Se a amostragem falhar, os relatórios esperam pela carga completa.
+        """
+        try:
+            sampling = import_sampling()
+            row_filter = None
+            if self.validate:
+                row_filter = lambda chunk: import_validation().validate_data(chunk).valid_data
+            sample = sampling.draw_sample(self.csv_file, chunksize=LOAD_CHUNK_ROWS, row_filter=row_filter)
+            self.sample = sample
+            self.sample_backend = sampling.SampleBackend(sample)
+        except Exception as e:
+            self.sample_error = e
+        finally:
+            self.sample_ready.set()
+
+    def uses_preview(self, name):
+        return (self.sample_backend is not None and not self.loaded.is_set()
+                and name not in DATAFRAME_REPORTS)
+
+    def run_report(self, name, exact=False):
+        """Executa um relatório esperando apenas pelas colunas que ele usa.
+
+        No modo prévia, enquanto a carga completa não termina, os relatórios
+        que passam pelo backend rodam sobre a amostra (retorna True nesse caso).
+        """
+        if not exact and self.uses_preview(name):
+            self.run_preview(name)
+            return True
+        self.ensure_columns(REPORT_COLUMNS.get(name))
+        getattr(self, name)()
+        return False
+
+    def run_preview(self, name):
+        """Executa o relatório sobre a amostra e anota os intervalos de confiança"""
+        sampling = import_sampling()
+        print(f"PRÉVIA: estimativas a partir de {len(self.sample.data)} registros amostrados por espécie e país\n")
+        backend = self.backend
+        self.backend = self.sample_backend
+        try:
+            getattr(self, name)()
+        finally:
+            self.backend = backend
+        print("\nIntervalos de confiança (95%):")
+        for line in sampling.confidence_lines(self.sample, REPORT_COLUMNS.get(name)):
+            print(f"  {line}")
+
+    def validate_frame(self, data, write=True):
+        validation = import_validation().validate_data(data)
+        if write and validation.quarantined_rows:
+            path = import_validation().quarantine_path(self.csv_file)
+            import_validation().write_quarantine(validation, path)
+        return validation
     
+    def run_validation(self):
+        """Valida os dados na carga e move as linhas inválidas para a quarentena.
+
+        O resultado fica em self.validation para que os relatórios não
+        precisem validar (nem converter datas) de novo.
+        """
+        self.validation = self.validate_frame(self.data)
+        self.data = self.validation.valid_data
+        if self.validation.quarantined_rows:
+            path = import_validation().quarantine_path(self.csv_file)
+            print(f"{self.validation.quarantined_rows} registros inválidos movidos para quarentena: {path}")
+
+    def allometry(self, data=None):
+        """Coeficientes do modelo alométrico por espécie, em cache por versão do dataset"""
+        version = dataset_version(self.csv_file)
+        if version not in self._allometry_cache:
+            data = self.data if data is None else data
+            self._allometry_cache = {version: import_allometry().fit_allometry(data)}
+        return self._allometry_cache[version]
+
+    def apply_dedup(self, data):
+        """Remove duplicatas exatas e quase duplicatas, se habilitado.
+
+        O mapa de duplicatas (ID -> ID mantido) é gravado ao lado do CSV.
+        """
+        if not self.deduplicate:
+            return data
+        deduplication = import_deduplication()
+        self.dedup = deduplication.find_duplicates(data)
+        if len(self.dedup.duplicates):
+            path = deduplication.dedup_map_path(self.csv_file)
+            deduplication.write_dedup_map(data, self.dedup, path)
+        return deduplication.apply_dedup(data, self.dedup)
+
+    def outlier_filter(self, data):
+        """Remove os outliers por espécie/classe etária, se habilitado.
+
+        Retorna (dados, OutlierResult ou None). A remoção vem antes da
+        imputação para que o modelo alométrico não seja ajustado com eles.
+        """
+        if not self.exclude_outliers:
+            return data, None
+        result = import_outliers().detect_outliers(data, self.outlier_method)
+        return data.drop(index=result.outliers.index), result
+
+    def apply_imputation(self, data):
+        """Preenche comprimentos/pesos ausentes pelo modelo alométrico, se habilitado"""
+        if not self.impute:
+            return data
+        data, self.imputed_counts = import_allometry().impute_measurements(data, self.allometry(data))
+        return data
+
+    def observation_dates(self):
+        """Datas de observação já convertidas, reaproveitando a validação quando possível"""
+        if (self._partial is None and self.validation is not None
+                and 'Date of Observation' in self.validation.parsed_dates):
+            # A validação roda antes da deduplicação e do filtro de outliers
+            return self.validation.parsed_dates['Date of Observation'].reindex(self.data.index)
+        return import_validation().parse_dates(self.data['Date of Observation'])
+
     def function_1_basic_info(self):
         print("=" * 60)
         print("INFORMAÇÕES BÁSICAS DO DATASET")
@@ -43,7 +467,7 @@ class CrocodileAnalyzer:
         print("=" * 60)
         print("CONTAGEM POR ESPÉCIE")
         print("=" * 60)
-        species_count = self.data['Common Name'].value_counts()
+        species_count = self.backend.value_counts('Common Name')
         for i, (species, count) in enumerate(species_count.head(10).items(), 1):
             print(f"{i:2d}. {species:<35} | {count:3d} observações")
         print(f"\nTotal de espécies únicas: {len(species_count)}")
@@ -52,80 +476,89 @@ class CrocodileAnalyzer:
         print("=" * 60)
         print("ESTATÍSTICAS DE COMPRIMENTO")
         print("=" * 60)
-        length_data = self.data['Observed Length (m)'].dropna()
-        print(f"Média: {length_data.mean():.2f} metros")
-        print(f"Mediana: {length_data.median():.2f} metros")
-        print(f"Desvio padrão: {length_data.std():.2f} metros")
-        print(f"Mínimo: {length_data.min():.2f} metros")
-        print(f"Máximo: {length_data.max():.2f} metros")
-        print(f"1º Quartil: {length_data.quantile(0.25):.2f} metros")
-        print(f"3º Quartil: {length_data.quantile(0.75):.2f} metros")
-        print(f"Total de medições válidas: {len(length_data)}")
+        length_data = self.backend.numeric_summary('Observed Length (m)')
+        print(f"Média: {length_data['mean']:.2f} metros")
+        print(f"Mediana: {length_data['median']:.2f} metros")
+        print(f"Desvio padrão: {length_data['std']:.2f} metros")
+        print(f"Mínimo: {length_data['min']:.2f} metros")
+        print(f"Máximo: {length_data['max']:.2f} metros")
+        print(f"1º Quartil: {length_data['q1']:.2f} metros")
+        print(f"3º Quartil: {length_data['q3']:.2f} metros")
+        print(f"Total de medições válidas: {length_data['count']}")
+        if self.imputed_counts.get('Observed Length (m)'):
+            print(f"Valores imputados pelo modelo alométrico: {self.imputed_counts['Observed Length (m)']}")
     
     def function_4_weight_statistics(self):
         print("=" * 60)
         print("ESTATÍSTICAS DE PESO")
         print("=" * 60)
-        weight_data = self.data['Observed Weight (kg)'].dropna()
-        print(f"Média: {weight_data.mean():.2f} kg")
-        print(f"Mediana: {weight_data.median():.2f} kg")
-        print(f"Desvio padrão: {weight_data.std():.2f} kg")
-        print(f"Mínimo: {weight_data.min():.2f} kg")
-        print(f"Máximo: {weight_data.max():.2f} kg")
-        print(f"1º Quartil: {weight_data.quantile(0.25):.2f} kg")
-        print(f"3º Quartil: {weight_data.quantile(0.75):.2f} kg")
-        print(f"Total de medições válidas: {len(weight_data)}")
+        weight_data = self.backend.numeric_summary('Observed Weight (kg)')
+        print(f"Média: {weight_data['mean']:.2f} kg")
+        print(f"Mediana: {weight_data['median']:.2f} kg")
+        print(f"Desvio padrão: {weight_data['std']:.2f} kg")
+        print(f"Mínimo: {weight_data['min']:.2f} kg")
+        print(f"Máximo: {weight_data['max']:.2f} kg")
+        print(f"1º Quartil: {weight_data['q1']:.2f} kg")
+        print(f"3º Quartil: {weight_data['q3']:.2f} kg")
+        print(f"Total de medições válidas: {weight_data['count']}")
+        if self.imputed_counts.get('Observed Weight (kg)'):
+            print(f"Valores imputados pelo modelo alométrico: {self.imputed_counts['Observed Weight (kg)']}")
     
     def function_5_habitat_distribution(self):
         print("=" * 60)
         print("DISTRIBUIÇÃO POR HABITAT")
         print("=" * 60)
-        habitat_dist = self.data['Habitat Type'].value_counts()
+        habitat_dist = self.backend.value_counts('Habitat Type')
+        total = self.backend.count()
         for i, (habitat, count) in enumerate(habitat_dist.items(), 1):
-            percentage = (count / len(self.data)) * 100
+            percentage = (count / total) * 100
             print(f"{i:2d}. {habitat:<25} | {count:3d} ({percentage:5.1f}%)")
     
     def function_6_conservation_status(self):
         print("=" * 60)
         print("STATUS DE CONSERVAÇÃO")
         print("=" * 60)
-        conservation = self.data['Conservation Status'].value_counts()
+        conservation = self.backend.value_counts('Conservation Status')
+        total = self.backend.count()
         for status, count in conservation.items():
-            percentage = (count / len(self.data)) * 100
+            percentage = (count / total) * 100
             print(f"{status:<20} | {count:3d} ({percentage:5.1f}%)")
     
     def function_7_age_class_analysis(self):
         print("=" * 60)
         print("DISTRIBUIÇÃO POR IDADE")
         print("=" * 60)
-        age_dist = self.data['Age Class'].value_counts()
+        age_dist = self.backend.value_counts('Age Class')
+        total = self.backend.count()
         for age, count in age_dist.items():
-            percentage = (count / len(self.data)) * 100
+            percentage = (count / total) * 100
             print(f"{age:<15} | {count:3d} ({percentage:5.1f}%)")
             
     def function_8_sex_distribution(self):
         print("=" * 60)
         print("DISTRIBUIÇÃO POR SEXO")
         print("=" * 60)
-        sex_dist = self.data['Sex'].value_counts()
+        sex_dist = self.backend.value_counts('Sex')
+        total = self.backend.count()
         for sex, count in sex_dist.items():
-            percentage = (count / len(self.data)) * 100
+            percentage = (count / total) * 100
             print(f"{sex:<10} | {count:3d} ({percentage:5.1f}%)")
     
     def function_9_country_analysis(self):
         print("=" * 60)
         print("OBSERVAÇÕES POR PAÍS/REGIÃO")
         print("=" * 60)
-        country_dist = self.data['Country/Region'].value_counts()
+        country_dist = self.backend.value_counts('Country/Region')
+        total = self.backend.count()
         for i, (country, count) in enumerate(country_dist.head(15).items(), 1):
-            percentage = (count / len(self.data)) * 100
+            percentage = (count / total) * 100
             print(f"{i:2d}. {country:<25} | {count:3d} ({percentage:5.1f}%)")
     
     def function_10_largest_specimens(self):
         print("=" * 60)
         print("MAIORES ESPÉCIMES (COMPRIMENTO)")
         print("=" * 60)
-        largest = self.data.nlargest(10, 'Observed Length (m)')
+        largest = self.backend.nlargest(10, 'Observed Length (m)', ['Common Name', 'Observed Length (m)', 'Country/Region'])
         for i, (idx, row) in enumerate(largest.iterrows(), 1):
             print(f"{i:2d}. {row['Common Name']:<30} | {row['Observed Length (m)']:5.2f}m | {row['Country/Region']}")
     
@@ -133,7 +566,7 @@ class CrocodileAnalyzer:
         print("=" * 60)
         print("ESPÉCIMES MAIS PESADOS")
         print("=" * 60)
-        heaviest = self.data.nlargest(10, 'Observed Weight (kg)')
+        heaviest = self.backend.nlargest(10, 'Observed Weight (kg)', ['Common Name', 'Observed Weight (kg)', 'Country/Region'])
         for i, (idx, row) in enumerate(heaviest.iterrows(), 1):
             print(f"{i:2d}. {row['Common Name']:<30} | {row['Observed Weight (kg)']:6.1f}kg | {row['Country/Region']}")
     
@@ -142,25 +575,16 @@ class CrocodileAnalyzer:
         print("CATEGORIZAÇÃO POR TAMANHO")
         print("=" * 60)
         
-        def categorize_size(length):
-            if pd.isna(length):
-                return 'Desconhecido'
-            elif length < 1.5:
-                return 'Pequeno (<1.5m)'
-            elif length < 3.0:
-                return 'Médio (1.5-3m)'
-            elif length < 4.5:
-                return 'Grande (3-4.5m)'
-            else:
-                return 'Muito Grande (>4.5m)'
-        
-        
-        temp_data = self.data.copy()
-        temp_data['Size_Category'] = temp_data['Observed Length (m)'].apply(categorize_size)
-        size_dist = temp_data['Size_Category'].value_counts()
+        size_dist = self.backend.bucket_counts(
+            'Observed Length (m)',
+            [1.5, 3.0, 4.5],
+            ['Pequeno (<1.5m)', 'Médio (1.5-3m)', 'Grande (3-4.5m)', 'Muito Grande (>4.5m)'],
+            'Desconhecido'
+        )
+        total = self.backend.count()
         
         for category, count in size_dist.items():
-            percentage = (count / len(self.data)) * 100
+            percentage = (count / total) * 100
             print(f"{category:<20} | {count:3d} ({percentage:5.1f}%)")
     
     def function_13_yearly_observations(self):
@@ -169,12 +593,10 @@ class CrocodileAnalyzer:
         print("=" * 60)
         try:
             
-            dates = pd.to_datetime(self.data['Date of Observation'], format='%d-%m-%Y', errors='coerce')
-            yearly = dates.dt.year.value_counts().sort_index()
+            yearly = self.backend.year_counts('Date of Observation')
             
             for year, count in yearly.items():
-                if not pd.isna(year):
-                    print(f"{int(year)} | {'*' * (count // 5)}{count:3d} observações")
+                print(f"{int(year)} | {'*' * (count // 5)}{count:3d} observações")
         except (ValueError, TypeError) as e:
             print(f"Erro na conversão de datas: {e}")
     
@@ -184,10 +606,9 @@ class CrocodileAnalyzer:
         print("=" * 60)
         
 
-        valid_data = self.data[['Observed Length (m)', 'Observed Weight (kg)']].dropna()
+        valid_count, correlation = self.backend.correlation('Observed Length (m)', 'Observed Weight (kg)')
         
-        if len(valid_data) > 1:
-            correlation = valid_data['Observed Length (m)'].corr(valid_data['Observed Weight (kg)'])
+        if valid_count > 1:
             print(f"Coeficiente de correlação de Pearson: {correlation:.4f}")
             
             if correlation > 0.8:
@@ -201,7 +622,7 @@ class CrocodileAnalyzer:
             else:
                 print("Correlação muito fraca")
             
-            print(f"\nDados válidos para análise: {len(valid_data)}")
+            print(f"\nDados válidos para análise: {valid_count}")
         else:
             print("Dados insuficientes para análise de correlação")
     def function_15_species_by_habitat(self):
@@ -209,7 +630,7 @@ class CrocodileAnalyzer:
         print("DIVERSIDADE DE ESPÉCIES POR HABITAT")
         print("=" * 60)
         
-        habitat_diversity = self.data.groupby('Habitat Type')['Common Name'].nunique().sort_values(ascending=False)
+        habitat_diversity = self.backend.group_nunique('Habitat Type', 'Common Name')
         
         for habitat, species_count in habitat_diversity.items():
             print(f"{habitat:<25} | {species_count:2d} espécies diferentes")
@@ -219,24 +640,21 @@ class CrocodileAnalyzer:
         print("COMPARAÇÃO ADULTO vs JUVENIL")
         print("=" * 60)
         
-        adults = self.data[self.data['Age Class'] == 'Adult']
-        juveniles = self.data[self.data['Age Class'] == 'Juvenile']
+        measures = ['Observed Length (m)', 'Observed Weight (kg)']
+        adults, adult_means = self.backend.subset_means('Age Class', 'Adult', measures)
+        juveniles, juv_means = self.backend.subset_means('Age Class', 'Juvenile', measures)
         
         print("ADULTOS:")
-        if len(adults) > 0:
-            adult_length = adults['Observed Length (m)'].dropna()
-            adult_weight = adults['Observed Weight (kg)'].dropna()
-            print(f"  Comprimento médio: {adult_length.mean():.2f}m")
-            print(f"  Peso médio: {adult_weight.mean():.2f}kg")
-            print(f"  Total: {len(adults)} observações")
+        if adults > 0:
+            print(f"  Comprimento médio: {adult_means['Observed Length (m)']:.2f}m")
+            print(f"  Peso médio: {adult_means['Observed Weight (kg)']:.2f}kg")
+            print(f"  Total: {adults} observações")
         
         print("\nJUVENIS:")
-        if len(juveniles) > 0:
-            juv_length = juveniles['Observed Length (m)'].dropna()
-            juv_weight = juveniles['Observed Weight (kg)'].dropna()
-            print(f"  Comprimento médio: {juv_length.mean():.2f}m")
-            print(f"  Peso médio: {juv_weight.mean():.2f}kg")
-            print(f"  Total: {len(juveniles)} observações")
+        if juveniles > 0:
+            print(f"  Comprimento médio: {juv_means['Observed Length (m)']:.2f}m")
+            print(f"  Peso médio: {juv_means['Observed Weight (kg)']:.2f}kg")
+            print(f"  Total: {juveniles} observações")
     
     def function_17_endangered_species(self):
         print("=" * 60)
@@ -244,11 +662,11 @@ class CrocodileAnalyzer:
         print("=" * 60)
         
         endangered_status = ['Critically Endangered', 'Endangered', 'Vulnerable']
-        endangered = self.data[self.data['Conservation Status'].isin(endangered_status)]
+        endangered_species = self.backend.group_sizes(
+            ['Common Name', 'Conservation Status'], 'Conservation Status', endangered_status
+        )
         
-        if len(endangered) > 0:
-            endangered_species = endangered.groupby(['Common Name', 'Conservation Status']).size().reset_index(name='Count')
-            
+        if len(endangered_species) > 0:
             for _, row in endangered_species.iterrows():
                 print(f"{row['Common Name']:<35} | {row['Conservation Status']:<20} | {row['Count']} obs.")
         else:
@@ -259,7 +677,7 @@ class CrocodileAnalyzer:
         print("ESTATÍSTICAS DOS OBSERVADORES")
         print("=" * 60)
         
-        observer_stats = self.data['Observer Name'].value_counts()
+        observer_stats = self.backend.value_counts('Observer Name')
         print(f"Total de observadores: {len(observer_stats)}")
         print(f"Observador mais ativo: {observer_stats.index[0]} ({observer_stats.iloc[0]} observações)")
         print(f"Média de observações por observador: {observer_stats.mean():.1f}")
@@ -273,8 +691,8 @@ class CrocodileAnalyzer:
         print("ANÁLISE DE DADOS FALTANTES")
         print("=" * 60)
         
-        missing_data = self.data.isnull().sum()
-        total_rows = len(self.data)
+        missing_data = self.backend.null_counts()
+        total_rows = self.backend.count()
         
         print(f"Total de registros: {total_rows}")
         print("\nDados faltantes por coluna:")
@@ -292,38 +710,140 @@ class CrocodileAnalyzer:
         print("=" * 80)
         
         print(f"DADOS GERAIS:")
-        print(f"   Total de observações: {len(self.data)}")
-        print(f"   Espécies únicas: {self.data['Common Name'].nunique()}")
-        print(f"   Países/regiões: {self.data['Country/Region'].nunique()}")
-        print(f"   Tipos de habitat: {self.data['Habitat Type'].nunique()}")
-        print(f"   Observadores: {self.data['Observer Name'].nunique()}")
+        total = self.backend.count()
+        print(f"   Total de observações: {total}")
+        print(f"   Espécies únicas: {self.backend.nunique('Common Name')}")
+        print(f"   Países/regiões: {self.backend.nunique('Country/Region')}")
+        print(f"   Tipos de habitat: {self.backend.nunique('Habitat Type')}")
+        print(f"   Observadores: {self.backend.nunique('Observer Name')}")
         
         print(f"\nMEDIDAS FÍSICAS:")
-        length_stats = self.data['Observed Length (m)'].describe()
-        weight_stats = self.data['Observed Weight (kg)'].describe()
+        length_stats = self.backend.numeric_summary('Observed Length (m)')
+        weight_stats = self.backend.numeric_summary('Observed Weight (kg)')
         print(f"   Comprimento: {length_stats['min']:.2f}m - {length_stats['max']:.2f}m (média: {length_stats['mean']:.2f}m)")
         print(f"   Peso: {weight_stats['min']:.1f}kg - {weight_stats['max']:.1f}kg (média: {weight_stats['mean']:.1f}kg)")
         
         print(f"\nCONSERVAÇÃO:")
-        conservation_counts = self.data['Conservation Status'].value_counts()
+        conservation_counts = self.backend.value_counts('Conservation Status')
         endangered = conservation_counts.get('Critically Endangered', 0) + conservation_counts.get('Endangered', 0)
         print(f"   Espécies em perigo crítico/extinção: {endangered}")
         print(f"   Status mais comum: {conservation_counts.index[0]} ({conservation_counts.iloc[0]} obs.)")
         
         print(f"\nQUALIDADE DOS DADOS:")
-        completeness = ((len(self.data) - self.data.isnull().sum()) / len(self.data) * 100)
+        completeness = ((total - self.backend.null_counts()) / total * 100)
         avg_completeness = completeness.mean()
         print(f"   Completude média: {avg_completeness:.1f}%")
         print(f"   Coluna mais completa: {completeness.idxmax()} ({completeness.max():.1f}%)")
         if completeness.min() < 100:
             print(f"   Coluna com mais dados faltantes: {completeness.idxmin()} ({completeness.min():.1f}%)")
+
+    def function_21_data_quality_report(self):
+        print("=" * 60)
+        print("VALIDAÇÃO DE QUALIDADE DOS DADOS")
+        print("=" * 60)
+
+        validation = self.validation or self._partial_validation
+        if validation is None:
+            validation = import_validation().validate_data(self.data)
+
+        print(f"Total de registros validados: {validation.total_rows}")
+        print(f"Registros em quarentena: {validation.quarantined_rows}")
+        print("\nViolações por regra:")
+        for rule, count in validation.summary.items():
+            if count > 0:
+                percentage = (count / validation.total_rows) * 100 if validation.total_rows else 0
+                print(f"{rule:<30} | {count:3d} ({percentage:5.1f}%)")
+            else:
+                print(f"{rule:<30} | OK")
     
-def show_menu():
+    def function_22_species_allometry(self):
+        print("=" * 80)
+        print("MODELO ALOMÉTRICO POR ESPÉCIE (log peso = a + b * log comprimento)")
+        print("=" * 80)
+
+        allometry = import_allometry()
+        coefficients = self.allometry()
+        species = coefficients.drop(index=allometry.GLOBAL_KEY, errors='ignore').sort_values('n', ascending=False)
+
+        print(f"{'Espécie':<35} | {'n':>4} | {'b':>6} | {'a':>7} | {'r log':>6} | {'r':>6}")
+        for name, row in species.iterrows():
+            if import_pandas().isna(row['slope']):
+                print(f"{name:<35} | {int(row['n']):4d} | dados insuficientes (ajuste global)")
+            else:
+                print(f"{name:<35} | {int(row['n']):4d} | {row['slope']:6.3f} | {row['intercept']:7.3f} | "
+                      f"{row['r_log']:6.3f} | {row['r']:6.3f}")
+
+        if allometry.GLOBAL_KEY in coefficients.index:
+            overall = coefficients.loc[allometry.GLOBAL_KEY]
+            print(f"\nAjuste global: b = {overall['slope']:.3f}, a = {overall['intercept']:.3f}, "
+                  f"r log = {overall['r_log']:.3f} ({int(overall['n'])} pares válidos)")
+
+    def function_23_outlier_detection(self):
+        print("=" * 80)
+        print("OUTLIERS POR ESPÉCIE E CLASSE ETÁRIA")
+        print("=" * 80)
+
+        result = self.outliers or self._partial_outliers
+        if result is None and self.backend_name == 'pandas':
+            result = import_outliers().detect_outliers(self.data, self.outlier_method)
+        elif result is None:
+            # Backends SQL não carregam o DataFrame: percorre as linhas válidas em blocos
+            backend = self.backend
+            result = import_outliers().scan_chunks(
+                lambda: backend.iter_frames(OUTLIER_COLUMNS, LOAD_CHUNK_ROWS), self.outlier_method
+            )
+
+        method = 'mediana ± 3.5 MAD' if result.method == 'mad' else 'Q1/Q3 ± 1.5 IQR'
+        print(f"Método: {method}")
+        print(f"Registros analisados: {result.total_rows}")
+        print(f"Registros marcados: {len(result.outliers)}")
+        for measure, count in result.counts.items():
+            print(f"  {measure:<25} | {count:3d}")
+        if self.exclude_outliers:
+            print("Outliers excluídos dos demais relatórios.")
+
+        if len(result.outliers) > 0:
+            print(f"\n{'Espécie':<35} | {'Classe':<10} | {'Compr.':>6} | {'Peso':>7} | Medidas fora da faixa")
+            for _, row in result.outliers.head(20).iterrows():
+                print(f"{row['Common Name']:<35} | {row['Age Class']:<10} | {row['Observed Length (m)']:6.2f} | "
+                      f"{row['Observed Weight (kg)']:7.1f} | {row['Outlier Measures']}")
+            if len(result.outliers) > 20:
+                print(f"... e mais {len(result.outliers) - 20} registros")
+
+    def function_24_duplicate_report(self):
+        print("=" * 60)
+        print("DUPLICATAS E QUASE DUPLICATAS")
+        print("=" * 60)
+
+        deduplication = import_deduplication()
+        result = self.dedup
+        if result is None:
+            result = deduplication.find_duplicates(self.data)
+        print(f"Registros analisados: {result.total_rows}")
+        print(f"Duplicatas exatas: {result.exact_duplicates}")
+        print(f"Quase duplicatas: {result.near_duplicates}")
+        print(f"Registros únicos: {result.total_rows - len(result.duplicates)}")
+        if self.deduplicate:
+            print("Duplicatas removidas dos demais relatórios.")
+            if len(result.duplicates):
+                print(f"Mapa de duplicatas: {deduplication.dedup_map_path(self.csv_file)}")
+            return
+
+        if len(result.duplicates) > 0:
+            print(f"\n{'ID':>8} | {'ID mantido':>10} | Tipo")
+            for _, row in deduplication.dedup_map(self.data, result).head(20).iterrows():
+                print(f"{row['Observation ID']:>8} | {row['Canonical ID']:>10} | {row['Match']}")
+            if len(result.duplicates) > 20:
+                print(f"... e mais {len(result.duplicates) - 20} registros")
+
+def show_menu(status=None):
     """Exibe o menu principal."""
     print("\n" + "=" * 80)
     print("🐊 ANÁLISE INTERATIVA DO DATASET DE CROCODILOS 🐊")
     print("=" * 80)
-    print("Escolha uma das 20 opções de análise:")
+    if status:
+        print(status)
+    print("Escolha uma das 24 opções de análise:")
     print()
     
     options = [
@@ -346,7 +866,11 @@ def show_menu():
         "17. Espécies ameaçadas de extinção",
         "18. Estatísticas dos observadores",
         "19. Análise de dados faltantes",
-        "20. Relatório resumo completo"
+        "20. Relatório resumo completo",
+        "21. Validação de qualidade dos dados",
+        "22. Modelo alométrico por espécie",
+        "23. Outliers por espécie e idade",
+        "24. Duplicatas e quase duplicatas"
     ]
     
     
@@ -368,38 +892,51 @@ def main():
         return
     
 
-    analyzer = CrocodileAnalyzer(csv_file)
+    # A carga (ou a abertura do backend SQL) roda em segundo plano para o menu aparecer imediatamente
+    backend = os.getenv('CROCODILE_BACKEND', 'pandas')
+    impute = os.getenv('CROCODILE_IMPUTE', '0') == '1'
+    exclude_outliers = os.getenv('CROCODILE_EXCLUDE_OUTLIERS', '0') == '1'
+    outlier_method = os.getenv('CROCODILE_OUTLIER_METHOD', 'mad')
+    deduplicate = os.getenv('CROCODILE_DEDUP', '0') == '1'
+    preview = os.getenv('CROCODILE_PREVIEW', '0') == '1'
+    analyzer = CrocodileAnalyzer(csv_file, background=True, backend=backend, impute=impute,
+                                 exclude_outliers=exclude_outliers, outlier_method=outlier_method,
+                                 deduplicate=deduplicate, preview=preview)
     
 
     functions = {
-        1: analyzer.function_1_basic_info,
-        2: analyzer.function_2_species_count,
-        3: analyzer.function_3_size_statistics,
-        4: analyzer.function_4_weight_statistics,
-        5: analyzer.function_5_habitat_distribution,
-        6: analyzer.function_6_conservation_status,
-        7: analyzer.function_7_age_class_analysis,
-        8: analyzer.function_8_sex_distribution,
-        9: analyzer.function_9_country_analysis,
-        10: analyzer.function_10_largest_specimens,
-        11: analyzer.function_11_heaviest_specimens,
-        12: analyzer.function_12_size_categories,
-        13: analyzer.function_13_yearly_observations,
-        14: analyzer.function_14_correlation_analysis,
-        15: analyzer.function_15_species_by_habitat,
-        16: analyzer.function_16_adult_vs_juvenile,
-        17: analyzer.function_17_endangered_species,
-        18: analyzer.function_18_observer_statistics,
-        19: analyzer.function_19_missing_data_analysis,
-        20: analyzer.function_20_summary_report       
+        1: 'function_1_basic_info',
+        2: 'function_2_species_count',
+        3: 'function_3_size_statistics',
+        4: 'function_4_weight_statistics',
+        5: 'function_5_habitat_distribution',
+        6: 'function_6_conservation_status',
+        7: 'function_7_age_class_analysis',
+        8: 'function_8_sex_distribution',
+        9: 'function_9_country_analysis',
+        10: 'function_10_largest_specimens',
+        11: 'function_11_heaviest_specimens',
+        12: 'function_12_size_categories',
+        13: 'function_13_yearly_observations',
+        14: 'function_14_correlation_analysis',
+        15: 'function_15_species_by_habitat',
+        16: 'function_16_adult_vs_juvenile',
+        17: 'function_17_endangered_species',
+        18: 'function_18_observer_statistics',
+        19: 'function_19_missing_data_analysis',
+        20: 'function_20_summary_report',
+        21: 'function_21_data_quality_report',
+        22: 'function_22_species_allometry',
+        23: 'function_23_outlier_detection',
+        24: 'function_24_duplicate_report'
     }
     
     
     while True:
-        show_menu()
+        show_menu(analyzer.load_status())
         
         try:
-            choice = input("Digite sua opção (0-20): ").strip()
+            choice = input("Digite sua opção (0-24): ").strip()
             
             if choice == '0':
                 print("\nObrigado por usar o Analisador de Crocodilos! Até mais!")
@@ -409,10 +946,15 @@ def main():
             
             if choice_int in functions:
                 print("\n")
-                functions[choice_int]()
+                if analyzer.run_report(functions[choice_int]):
+                    # A carga completa segue em segundo plano; o exato espera por ela
+                    refine = input("\nCalcular o resultado exato? (s/N): ").strip().lower()
+                    if refine == 's':
+                        print("\n")
+                        analyzer.run_report(functions[choice_int], exact=True)
                 input("\nPressione ENTER para continuar...")
             else:
-                print("Opção inválida! Por favor, digite um número de 0 a 20.")
+                print("Opção inválida! Por favor, digite um número de 0 a 24.")
                 input("Pressione ENTER para continuar...")
                 
         except ValueError:
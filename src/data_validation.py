@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+import os
+import pandas as pd
+
+
+DATE_FORMAT = '%d-%m-%Y'
+
+# Regras declarativas de qualidade dos dados. Cada regra tem um nome, um tipo
+# (chave de RULE_CHECKS) e os parâmetros que o tipo espera. Valores ausentes
+# não violam as regras de faixa/data: são tratados pela análise de faltantes.
+VALIDATION_RULES = [
+    {'name': 'comprimento_impossivel', 'type': 'range',
+     'column': 'Observed Length (m)', 'min': 0.1, 'max': 7.5},
+    {'name': 'peso_impossivel', 'type': 'range',
+     'column': 'Observed Weight (kg)', 'min': 0.05, 'max': 2000},
+    {'name': 'data_invalida', 'type': 'date',
+     'column': 'Date of Observation', 'format': DATE_FORMAT},
+    {'name': 'data_futura', 'type': 'not_future',
+     'column': 'Date of Observation', 'format': DATE_FORMAT},
+    {'name': 'nome_cientifico_inconsistente', 'type': 'consistent_pair',
+     'key': 'Common Name', 'value': 'Scientific Name'},
+    {'name': 'nome_comum_inconsistente', 'type': 'consistent_pair',
+     'key': 'Scientific Name', 'value': 'Common Name'},
+]
+
+
+def parse_dates(series, date_format=DATE_FORMAT):
+    return pd.to_datetime(series, format=date_format, errors='coerce')
+
+
+def cached_dates(data, rule, context):
+    """Converte a coluna de datas uma única vez por validação"""
+    key = (rule['column'], rule['format'])
+    if key not in context:
+        context[key] = parse_dates(data[rule['column']], rule['format'])
+    return context[key]
+
+
+def check_range(data, rule, context):
+    values = pd.to_numeric(data[rule['column']], errors='coerce')
+    invalid_number = values.isna() & data[rule['column']].notna()
+    out_of_range = (values < rule['min']) | (values > rule['max'])
+    return invalid_number | out_of_range
+
+
+def check_date(data, rule, context):
+    return data[rule['column']].notna() & cached_dates(data, rule, context).isna()
+
+
+def check_not_future(data, rule, context):
+    return cached_dates(data, rule, context) > pd.Timestamp.now()
+
+
+def check_consistent_pair(data, rule, context):
+    """Cada valor de 'key' deve corresponder sempre ao mesmo valor de 'value'.
+
+    O valor mais frequente de cada chave é considerado o correto; as linhas
+    que divergem dele são violações.
+    """
+    key, value = rule['key'], rule['value']
+    pairs = data[[key, value]].dropna()
+    if pairs.empty:
+        return pd.Series(False, index=data.index)
+    pair_counts = pairs.groupby([key, value]).size()
+    # Ordenação estável: empates ficam com o menor valor (como nos backends SQL)
+    dominant = pair_counts.reset_index(name='count').sort_values('count', ascending=False, kind='stable')
+    dominant = dominant.drop_duplicates(key).set_index(key)[value]
+    expected = data[key].map(dominant)
+    return data[value].notna() & expected.notna() & (data[value] != expected)
+
+
+RULE_CHECKS = {
+    'range': check_range,
+    'date': check_date,
+    'not_future': check_not_future,
+    'consistent_pair': check_consistent_pair,
+}
+
+
+def rule_columns(rules=None):
+    """Colunas lidas pelas regras"""
+    rules = VALIDATION_RULES if rules is None else rules
+    return {rule[field] for rule in rules for field in ('column', 'key', 'value') if field in rule}
+
+
+class ValidationResult:
+
+    def __init__(self, valid_data, quarantine, summary, total_rows, parsed_dates):
+        self.valid_data = valid_data
+        self.quarantine = quarantine
+        self.summary = summary
+        self.total_rows = total_rows
+        # Datas já convertidas durante a validação, por coluna (só linhas válidas)
+        self.parsed_dates = parsed_dates
+
+    @property
+    def quarantined_rows(self):
+        return len(self.quarantine)
+
+
+def validate_data(data, rules=None):
+    """Aplica todas as regras de forma vetorizada.
+
+    Retorna um ValidationResult com as linhas válidas, as linhas em
+    quarentena (com a coluna 'Violated Rules') e o total de violações por regra.
+    """
+    rules = VALIDATION_RULES if rules is None else rules
+    context = {}
+    violations = pd.DataFrame(index=data.index)
+    for rule in rules:
+        if rule['type'] not in RULE_CHECKS:
+            raise ValueError(f"Tipo de regra desconhecido: {rule['type']}")
+        # Regras sobre colunas ausentes no arquivo não se aplicam
+        if not rule_columns([rule]) <= set(data.columns):
+            continue
+        check = RULE_CHECKS[rule['type']]
+        violations[rule['name']] = check(data, rule, context).fillna(False).astype(bool)
+
+    summary = {name: int(count) for name, count in violations.sum().items()}
+    bad_rows = violations.any(axis=1)
+
+    quarantine = data[bad_rows].copy()
+    labels = pd.Series('', index=quarantine.index)
+    for name in violations.columns:
+        labels = labels.where(~violations.loc[bad_rows, name], labels + name + ';')
+    quarantine['Violated Rules'] = labels.str.rstrip(';')
+
+    valid_data = data[~bad_rows]
+    # Um texto numa coluna de faixa deixa a coluna como texto mesmo depois de
+    # a linha ir para a quarentena: converte para os relatórios numéricos
+    numeric = {rule['column'] for rule in rules if rule['type'] == 'range' and rule['column'] in data.columns}
+    converted = {column: pd.to_numeric(valid_data[column], errors='coerce') for column in numeric
+                 if not pd.api.types.is_numeric_dtype(valid_data[column])}
+    if converted:
+        valid_data = valid_data.assign(**converted)
+
+    parsed_dates = {column: dates[~bad_rows] for (column, _), dates in context.items()}
+    return ValidationResult(valid_data, quarantine, summary, len(data), parsed_dates)
+
+
+def quarantine_path(csv_file):
+    root, _ = os.path.splitext(csv_file)
+    return f"{root}_quarantine.csv"
+
+
+def write_quarantine(result, path):
+    result.quarantine.to_csv(path, index=False)
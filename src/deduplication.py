@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+
+import os
+import numpy as np
+import pandas as pd
+
+
+ID_COLUMN = 'Observation ID'
+BLOCK_COLUMNS = ['Observer Name', 'Common Name', 'Date of Observation']
+LENGTH_COLUMN = 'Observed Length (m)'
+WEIGHT_COLUMN = 'Observed Weight (kg)'
+NOTES_COLUMN = 'Notes'
+
+# Medidas "quase idênticas" dentro do mesmo bloco
+LENGTH_TOLERANCE = 0.05       # metros
+WEIGHT_TOLERANCE = 0.05       # fração do maior peso
+# Vizinhos comparados na ordenação por comprimento dentro do bloco
+NEIGHBOR_WINDOW = 5
+
+# MinHash/LSH das notas: 8 bandas de 4 linhas encontram pares com
+# Jaccard a partir de ~0.6; a confirmação exige NOTES_SIMILARITY.
+SHINGLE_SIZE = 3
+NUM_BANDS = 8
+ROWS_PER_BAND = 4
+NOTES_SIMILARITY = 0.8
+MINHASH_BATCH_ROWS = 5000
+
+
+def normalize_frame(data):
+    """Texto sem caixa/espaços extras e números arredondados, para o hash exato"""
+    normalized = pd.DataFrame(index=data.index)
+    for column in data.columns:
+        if column == ID_COLUMN:
+            continue
+        values = data[column]
+        if pd.api.types.is_numeric_dtype(values):
+            normalized[column] = values.round(2)
+        else:
+            # Normaliza só os valores distintos
+            codes, uniques = pd.factorize(values)
+            uniques = [' '.join(str(value).casefold().split()) for value in uniques]
+            normalized[column] = pd.Series(np.array(uniques + [None], dtype=object)[codes], index=data.index)
+    return normalized
+
+
+def row_hashes(data):
+    return pd.util.hash_pandas_object(normalize_frame(data), index=False).to_numpy()
+
+
+def exact_pairs(hashes):
+    """Pares (linha, primeira linha com o mesmo hash), por posição"""
+    first = pd.Series(np.arange(len(hashes))).groupby(hashes).transform('first').to_numpy()
+    duplicated = np.flatnonzero(first != np.arange(len(hashes)))
+    return duplicated, first[duplicated]
+
+
+def block_codes(data):
+    """Código inteiro do bloco (observador, espécie, data); -1 se faltar algum campo"""
+    keys = normalize_frame(data[BLOCK_COLUMNS])
+    codes = keys.groupby(BLOCK_COLUMNS, sort=False, dropna=False).ngroup().to_numpy().copy()
+    codes[keys.isna().any(axis=1).to_numpy()] = -1
+    return codes
+
+
+def measurement_pairs(data, blocks, skip):
+    """Pares do mesmo bloco com comprimento e peso quase idênticos.
+
+    Vizinhança ordenada: cada linha é comparada só com as NEIGHBOR_WINDOW
+    seguintes na ordem (bloco, comprimento), sem comparar todos os pares.
+    """
+    length = pd.to_numeric(data[LENGTH_COLUMN], errors='coerce').to_numpy(dtype=float)
+    weight = pd.to_numeric(data[WEIGHT_COLUMN], errors='coerce').to_numpy(dtype=float)
+    blocks = np.where(skip, -1, blocks)
+    order = np.lexsort((length, blocks))
+    blocks, length, weight = blocks[order], length[order], weight[order]
+    left, right = [], []
+    for offset in range(1, NEIGHBOR_WINDOW + 1):
+        a, b = np.arange(len(order) - offset), np.arange(offset, len(order))
+        with np.errstate(invalid='ignore'):
+            close = (
+                (blocks[a] == blocks[b]) & (blocks[a] >= 0)
+                & (np.abs(length[a] - length[b]) <= LENGTH_TOLERANCE)
+                & (np.abs(weight[a] - weight[b]) <= WEIGHT_TOLERANCE * np.maximum(weight[a], weight[b]))
+            )
+        left.append(order[a[close]])
+        right.append(order[b[close]])
+    return np.concatenate(left), np.concatenate(right)
+
+
+def shingle_hashes(notes):
+    """(posição da linha, hash de cada shingle de caracteres) de todas as notas"""
+    rows, shingles = [], []
+    for position, text in enumerate(notes):
+        if not isinstance(text, str):
+            continue
+        text = ' '.join(text.casefold().split())
+        text_shingles = {text[i:i + SHINGLE_SIZE] for i in range(max(len(text) - SHINGLE_SIZE + 1, 1))}
+        rows.extend([position] * len(text_shingles))
+        shingles.extend(text_shingles)
+    return np.array(rows, dtype=np.int64), pd.util.hash_array(np.array(shingles, dtype=object))
+
+
+def minhash_signatures(notes, num_perm=NUM_BANDS * ROWS_PER_BAND, seed=1):
+    """Assinaturas MinHash (linhas x num_perm) das notas.
+
+    Cada permutação é o hash de 64 bits do shingle com XOR de uma máscara
+    aleatória. As notas são processadas em lotes de MINHASH_BATCH_ROWS para
+    limitar a matriz intermediária (shingles x permutações).
+    """
+    signatures = np.zeros((len(notes), num_perm), dtype=np.uint64)
+    masks = np.random.default_rng(seed).integers(0, np.iinfo(np.uint64).max, num_perm, dtype=np.uint64)
+    for start in range(0, len(notes), MINHASH_BATCH_ROWS):
+        rows, hashes = shingle_hashes(notes[start:start + MINHASH_BATCH_ROWS])
+        if len(rows) == 0:
+            continue
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        signatures[start + rows[starts]] = np.minimum.reduceat(hashes[:, None] ^ masks, starts, axis=0)
+    return signatures
+
+
+def notes_pairs(data, blocks, skip):
+    """Pares do mesmo bloco com notas parecidas, via LSH sobre as assinaturas.
+
+    Só linhas de blocos com mais de uma observação recebem assinatura. Cada
+    banda da assinatura (mais o bloco) vira uma chave de balde; só as
+    linhas que caem no mesmo balde são comparadas.
+    """
+    if len(data) == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty
+    notes = data[NOTES_COLUMN]
+    candidates = (blocks >= 0) & ~skip & notes.notna().to_numpy()
+    block_sizes = np.bincount(blocks[candidates], minlength=blocks.max() + 1)
+    positions = np.flatnonzero(candidates & (block_sizes[np.clip(blocks, 0, None)] > 1))
+    signatures = np.zeros((len(data), NUM_BANDS * ROWS_PER_BAND), dtype=np.uint64)
+    signatures[positions] = minhash_signatures(notes.iloc[positions].tolist())
+    left, right = [], []
+    for band in range(NUM_BANDS):
+        columns = signatures[positions, band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        keys = pd.DataFrame(columns).assign(block=blocks[positions])
+        bucket = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+        first = pd.Series(positions).groupby(bucket).transform('first').to_numpy()
+        in_bucket = first != positions
+        left.append(positions[in_bucket])
+        right.append(first[in_bucket])
+    left, right = np.concatenate(left), np.concatenate(right)
+    similarity = (signatures[left] == signatures[right]).mean(axis=1)
+    similar = similarity >= NOTES_SIMILARITY
+    return left[similar], right[similar]
+
+
+def connected_labels(size, left, right):
+    """Componentes conexos dos pares: cada linha recebe a menor posição do seu grupo"""
+    labels = np.arange(size)
+    while True:
+        smallest = np.minimum(labels[left], labels[right])
+        updated = labels.copy()
+        np.minimum.at(updated, left, smallest)
+        np.minimum.at(updated, right, smallest)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+class DedupResult:
+
+    def __init__(self, canonical, match, total_rows):
+        # Índice da linha mantida para cada linha (ela mesma se não for duplicata)
+        self.canonical = canonical
+        # 'exato' ou 'quase' para as duplicatas, vazio para as demais
+        self.match = match
+        self.total_rows = total_rows
+
+    @property
+    def duplicates(self):
+        return self.canonical.index[self.canonical.index != self.canonical.to_numpy()]
+
+    @property
+    def exact_duplicates(self):
+        return int((self.match == 'exato').sum())
+
+    @property
+    def near_duplicates(self):
+        return int((self.match == 'quase').sum())
+
+
+def find_duplicates(data):
+    """Encontra duplicatas exatas (hash dos campos normalizados) e quase
+    duplicatas (mesmo bloco com medidas ou notas quase idênticas).
+
+    A linha mantida de cada grupo é a primeira do arquivo.
+    """
+    exact_left, exact_right = exact_pairs(row_hashes(data))
+    blocks = block_codes(data)
+    # Duplicatas exatas já estão ligadas à sua primeira ocorrência
+    skip = np.zeros(len(data), dtype=bool)
+    skip[exact_left] = True
+    near_left, near_right = [], []
+    if all(column in data.columns for column in [LENGTH_COLUMN, WEIGHT_COLUMN]):
+        pairs = measurement_pairs(data, blocks, skip)
+        near_left.append(pairs[0])
+        near_right.append(pairs[1])
+    if NOTES_COLUMN in data.columns:
+        pairs = notes_pairs(data, blocks, skip)
+        near_left.append(pairs[0])
+        near_right.append(pairs[1])
+
+    left = np.concatenate([exact_left] + near_left).astype(np.int64)
+    right = np.concatenate([exact_right] + near_right).astype(np.int64)
+    labels = connected_labels(len(data), left, right)
+
+    match = np.full(len(data), '', dtype=object)
+    duplicated = labels != np.arange(len(data))
+    match[duplicated] = 'quase'
+    exact = np.zeros(len(data), dtype=bool)
+    exact[exact_left] = True
+    match[duplicated & exact] = 'exato'
+    return DedupResult(
+        pd.Series(data.index[labels], index=data.index),
+        pd.Series(match, index=data.index),
+        len(data)
+    )
+
+
+def apply_dedup(data, result):
+    """Mantém só a linha canônica de cada grupo de duplicatas"""
+    keep = result.canonical.reindex(data.index).to_numpy() == data.index.to_numpy()
+    return data[keep]
+
+
+def dedup_map(data, result):
+    """Mapa Observation ID -> ID mantido, só das duplicatas"""
+    duplicates = result.duplicates
+    return pd.DataFrame({
+        ID_COLUMN: data.loc[duplicates, ID_COLUMN].to_numpy(),
+        'Canonical ID': data.loc[result.canonical[duplicates], ID_COLUMN].to_numpy(),
+        'Match': result.match[duplicates].to_numpy(),
+    })
+
+
+def dedup_map_path(csv_file):
+    root, _ = os.path.splitext(csv_file)
+    return f"{root}_dedup_map.csv"
+
+
+def write_dedup_map(data, result, path):
+    dedup_map(data, result).to_csv(path, index=False)
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+
+
+GROUP_COLUMNS = ['Common Name', 'Age Class']
+MEASURE_COLUMNS = ['Observed Length (m)', 'Observed Weight (kg)']
+
+# Valores são contados nessa resolução; com medidas de até 2 casas decimais
+# as estatísticas saem exatas e as contagens de blocos diferentes se somam.
+RESOLUTION = 0.01
+
+# Grupos com menos medições que isso não têm cercas (nada é marcado)
+MIN_GROUP_SIZE = 5
+
+# Fator que torna o MAD comparável ao desvio padrão numa distribuição normal
+MAD_SCALE = 1.4826
+
+METHODS = {
+    'mad': 3.5,   # |x - mediana| > 3.5 * MAD escalado (z-score robusto)
+    'iqr': 1.5,   # fora de [Q1 - 1.5 * IQR, Q3 + 1.5 * IQR]
+}
+
+
+def measure_distribution(data, measure, groups=GROUP_COLUMNS):
+    """Contagem de cada valor (na RESOLUTION) por grupo, numa única agregação"""
+    values = pd.to_numeric(data[measure], errors='coerce')
+    frame = data[groups].assign(value=np.round(values / RESOLUTION).astype('Int64'))
+    return frame.dropna().groupby(groups + ['value']).size().rename('count')
+
+
+def merge_distributions(distributions):
+    """Soma as distribuições de vários blocos do arquivo"""
+    distributions = [dist for dist in distributions if len(dist)]
+    if not distributions:
+        return pd.Series(dtype='int64', name='count')
+    return pd.concat(distributions).groupby(level=list(range(distributions[0].index.nlevels))).sum()
+
+
+def weighted_quantiles(values, counts, group_ids, quantiles):
+    """Quantis (interpolação linear, como o pandas) de todos os grupos de uma vez.
+
+    values/counts/group_ids devem estar ordenados por grupo e valor.
+    """
+    group_sizes = np.bincount(group_ids, weights=counts).astype(np.int64)
+    group_start = np.concatenate([[0], np.cumsum(group_sizes)[:-1]])
+    cumulative = np.cumsum(counts)
+    result = {}
+    for q in quantiles:
+        position = q * (group_sizes - 1)
+        lower, upper = np.floor(position).astype(np.int64), np.ceil(position).astype(np.int64)
+        low_values = values[np.searchsorted(cumulative, group_start + lower, side='right')]
+        high_values = values[np.searchsorted(cumulative, group_start + upper, side='right')]
+        result[q] = low_values + (high_values - low_values) * (position - lower)
+    return result
+
+
+def group_fences(distribution, method='mad'):
+    """Estatísticas robustas e cercas de cada grupo a partir da distribuição.
+
+    Retorna um DataFrame indexado pelos grupos com n, median, q1, q3, mad,
+    low e high. Grupos pequenos ou sem dispersão ficam sem cercas (NaN).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método de outliers desconhecido: {method}")
+    group_levels = distribution.index.names[:-1]
+    frame = distribution.reset_index()
+    if frame.empty:
+        return pd.DataFrame(columns=['n', 'median', 'q1', 'q3', 'mad', 'low', 'high'])
+    frame = frame.sort_values(group_levels + ['value'])
+    group_ids = frame.groupby(group_levels, sort=False).ngroup().to_numpy()
+    keys = frame.drop_duplicates(group_levels)[group_levels]
+    values = frame['value'].to_numpy(dtype=float) * RESOLUTION
+    counts = frame['count'].to_numpy(dtype=np.int64)
+
+    quantiles = weighted_quantiles(values, counts, group_ids, [0.25, 0.5, 0.75])
+    median = quantiles[0.5]
+
+    # MAD: mediana dos desvios absolutos, pela mesma rotina ponderada
+    deviations = np.abs(values - median[group_ids])
+    order = np.lexsort((deviations, group_ids))
+    mad = weighted_quantiles(deviations[order], counts[order], group_ids[order], [0.5])[0.5]
+
+    fences = pd.DataFrame({
+        'n': np.bincount(group_ids, weights=counts).astype(np.int64),
+        'median': median,
+        'q1': quantiles[0.25],
+        'q3': quantiles[0.75],
+        'mad': mad,
+    }, index=pd.MultiIndex.from_frame(keys))
+    factor = METHODS[method]
+    if method == 'mad':
+        spread = factor * MAD_SCALE * fences['mad']
+        fences['low'], fences['high'] = fences['median'] - spread, fences['median'] + spread
+    else:
+        iqr = fences['q3'] - fences['q1']
+        fences['low'], fences['high'] = fences['q1'] - factor * iqr, fences['q3'] + factor * iqr
+    no_fence = (fences['n'] < MIN_GROUP_SIZE) | (fences['high'] <= fences['low'])
+    fences.loc[no_fence, ['low', 'high']] = np.nan
+    return fences
+
+
+def flag_outliers(data, fences, groups=GROUP_COLUMNS):
+    """Marca, para cada medida, as linhas fora das cercas do seu grupo.
+
+    fences é {medida: DataFrame de group_fences}. Retorna um DataFrame
+    booleano com uma coluna por medida, alinhado ao índice de data.
+    """
+    keys = pd.MultiIndex.from_frame(data[groups])
+    flags = pd.DataFrame(index=data.index)
+    for measure, measure_fences in fences.items():
+        if measure_fences.empty:
+            flags[measure] = False
+            continue
+        values = pd.to_numeric(data[measure], errors='coerce').to_numpy(dtype=float)
+        low = measure_fences['low'].reindex(keys).to_numpy(dtype=float)
+        high = measure_fences['high'].reindex(keys).to_numpy(dtype=float)
+        with np.errstate(invalid='ignore'):
+            flags[measure] = (values < low) | (values > high)
+    return flags
+
+
+class OutlierResult:
+
+    def __init__(self, method, fences, outliers, total_rows):
+        self.method = method
+        # {medida: cercas por grupo}
+        self.fences = fences
+        # Linhas marcadas, com a coluna 'Outlier Measures'
+        self.outliers = outliers
+        self.total_rows = total_rows
+
+    @property
+    def counts(self):
+        return {measure: int(self.outliers['Outlier Measures'].str.contains(measure, regex=False).sum())
+                for measure in self.fences}
+
+
+def outlier_rows(data, flags):
+    """Linhas com alguma medida marcada, com a lista das medidas em 'Outlier Measures'"""
+    flagged = flags.any(axis=1)
+    rows = data[flagged].copy()
+    labels = pd.Series('', index=rows.index)
+    for measure in flags.columns:
+        labels = labels.where(~flags.loc[flagged, measure], labels + measure + ';')
+    rows['Outlier Measures'] = labels.str.rstrip(';')
+    return rows
+
+
+def detect_outliers(data, method='mad', measures=MEASURE_COLUMNS):
+    """Detecta outliers por espécie e classe etária num DataFrame em memória"""
+    fences = {measure: group_fences(measure_distribution(data, measure), method) for measure in measures}
+    return OutlierResult(method, fences, outlier_rows(data, flag_outliers(data, fences)), len(data))
+
+
+def scan_chunks(read_chunks, method='mad', measures=MEASURE_COLUMNS):
+    """Detecta outliers percorrendo os dados em blocos, sem carregá-los inteiros.
+
+    read_chunks() devolve um iterador de DataFrames e é chamado duas vezes:
+    a primeira leitura soma as distribuições de cada bloco; a segunda
+    marca as linhas de cada bloco pelas cercas finais.
+    """
+    distributions = {measure: [] for measure in measures}
+    for chunk in read_chunks():
+        for measure in measures:
+            distributions[measure].append(measure_distribution(chunk, measure))
+    fences = {measure: group_fences(merge_distributions(parts), method) for measure, parts in distributions.items()}
+
+    flagged, total_rows = [], 0
+    for chunk in read_chunks():
+        total_rows += len(chunk)
+        flagged.append(outlier_rows(chunk, flag_outliers(chunk, fences)))
+    outliers = pd.concat(flagged) if flagged else pd.DataFrame(columns=['Outlier Measures'])
+    return OutlierResult(method, fences, outliers, total_rows)
+
+
+def scan_csv(csv_file, method='mad', measures=MEASURE_COLUMNS, chunksize=50000):
+    """Detecta outliers lendo o CSV em blocos (ver scan_chunks)"""
+    return scan_chunks(lambda: pd.read_csv(csv_file, chunksize=chunksize), method, measures)
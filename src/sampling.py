@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+
+import io
+import math
+import os
+import time
+import numpy as np
+import pandas as pd
+from query_backends import PandasBackend, empty_summary, sort_counts
+
+
+STRATA_COLUMNS = ['Common Name', 'Country/Region']
+
+# Linhas guardadas por estrato (espécie x país)
+ROWS_PER_STRATUM = 200
+
+# Tempo máximo de leitura do CSV para a amostra; o que não foi lido é extrapolado
+PREVIEW_SECONDS = 5.0
+
+# z da distribuição normal para intervalos de 95%
+Z_95 = 1.96
+
+DATE_COLUMN = 'Date of Observation'
+DATE_FORMAT = '%d-%m-%Y'
+
+
+class StratifiedSample:
+    """Amostra estratificada com o peso de cada linha (linhas do estrato / amostradas).
+
+    complete indica se o arquivo inteiro foi lido; caso contrário os
+    tamanhos dos estratos são extrapolados pela fração de bytes lida
+    (em blocos sorteados pelo arquivo todo).
+    """
+
+    def __init__(self, data, stratum, sizes, rows_read, fraction_read):
+        self.data = data
+        # Código do estrato de cada linha da amostra
+        self.stratum = stratum
+        # Linhas de cada estrato na população (índice = código do estrato)
+        self.sizes = sizes
+        self.rows_read = rows_read
+        self.fraction_read = fraction_read
+        sampled = stratum.value_counts()
+        self.weights = stratum.map(sizes / sampled).astype(float)
+
+    @property
+    def complete(self):
+        return self.fraction_read >= 1.0
+
+    @property
+    def population(self):
+        return float(self.sizes.sum())
+
+    def stratified_mean(self, values):
+        """(estimativa, meia largura do IC 95%) da média de values na população.
+
+        Estimador estratificado: média de cada estrato ponderada pelo seu
+        tamanho, com variância sum(W_h^2 * (1 - n_h/N_h) * s_h^2 / n_h).
+        """
+        frame = pd.DataFrame({'value': values, 'stratum': self.stratum}).dropna()
+        if frame.empty:
+            return float('nan'), float('nan')
+        grouped = frame.groupby('stratum')['value']
+        n = grouped.count()
+        sizes = self.sizes.reindex(n.index).astype(float)
+        share = sizes / sizes.sum()
+        estimate = float((share * grouped.mean()).sum())
+        fpc = (1 - n / sizes).clip(lower=0)
+        variance = float((share ** 2 * fpc * grouped.var(ddof=1).fillna(0.0) / n).sum())
+        return estimate, Z_95 * math.sqrt(variance)
+
+    def count_interval(self, indicator):
+        """(contagem estimada, meia largura do IC 95%) das linhas com indicator verdadeiro"""
+        proportion, half_width = self.stratified_mean(indicator.astype(float))
+        return proportion * self.population, half_width * self.population
+
+
+def row_blocks(csv_file, block_bytes):
+    """(cabeçalho, [(início, fim)]) dos blocos de bytes que cobrem as linhas de dados"""
+    with open(csv_file, 'rb') as f:
+        header = f.readline()
+    data_start = len(header)
+    total_bytes = os.path.getsize(csv_file)
+    block_bytes = max(int(block_bytes), 1)
+    starts = range(data_start, max(total_bytes, data_start + 1), block_bytes)
+    return header, [(start, min(start + block_bytes, total_bytes)) for start in starts]
+
+
+def read_block(f, header, start, end, data_start):
+    """Linhas que começam em [start, end): alinha no início de linha e
+    completa a última linha depois de end"""
+    if start > data_start:
+        f.seek(start - 1)
+        f.readline()
+    else:
+        f.seek(start)
+    position = f.tell()
+    if position >= end:
+        return None
+    raw = f.read(end - position)
+    if raw and not raw.endswith(b'\n'):
+        raw += f.readline()
+    if not raw.strip():
+        return None
+    return pd.read_csv(io.BytesIO(header + raw))
+
+
+def draw_sample(csv_file, strata=STRATA_COLUMNS, per_stratum=ROWS_PER_STRATUM, seconds=PREVIEW_SECONDS,
+                chunksize=50000, row_filter=None, seed=None):
+    """Lê blocos do CSV em ordem aleatória mantendo, por estrato, as
+    per_stratum linhas de menor chave aleatória.
+
+    Guardar as k menores chaves é uma amostra uniforme sem reposição do
+    estrato (equivale a um reservatório). Os blocos têm cerca de chunksize
+    linhas e são sorteados pelo arquivo todo, não só pelo começo dele: se a
+    leitura parar após seconds, os tamanhos dos estratos são extrapolados
+    pela fração de bytes lida. row_filter, se informado, é aplicado a cada
+    bloco (ex.: validação).
+    """
+    rng = np.random.default_rng(seed)
+    with open(csv_file, 'rb') as f:
+        head = [f.readline() for _ in range(1001)]
+    # Tamanho médio das linhas no começo do arquivo, só para dimensionar os blocos
+    row_bytes = sum(len(line) for line in head[1:]) / max(sum(1 for line in head[1:] if line), 1)
+    header, blocks = row_blocks(csv_file, chunksize * max(row_bytes, 1))
+    data_bytes = (blocks[-1][1] - blocks[0][0]) or 1
+    started = time.monotonic()
+    sample = None
+    sizes = None
+    rows_read = 0
+    bytes_read = 0
+    blocks_read = 0
+    with open(csv_file, 'rb') as f:
+        for i in rng.permutation(len(blocks)):
+            start, end = blocks[i]
+            chunk = read_block(f, header, start, end, blocks[0][0])
+            bytes_read += end - start
+            blocks_read += 1
+            if chunk is not None:
+                # Índice = posição no arquivo, para devolver a amostra na ordem original
+                chunk.index = start + np.arange(len(chunk))
+                if row_filter is not None:
+                    chunk = row_filter(chunk)
+                rows_read += len(chunk)
+                chunk = chunk.assign(_key=rng.random(len(chunk)))
+                chunk_sizes = chunk.groupby(strata, dropna=False).size()
+                sizes = chunk_sizes if sizes is None else sizes.add(chunk_sizes, fill_value=0)
+                pool = chunk if sample is None else pd.concat([sample, chunk])
+                sample = pool.sort_values('_key', kind='stable').groupby(strata, dropna=False, sort=False).head(per_stratum)
+            if time.monotonic() - started >= seconds:
+                break
+    fraction_read = 1.0 if blocks_read == len(blocks) else min(bytes_read / data_bytes, 1.0)
+
+    if sample is None:
+        sample = pd.read_csv(csv_file, nrows=0).assign(_key=[])
+        sizes = pd.Series(dtype=float)
+    sample = sample.sort_index(kind='stable').drop(columns='_key').reset_index(drop=True)
+    codes = pd.Series(np.arange(len(sizes)), index=sizes.index)
+    keys = pd.MultiIndex.from_frame(sample[strata]) if len(strata) > 1 else pd.Index(sample[strata[0]])
+    stratum = pd.Series(codes.reindex(keys).to_numpy(), index=sample.index)
+    population = pd.Series(sizes.to_numpy(dtype=float) / max(fraction_read, 1e-9), index=codes.to_numpy())
+    return StratifiedSample(sample, stratum, population, rows_read, fraction_read)
+
+
+def weighted_quantile(values, weights, q):
+    order = np.argsort(values, kind='stable')
+    values, weights = values[order], weights[order]
+    # Posição de cada valor na distribuição acumulada (ponto médio do seu peso)
+    positions = (np.cumsum(weights) - weights / 2) / weights.sum()
+    return float(np.interp(q, positions, values))
+
+
+class SampleBackend(PandasBackend):
+    """Consultas dos relatórios estimadas a partir de uma amostra estratificada.
+
+    Contagens são somas dos pesos (arredondadas); médias, desvios,
+    quantis e correlações são ponderados. Contagens de valores distintos
+    e rankings vêm da própria amostra.
+    """
+
+    name = 'amostra'
+
+    def __init__(self, sample):
+        super().__init__(lambda: sample.data)
+        self.sample = sample
+
+    def weighted_counts(self, keys):
+        counts = self.sample.weights.groupby(keys).sum()
+        return counts.round().astype(int)
+
+    def count(self):
+        return int(round(self.sample.population))
+
+    def value_counts(self, column):
+        return sort_counts(self.weighted_counts(self.sample.data[column]))
+
+    def numeric_summary(self, column):
+        values = self.sample.data[column]
+        valid = values.notna()
+        if not valid.any():
+            return empty_summary()
+        x = values[valid].to_numpy(dtype=float)
+        w = self.sample.weights[valid].to_numpy(dtype=float)
+        mean = float(np.average(x, weights=w))
+        std = math.sqrt(np.sum(w * (x - mean) ** 2) / (w.sum() - 1)) if w.sum() > 1 else float('nan')
+        return {
+            'count': int(round(w.sum())),
+            'mean': mean,
+            'median': weighted_quantile(x, w, 0.5),
+            'std': std,
+            'min': x.min(),
+            'max': x.max(),
+            'q1': weighted_quantile(x, w, 0.25),
+            'q3': weighted_quantile(x, w, 0.75)
+        }
+
+    def null_counts(self):
+        return self.sample.data.isnull().mul(self.sample.weights, axis=0).sum().round().astype(int)
+
+    def group_sizes(self, columns, where_column=None, where_values=None):
+        data = self.sample.data
+        weights = self.sample.weights
+        if where_column is not None:
+            keep = data[where_column].isin(where_values)
+            data, weights = data[keep], weights[keep]
+        counts = weights.groupby([data[col] for col in columns]).sum().round().astype(int)
+        return counts.reset_index(name='Count')
+
+    def subset_means(self, column, value, mean_columns):
+        data = self.sample.data
+        subset = data[column] == value
+        weights = self.sample.weights[subset]
+        means = {}
+        for col in mean_columns:
+            valid = data.loc[subset, col].notna()
+            means[col] = (np.average(data.loc[subset, col][valid], weights=weights[valid])
+                          if valid.any() else float('nan'))
+        return int(round(weights.sum())), means
+
+    def correlation(self, a, b):
+        data = self.sample.data
+        valid = data[a].notna() & data[b].notna()
+        w = self.sample.weights[valid].to_numpy(dtype=float)
+        if valid.sum() < 2:
+            return int(round(w.sum())), float('nan')
+        x, y = data.loc[valid, a].to_numpy(dtype=float), data.loc[valid, b].to_numpy(dtype=float)
+        cov = np.cov(x, y, aweights=w)
+        return int(round(w.sum())), float(cov[0, 1] / math.sqrt(cov[0, 0] * cov[1, 1]))
+
+    def bucket_counts(self, column, edges, labels, missing_label):
+        values = self.sample.data[column]
+        buckets = pd.cut(values, [-math.inf] + list(edges) + [math.inf], right=False, labels=labels)
+        buckets = buckets.astype(object).where(values.notna(), missing_label)
+        return sort_counts(self.weighted_counts(buckets))
+
+    def year_counts(self, column, date_format=DATE_FORMAT):
+        dates = pd.to_datetime(self.sample.data[column], format=date_format, errors='coerce')
+        years = dates.dt.year
+        return self.weighted_counts(years[years.notna()].astype(int)).sort_index()
+
+
+def confidence_lines(sample, columns, top=5):
+    """Linhas de texto com IC 95% das médias (colunas numéricas) e das
+    contagens/proporções das categorias mais frequentes (demais colunas)"""
+    data = sample.data
+    lines = []
+    if sample.complete:
+        lines.append(f"Total de registros: {sample.population:.0f} (exato)")
+    else:
+        lines.append(f"Total de registros: ~{sample.population:.0f} (extrapolado de "
+                     f"{sample.fraction_read * 100:.1f}% do arquivo, em blocos sorteados)")
+    for column in columns or []:
+        if column not in data.columns:
+            continue
+        values = data[column]
+        if column == DATE_COLUMN:
+            values = pd.to_datetime(values, format=DATE_FORMAT, errors='coerce').dt.year.astype('Int64')
+        elif pd.api.types.is_numeric_dtype(values):
+            estimate, half_width = sample.stratified_mean(values)
+            if not math.isnan(estimate):
+                lines.append(f"Média de {column}: {estimate:.2f} ± {half_width:.2f}")
+            continue
+        for value in values.value_counts().index[:top]:
+            estimate, half_width = sample.count_interval((values == value).fillna(False))
+            share = estimate / sample.population * 100 if sample.population else 0.0
+            half_share = half_width / sample.population * 100 if sample.population else 0.0
+            lines.append(f"{column} = {value}: ~{estimate:.0f} ± {half_width:.0f} "
+                         f"({share:.1f}% ± {half_share:.1f}%)")
+    return lines
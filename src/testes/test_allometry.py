@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+import pytest
+from allometry import GLOBAL_KEY, fit_allometry, impute_measurements, predict_length, predict_weight
+from crocodile_analyzer_terminal import CrocodileAnalyzer
+
+
+@pytest.fixture
+def allometric_data():
+    """Duas espécies com pesos exatamente iguais a a * comprimento^b"""
+    lengths = np.array([1.0, 1.5, 2.0, 3.0, 4.0])
+    return pd.DataFrame({
+        'Common Name': ['Alpha'] * 5 + ['Beta'] * 5 + ['Gamma'],
+        'Observed Length (m)': list(lengths) + list(lengths) + [2.0],
+        'Observed Weight (kg)': list(10 * lengths ** 3) + list(5 * lengths ** 2) + [30.0],
+    })
+
+
+@pytest.fixture
+def missing_csv_file(tmp_path):
+    
+    csv_content = """Observation ID,Common Name,Scientific Name,Family,Genus,Observed Length (m),Observed Weight (kg),Age Class,Sex,Date of Observation,Country/Region,Habitat Type,Conservation Status,Observer Name,Notes
+1,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,1.0,10,Adult,Male,31-03-2018,Belize,Swamps,Least Concern,Allison Hill,Note
+2,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,2.0,80,Adult,Male,28-01-2015,Mexico,Rivers,Least Concern,Brandon Hall,Note
+3,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,3.0,270,Adult,Male,07-12-2010,Mexico,Rivers,Least Concern,Melissa Peterson,Note
+4,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,1.5,,Juvenile,Male,01-11-2019,Mexico,Rivers,Least Concern,Edward Fuller,Note
+5,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,,640,Adult,Female,15-07-2019,Belize,Swamps,Least Concern,Donald Reid,Note"""
+    
+    csv_file = tmp_path / "missing_crocodiles.csv"
+    csv_file.write_text(csv_content)
+    return str(csv_file)
+
+
+class TestAllometry:
+
+    def test_1_fit_recovers_per_species_coefficients(self, allometric_data):
+        coefficients = fit_allometry(allometric_data)
+
+        assert coefficients.loc['Alpha', 'slope'] == pytest.approx(3.0)
+        assert coefficients.loc['Alpha', 'intercept'] == pytest.approx(np.log(10))
+        assert coefficients.loc['Beta', 'slope'] == pytest.approx(2.0)
+        assert coefficients.loc['Beta', 'r_log'] == pytest.approx(1.0)
+        assert coefficients.loc['Alpha', 'n'] == 5
+
+    def test_2_small_groups_fall_back_to_global_fit(self, allometric_data):
+        coefficients = fit_allometry(allometric_data)
+
+        assert np.isnan(coefficients.loc['Gamma', 'slope'])
+        assert coefficients.loc[GLOBAL_KEY, 'n'] == 11
+        expected = np.exp(coefficients.loc[GLOBAL_KEY, 'intercept'] + coefficients.loc[GLOBAL_KEY, 'slope'] * np.log(2.0))
+        assert predict_weight(coefficients, 'Gamma', [2.0])[0] == pytest.approx(expected)
+
+    def test_3_predict_weight_and_length_in_batch(self, allometric_data):
+        coefficients = fit_allometry(allometric_data)
+
+        weights = predict_weight(coefficients, ['Alpha', 'Beta'], [2.5, 2.5])
+        assert weights == pytest.approx([10 * 2.5 ** 3, 5 * 2.5 ** 2])
+        lengths = predict_length(coefficients, 'Alpha', [80.0, 640.0])
+        assert lengths == pytest.approx([2.0, 4.0])
+
+    def test_4_impute_measurements(self, allometric_data):
+        data = allometric_data.copy()
+        data.loc[1, 'Observed Weight (kg)'] = np.nan
+        data.loc[6, 'Observed Length (m)'] = np.nan
+        coefficients = fit_allometry(allometric_data)
+
+        imputed, counts = impute_measurements(data, coefficients)
+
+        assert counts == {'Observed Weight (kg)': 1, 'Observed Length (m)': 1}
+        assert imputed.loc[1, 'Observed Weight (kg)'] == pytest.approx(33.75)
+        assert imputed.loc[6, 'Observed Length (m)'] == pytest.approx(1.5)
+        assert np.isnan(data.loc[1, 'Observed Weight (kg)'])
+
+    def test_5_analyzer_imputes_at_load(self, missing_csv_file, capsys):
+        analyzer = CrocodileAnalyzer(missing_csv_file, impute=True)
+        analyzer.function_4_weight_statistics()
+
+        captured = capsys.readouterr()
+        assert "Total de medições válidas: 5" in captured.out
+        assert "Valores imputados pelo modelo alométrico: 1" in captured.out
+        assert analyzer.data['Observed Length (m)'].notna().all()
+
+    def test_6_analyzer_without_imputation_drops_missing(self, missing_csv_file, capsys):
+        analyzer = CrocodileAnalyzer(missing_csv_file)
+        analyzer.function_4_weight_statistics()
+
+        captured = capsys.readouterr()
+        assert "Total de medições válidas: 4" in captured.out
+        assert "imputados" not in captured.out
+
+    def test_7_species_allometry_report(self, missing_csv_file, capsys):
+        analyzer = CrocodileAnalyzer(missing_csv_file)
+        analyzer.function_22_species_allometry()
+
+        captured = capsys.readouterr()
+        assert "MODELO ALOMÉTRICO POR ESPÉCIE" in captured.out
+        assert "Morelet's Crocodile" in captured.out
+        assert "Ajuste global" in captured.out
+
+    def test_8_coefficients_cached_per_dataset_version(self, missing_csv_file):
+        analyzer = CrocodileAnalyzer(missing_csv_file)
+
+        assert analyzer.allometry() is analyzer.allometry()
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
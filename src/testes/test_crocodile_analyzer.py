@@ -423,5 +423,51 @@ class TestCrocodileAnalyzer:
                 assert "interrompido pelo usuário" in captured.out or "Digite sua opção" in captured.out
 
 
+    def test_31_background_loading(self, sample_csv_file):
+        """Testa a carga do dataset em segundo plano"""
+        analyzer = CrocodileAnalyzer(sample_csv_file, background=True)
+        analyzer.wait_until_loaded()
+
+        assert len(analyzer.data) == 5
+        assert analyzer.progress == 1.0
+        assert "Dataset carregado: 5 observações" in analyzer.load_status()
+
+
+    def test_32_background_loading_file_not_found(self):
+        """Testa o erro de arquivo inexistente na carga em segundo plano"""
+        analyzer = CrocodileAnalyzer("arquivo_inexistente.csv", background=True)
+
+        with pytest.raises(SystemExit):
+            analyzer.wait_until_loaded()
+        assert "Erro ao carregar dados" in analyzer.load_status()
+
+
+    def test_33_run_report_reads_only_needed_columns(self, sample_csv_file, capsys):
+        """Testa a projeção de colunas enquanto a carga completa não terminou"""
+        analyzer = CrocodileAnalyzer(sample_csv_file, background=True)
+        analyzer.wait_until_loaded()
+        # Simula a carga completa ainda em andamento
+        analyzer.loaded.clear()
+        analyzer._data = None
+
+        analyzer.run_report('function_2_species_count')
+
+        captured = capsys.readouterr()
+        assert "Total de espécies únicas: 4" in captured.out
+        assert 'Common Name' in analyzer.data.columns
+        assert 'Notes' not in analyzer.data.columns
+        assert len(analyzer.data) == 5
+
+
+    def test_34_show_menu_with_status(self, capsys):
+        """Testa a linha de status do carregamento no menu"""
+        from crocodile_analyzer_terminal import show_menu
+
+        show_menu("Carregando dataset em segundo plano...  50%")
+        captured = capsys.readouterr()
+        assert "Carregando dataset em segundo plano...  50%" in captured.out
+        assert "0.  Sair" in captured.out
+
+
 if __name__ == "__main__":
     pytest.main(["-v", __file__])
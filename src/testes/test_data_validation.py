@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+import pytest
+import pandas as pd
+from data_validation import VALIDATION_RULES, quarantine_path, validate_data
+from crocodile_analyzer_terminal import CrocodileAnalyzer
+
+
+HEADER = "Observation ID,Common Name,Scientific Name,Family,Genus,Observed Length (m),Observed Weight (kg),Age Class,Sex,Date of Observation,Country/Region,Habitat Type,Conservation Status,Observer Name,Notes"
+
+
+@pytest.fixture
+def dirty_csv_file(tmp_path):
+    
+    csv_content = HEADER + """
+1,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,1.9,62,Adult,Male,31-03-2018,Belize,Swamps,Least Concern,Allison Hill,Valid 1
+2,American Crocodile,Crocodylus acutus,Crocodylidae,Crocodylus,4.09,334.5,Adult,Male,28-01-2015,Venezuela,Mangroves,Vulnerable,Brandon Hall,Valid 2
+3,American Crocodile,Crocodylus acutus,Crocodylidae,Crocodylus,25.0,300.0,Adult,Male,02-02-2016,Venezuela,Mangroves,Vulnerable,Brandon Hall,Impossible length
+4,American Crocodile,Crocodylus acutus,Crocodylidae,Crocodylus,3.5,-10,Adult,Female,03-03-2017,Colombia,Rivers,Vulnerable,Donald Reid,Negative weight
+5,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,2.1,70,Juvenile,Male,31-02-2018,Mexico,Rivers,Least Concern,Edward Fuller,Invalid date
+6,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,2.0,65,Adult,Female,15-05-2019,Mexico,Rivers,Least Concern,Edward Fuller,Valid 3
+7,Morelet's Crocodile,Crocodylus acutus,Crocodylidae,Crocodylus,2.2,68,Adult,Male,16-05-2019,Belize,Swamps,Least Concern,Allison Hill,Wrong scientific name
+8,Mugger Crocodile,Crocodylus palustris,Crocodylidae,Crocodylus,3.75,269.4,Adult,Unknown,15-07-2019,India,Rivers,Vulnerable,Donald Reid,Valid 4"""
+    
+    csv_file = tmp_path / "dirty_crocodiles.csv"
+    csv_file.write_text(csv_content)
+    return str(csv_file)
+
+
+@pytest.fixture
+def non_numeric_csv_file(tmp_path):
+    """Um comprimento não numérico deixa a coluna inteira como texto no read_csv"""
+
+    csv_content = HEADER + """
+1,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,1.9,62,Adult,Male,31-03-2018,Belize,Swamps,Least Concern,Allison Hill,Valid 1
+2,American Crocodile,Crocodylus acutus,Crocodylidae,Crocodylus,abc,334.5,Adult,Male,28-01-2015,Venezuela,Mangroves,Vulnerable,Brandon Hall,Text length
+3,Mugger Crocodile,Crocodylus palustris,Crocodylidae,Crocodylus,3.75,269.4,Adult,Unknown,15-07-2019,India,Rivers,Vulnerable,Donald Reid,Valid 2"""
+
+    csv_file = tmp_path / "non_numeric_crocodiles.csv"
+    csv_file.write_text(csv_content)
+    return str(csv_file)
+
+
+class TestDataValidation:
+
+    def test_1_rules_flag_each_violation(self, dirty_csv_file):
+        result = validate_data(pd.read_csv(dirty_csv_file))
+
+        assert result.summary['comprimento_impossivel'] == 1
+        assert result.summary['peso_impossivel'] == 1
+        assert result.summary['data_invalida'] == 1
+        assert result.summary['data_futura'] == 0
+        assert result.summary['nome_cientifico_inconsistente'] == 1
+        assert result.total_rows == 8
+
+    def test_2_quarantine_separates_bad_rows(self, dirty_csv_file):
+        result = validate_data(pd.read_csv(dirty_csv_file))
+
+        assert sorted(result.quarantine['Observation ID']) == [3, 4, 5, 7]
+        assert sorted(result.valid_data['Observation ID']) == [1, 2, 6, 8]
+        rules = dict(zip(result.quarantine['Observation ID'], result.quarantine['Violated Rules']))
+        assert rules[3] == 'comprimento_impossivel'
+        assert rules[5] == 'data_invalida'
+        # O nome científico errado também torna o nome comum inconsistente
+        assert 'nome_cientifico_inconsistente' in rules[7]
+
+    def test_3_parsed_dates_only_for_valid_rows(self, dirty_csv_file):
+        result = validate_data(pd.read_csv(dirty_csv_file))
+
+        dates = result.parsed_dates['Date of Observation']
+        assert len(dates) == 4
+        assert dates.notna().all()
+
+    def test_4_missing_values_are_not_violations(self):
+        data = pd.DataFrame({
+            'Observed Length (m)': [1.5, None],
+            'Observed Weight (kg)': [None, 40.0],
+            'Date of Observation': [None, '01-01-2020']
+        })
+        result = validate_data(data)
+
+        assert result.quarantined_rows == 0
+        # Regras sobre colunas ausentes são ignoradas
+        assert 'nome_cientifico_inconsistente' not in result.summary
+
+    def test_5_unknown_rule_type(self):
+        with pytest.raises(ValueError):
+            validate_data(pd.DataFrame({'a': [1]}), rules=[{'name': 'x', 'type': 'nope'}])
+
+    def test_6_custom_rules(self):
+        data = pd.DataFrame({'Observed Length (m)': [1.0, 2.0, 3.0]})
+        rules = [{'name': 'curto', 'type': 'range', 'column': 'Observed Length (m)', 'min': 1.5, 'max': 10}]
+        result = validate_data(data, rules=rules)
+
+        assert result.summary == {'curto': 1}
+        assert len(VALIDATION_RULES) > len(rules)
+
+    def test_7_analyzer_quarantines_at_load(self, dirty_csv_file, capsys):
+        analyzer = CrocodileAnalyzer(dirty_csv_file)
+
+        captured = capsys.readouterr()
+        assert "4 registros inválidos movidos para quarentena" in captured.out
+        assert len(analyzer.data) == 4
+        quarantine = pd.read_csv(quarantine_path(dirty_csv_file))
+        assert len(quarantine) == 4
+        assert 'Violated Rules' in quarantine.columns
+
+    def test_8_analyzer_without_validation(self, dirty_csv_file):
+        analyzer = CrocodileAnalyzer(dirty_csv_file, validate=False)
+
+        assert analyzer.validation is None
+        assert len(analyzer.data) == 8
+
+    def test_9_data_quality_report(self, dirty_csv_file, capsys):
+        analyzer = CrocodileAnalyzer(dirty_csv_file)
+        analyzer.function_21_data_quality_report()
+
+        captured = capsys.readouterr()
+        assert "VALIDAÇÃO DE QUALIDADE DOS DADOS" in captured.out
+        assert "Registros em quarentena: 4" in captured.out
+        assert "comprimento_impossivel" in captured.out
+        assert "data_futura" in captured.out and "OK" in captured.out
+
+    def test_10_yearly_observations_reuses_parsed_dates(self, dirty_csv_file, capsys):
+        analyzer = CrocodileAnalyzer(dirty_csv_file)
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr('data_validation.parse_dates', lambda *a, **k: pytest.fail("datas convertidas de novo"))
+            analyzer.function_13_yearly_observations()
+
+        captured = capsys.readouterr()
+        assert "2015" in captured.out
+        assert "2016" not in captured.out
+
+    def test_11_non_numeric_measure_does_not_break_reports(self, non_numeric_csv_file, capsys):
+        analyzer = CrocodileAnalyzer(non_numeric_csv_file)
+
+        assert len(analyzer.data) == 2
+        assert pd.api.types.is_numeric_dtype(analyzer.data['Observed Length (m)'])
+        analyzer.run_report('function_3_size_statistics')
+        analyzer.run_report('function_4_weight_statistics')
+
+        captured = capsys.readouterr()
+        assert "1 registros inválidos movidos para quarentena" in captured.out
+        assert "2.83" in captured.out
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from deduplication import apply_dedup, connected_labels, dedup_map, dedup_map_path, find_duplicates
+from crocodile_analyzer_terminal import CrocodileAnalyzer
+
+
+@pytest.fixture
+def duplicate_csv_file(tmp_path):
+    """Linha 3 repete a 1 (caixa/espaços diferentes); 4 é quase igual à 2; 5 difere da 2 só nas notas"""
+
+    csv_content = """Observation ID,Common Name,Scientific Name,Family,Genus,Observed Length (m),Observed Weight (kg),Age Class,Sex,Date of Observation,Country/Region,Habitat Type,Conservation Status,Observer Name,Notes
+1,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,1.9,62,Adult,Male,31-03-2018,Belize,Swamps,Least Concern,Allison Hill,Seen near the river bank at dawn
+2,American Crocodile,Crocodylus acutus,Crocodylidae,Crocodylus,4.09,334.5,Adult,Male,28-01-2015,Venezuela,Mangroves,Vulnerable,Brandon Hall,Large male basking on a mud flat
+3,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,1.9,62,Adult,Male,31-03-2018,Belize,Swamps,Least Concern,allison hill,Seen  near the river bank at dawn
+4,American Crocodile,Crocodylus acutus,Crocodylidae,Crocodylus,4.10,336.0,Adult,Male,28-01-2015,Venezuela,Mangroves,Vulnerable,Brandon Hall,Male on mud flat
+5,American Crocodile,Crocodylus acutus,Crocodylidae,Crocodylus,2.5,120.0,Subadult,Male,28-01-2015,Venezuela,Mangroves,Vulnerable,Brandon Hall,Large male basking on a mud flat.
+6,American Crocodile,Crocodylus acutus,Crocodylidae,Crocodylus,4.09,334.5,Adult,Male,29-01-2015,Venezuela,Mangroves,Vulnerable,Brandon Hall,Large male basking on a mud flat
+7,Cuban Crocodile,Crocodylus rhombifer,Crocodylidae,Crocodylus,2.25,80.25,Subadult,Male,05-05-2021,Cuba,Swamps,Critically Endangered,Donald Reid,Resting in shallow water"""
+
+    csv_file = tmp_path / "duplicate_crocodiles.csv"
+    csv_file.write_text(csv_content)
+    return str(csv_file)
+
+
+class TestDeduplication:
+
+    def test_1_exact_duplicates_after_normalization(self, duplicate_csv_file):
+        data = pd.read_csv(duplicate_csv_file)
+        result = find_duplicates(data)
+
+        assert result.canonical[2] == 0
+        assert result.match[2] == 'exato'
+        assert result.exact_duplicates == 1
+
+    def test_2_near_duplicates_by_measurements_and_notes(self, duplicate_csv_file):
+        data = pd.read_csv(duplicate_csv_file)
+        result = find_duplicates(data)
+
+        # 4: medidas quase iguais; 5: mesmas notas (outra medida)
+        assert result.canonical[3] == 1
+        assert result.canonical[4] == 1
+        assert result.near_duplicates == 2
+
+    def test_3_different_block_is_not_duplicate(self, duplicate_csv_file):
+        data = pd.read_csv(duplicate_csv_file)
+        result = find_duplicates(data)
+
+        # Mesma observação em outra data não é duplicata
+        assert result.canonical[5] == 5
+        assert result.canonical[6] == 6
+        assert len(result.duplicates) == 3
+
+    def test_4_dedup_map_and_apply(self, duplicate_csv_file):
+        data = pd.read_csv(duplicate_csv_file)
+        result = find_duplicates(data)
+
+        mapping = dedup_map(data, result)
+        assert mapping['Observation ID'].tolist() == [3, 4, 5]
+        assert mapping['Canonical ID'].tolist() == [1, 2, 2]
+        assert apply_dedup(data, result)['Observation ID'].tolist() == [1, 2, 6, 7]
+
+    def test_5_connected_labels_chain(self):
+        labels = connected_labels(6, np.array([5, 3, 1]), np.array([3, 1, 0]))
+
+        assert labels.tolist() == [0, 0, 2, 0, 4, 0]
+
+    def test_6_analyzer_deduplicates_reports(self, duplicate_csv_file, capsys):
+        analyzer = CrocodileAnalyzer(duplicate_csv_file, deduplicate=True)
+        analyzer.function_2_species_count()
+
+        captured = capsys.readouterr()
+        assert "American Crocodile                  |   2 observações" in captured.out
+        assert len(analyzer.data) == 4
+        assert os.path.exists(dedup_map_path(duplicate_csv_file))
+
+    def test_7_duplicate_report(self, duplicate_csv_file, capsys):
+        analyzer = CrocodileAnalyzer(duplicate_csv_file)
+        analyzer.function_24_duplicate_report()
+
+        captured = capsys.readouterr()
+        assert "DUPLICATAS E QUASE DUPLICATAS" in captured.out
+        assert "Duplicatas exatas: 1" in captured.out
+        assert "Quase duplicatas: 2" in captured.out
+        assert len(analyzer.data) == 7
+
+    def test_8_empty_file_with_deduplicate(self, tmp_path, duplicate_csv_file):
+        header = open(duplicate_csv_file).readline()
+        csv_file = tmp_path / "empty.csv"
+        csv_file.write_text(header)
+
+        result = find_duplicates(pd.read_csv(csv_file))
+        assert result.total_rows == 0
+        assert len(result.duplicates) == 0
+
+        analyzer = CrocodileAnalyzer(str(csv_file), deduplicate=True)
+        assert len(analyzer.data) == 0
+
+    def test_9_observation_dates_follow_deduplicated_rows(self, duplicate_csv_file):
+        analyzer = CrocodileAnalyzer(duplicate_csv_file, deduplicate=True)
+        dates = analyzer.observation_dates()
+
+        assert len(dates) == len(analyzer.data)
+        assert dates.index.equals(analyzer.data.index)
+        assert dates.notna().all()
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
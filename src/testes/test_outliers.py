@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+import pytest
+from outliers import detect_outliers, group_fences, measure_distribution, scan_csv
+from crocodile_analyzer_terminal import CrocodileAnalyzer
+
+
+@pytest.fixture
+def grouped_data():
+    """Dois grupos em escalas diferentes, cada um com um valor fora da curva"""
+    rng = np.random.default_rng(7)
+    adults = np.round(rng.normal(4.0, 0.2, 40), 2)
+    juveniles = np.round(rng.normal(1.0, 0.1, 40), 2)
+    adults[0], juveniles[0] = 7.0, 3.0
+    return pd.DataFrame({
+        'Common Name': ['Alpha'] * 80 + ['Beta'] * 3,
+        'Age Class': ['Adult'] * 40 + ['Juvenile'] * 40 + ['Adult'] * 3,
+        'Observed Length (m)': list(adults) + list(juveniles) + [1.0, 1.1, 9.0],
+        'Observed Weight (kg)': [100.0] * 80 + [10.0, 11.0, 12.0],
+    })
+
+
+@pytest.fixture
+def outlier_csv_file(tmp_path):
+
+    rows = ["Observation ID,Common Name,Scientific Name,Family,Genus,Observed Length (m),Observed Weight (kg),Age Class,Sex,Date of Observation,Country/Region,Habitat Type,Conservation Status,Observer Name,Notes"]
+    lengths = [2.1, 2.3, 2.2, 2.4, 2.0, 2.25, 2.15, 7.0]
+    for i, length in enumerate(lengths, 1):
+        rows.append(f"{i},Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,{length},{length * 30:.1f},Adult,Male,31-03-2018,Belize,Swamps,Least Concern,Allison Hill,Note")
+
+    csv_file = tmp_path / "outlier_crocodiles.csv"
+    csv_file.write_text("\n".join(rows))
+    return str(csv_file)
+
+
+class TestOutliers:
+
+    def test_1_fences_match_grouped_pandas_statistics(self, grouped_data):
+        fences = group_fences(measure_distribution(grouped_data, 'Observed Length (m)'), 'iqr')
+        grouped = grouped_data.groupby(['Common Name', 'Age Class'])['Observed Length (m)']
+
+        expected = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+        mad = grouped.apply(lambda values: (values - values.median()).abs().median())
+        assert np.allclose(fences['q1'], expected[0.25].reindex(fences.index))
+        assert np.allclose(fences['median'], expected[0.5].reindex(fences.index))
+        assert np.allclose(fences['q3'], expected[0.75].reindex(fences.index))
+        assert np.allclose(fences['mad'], mad.reindex(fences.index))
+
+    def test_2_flags_are_relative_to_each_group(self, grouped_data):
+        result = detect_outliers(grouped_data)
+
+        # 3.0m é normal para adultos, mas não para os juvenis do grupo
+        assert {0, 40} <= set(result.outliers.index)
+        assert result.counts['Observed Length (m)'] == 2
+        assert (result.outliers['Outlier Measures'] == 'Observed Length (m)').all()
+
+    def test_3_small_groups_are_not_flagged(self, grouped_data):
+        result = detect_outliers(grouped_data, method='iqr')
+
+        assert 82 not in result.outliers.index
+        assert np.isnan(result.fences['Observed Length (m)'].loc[('Beta', 'Adult'), 'low'])
+
+    def test_4_constant_groups_are_not_flagged(self, grouped_data):
+        result = detect_outliers(grouped_data)
+
+        assert result.counts['Observed Weight (kg)'] == 0
+
+    def test_5_chunked_scan_matches_in_memory(self, grouped_data, tmp_path):
+        csv_file = tmp_path / "grouped.csv"
+        grouped_data.to_csv(csv_file, index=False)
+
+        in_memory = detect_outliers(grouped_data, method='iqr')
+        streamed = scan_csv(str(csv_file), method='iqr', chunksize=7)
+
+        assert list(streamed.outliers.index) == list(in_memory.outliers.index)
+        assert streamed.total_rows == len(grouped_data)
+        for measure, fences in in_memory.fences.items():
+            pd.testing.assert_frame_equal(streamed.fences[measure], fences)
+
+    def test_6_unknown_method_raises(self, grouped_data):
+        with pytest.raises(ValueError):
+            detect_outliers(grouped_data, method='zscore')
+
+    def test_7_analyzer_excludes_outliers_from_reports(self, outlier_csv_file, capsys):
+        analyzer = CrocodileAnalyzer(outlier_csv_file, exclude_outliers=True)
+        analyzer.function_10_largest_specimens()
+
+        captured = capsys.readouterr()
+        assert len(analyzer.data) == 7
+        assert "7.00m" not in captured.out
+        assert " 2.40m" in captured.out
+
+    def test_8_outlier_report(self, outlier_csv_file, capsys):
+        analyzer = CrocodileAnalyzer(outlier_csv_file)
+        analyzer.function_23_outlier_detection()
+
+        captured = capsys.readouterr()
+        assert "OUTLIERS POR ESPÉCIE E CLASSE ETÁRIA" in captured.out
+        assert "Registros marcados: 1" in captured.out
+        assert "7.00" in captured.out
+        assert len(analyzer.data) == 8
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
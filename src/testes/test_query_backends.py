@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+import io
+import os
+import shutil
+import contextlib
+import pytest
+from crocodile_analyzer_terminal import CrocodileAnalyzer, REPORT_COLUMNS
+from query_backends import SQLiteBackend
+
+
+# Relatórios que dependem do DataFrame pandas e não passam pelo backend
+PANDAS_ONLY_REPORTS = ['function_1_basic_info', 'function_21_data_quality_report', 'function_22_species_allometry',
+                       'function_24_duplicate_report']
+BACKEND_REPORTS = [name for name in REPORT_COLUMNS if name not in PANDAS_ONLY_REPORTS]
+
+
+@pytest.fixture
+def edge_case_csv_file(tmp_path):
+    """Dados com valores ausentes, empates e uma data inexistente (31-02)"""
+    
+    csv_content = """Observation ID,Common Name,Scientific Name,Family,Genus,Observed Length (m),Observed Weight (kg),Age Class,Sex,Date of Observation,Country/Region,Habitat Type,Conservation Status,Observer Name,Notes
+1,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,1.9,62,Adult,Male,31-03-2018,Belize,Swamps,Least Concern,Allison Hill,Note 1
+2,American Crocodile,Crocodylus acutus,Crocodylidae,Crocodylus,4.09,334.5,Adult,Male,28-01-2015,Venezuela,Mangroves,Vulnerable,Brandon Hall,
+3,Orinoco Crocodile,Crocodylus intermedius,Crocodylidae,Crocodylus,,118.2,Juvenile,Unknown,31-02-2010,Venezuela,Flooded Savannas,Critically Endangered,Melissa Peterson,Note 3
+4,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,4.09,,Adult,Male,01-11-2019,Mexico,Rivers,Least Concern,Edward Fuller,Note 4
+5,Mugger Crocodile,Crocodylus palustris,Crocodylidae,Crocodylus,3.75,269.4,,Unknown,15-07-2019,,Rivers,Vulnerable,Donald Reid,Note 5
+6,American Crocodile,Crocodylus acutus,Crocodylidae,Crocodylus,0.9,12.5,Juvenile,Female,,Colombia,Rivers,Vulnerable,Allison Hill,Note 6
+7,Cuban Crocodile,Crocodylus rhombifer,Crocodylidae,Crocodylus,4.5,200,Adult,Female,05-05-2021,Cuba,Swamps,Critically Endangered,Brandon Hall,Note 7
+8,Cuban Crocodile,Crocodylus rhombifer,Crocodylidae,Crocodylus,2.25,80.25,Subadult,Male,05-05-2021,Cuba,Swamps,Critically Endangered,Donald Reid,Note 8"""
+    
+    csv_file = tmp_path / "edge_crocodiles.csv"
+    csv_file.write_text(csv_content)
+    return str(csv_file)
+
+
+def run_reports(csv_file, backend, validate=True):
+    """Saída de cada relatório; os backends SQL aplicam as regras de validação em SQL"""
+    analyzer = CrocodileAnalyzer(csv_file, validate=validate, backend=backend)
+    outputs = {}
+    for name in BACKEND_REPORTS:
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            analyzer.run_report(name)
+        outputs[name] = buffer.getvalue()
+    analyzer.backend.close()
+    return outputs
+
+
+@pytest.fixture
+def dirty_numeric_csv_file(tmp_path):
+    """Um comprimento não numérico: o arquivo inteiro lê a coluna como texto"""
+
+    csv_content = """Observation ID,Common Name,Scientific Name,Family,Genus,Observed Length (m),Observed Weight (kg),Age Class,Sex,Date of Observation,Country/Region,Habitat Type,Conservation Status,Observer Name,Notes
+1,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,1.9,62,Adult,Male,31-03-2018,Belize,Swamps,Least Concern,Allison Hill,Note 1
+2,American Crocodile,Crocodylus acutus,Crocodylidae,Crocodylus,abc,334.5,Adult,Male,28-01-2015,Venezuela,Mangroves,Vulnerable,Brandon Hall,Note 2
+3,Mugger Crocodile,Crocodylus palustris,Crocodylidae,Crocodylus,3.75,269.4,Adult,Unknown,15-07-2019,India,Rivers,Vulnerable,Donald Reid,Note 3"""
+
+    csv_file = tmp_path / "dirty_numeric_crocodiles.csv"
+    csv_file.write_text(csv_content)
+    return str(csv_file)
+
+
+class TestQueryBackendParity:
+
+    # Sem validação o próprio pandas não roda os relatórios numéricos no arquivo sujo
+    @pytest.mark.parametrize("csv_fixture,validate", [
+        ("edge_case_csv_file", True),
+        ("edge_case_csv_file", False),
+        ("dirty_numeric_csv_file", True),
+    ])
+    @pytest.mark.parametrize("backend", ["sqlite", "duckdb"])
+    def test_1_reports_match_pandas(self, request, csv_fixture, backend, validate):
+        if backend == "duckdb":
+            pytest.importorskip("duckdb")
+        csv_file = request.getfixturevalue(csv_fixture)
+        expected = run_reports(csv_file, "pandas", validate)
+        actual = run_reports(csv_file, backend, validate)
+
+        for name in BACKEND_REPORTS:
+            assert actual[name] == expected[name], name
+
+    @pytest.mark.parametrize("backend", ["sqlite", "duckdb"])
+    def test_2_reports_match_pandas_on_full_dataset(self, tmp_path, backend):
+        if backend == "duckdb":
+            pytest.importorskip("duckdb")
+        source = os.path.join(os.path.dirname(__file__), "..", "..", "crocodile_dataset.csv")
+        csv_file = str(tmp_path / "crocodile_dataset.csv")
+        shutil.copy(source, csv_file)
+
+        expected = run_reports(csv_file, "pandas")
+        actual = run_reports(csv_file, backend)
+
+        for name in BACKEND_REPORTS:
+            assert actual[name] == expected[name], name
+
+    def test_3_invalid_dates_are_ignored(self, edge_case_csv_file):
+        backend = SQLiteBackend(edge_case_csv_file, database=':memory:')
+        years = backend.year_counts('Date of Observation')
+
+        assert 2010 not in years.index
+        assert years[2021] == 2
+        backend.close()
+
+    def test_4_sqlite_database_is_reused(self, edge_case_csv_file):
+        first = SQLiteBackend(edge_case_csv_file)
+        first.close()
+        second = SQLiteBackend(edge_case_csv_file)
+
+        assert second.count() == 8
+        second.close()
+
+    def test_5_pandas_only_report_loads_dataframe(self, edge_case_csv_file, capsys):
+        analyzer = CrocodileAnalyzer(edge_case_csv_file, validate=False, backend="sqlite")
+        assert analyzer._data is None
+
+        analyzer.run_report('function_1_basic_info')
+
+        captured = capsys.readouterr()
+        assert "Total de observações: 8" in captured.out
+        analyzer.backend.close()
+
+    @pytest.mark.parametrize("backend", ["sqlite", "duckdb"])
+    def test_8_validation_rules_apply_in_sql(self, edge_case_csv_file, backend):
+        if backend == "duckdb":
+            pytest.importorskip("duckdb")
+        validated = CrocodileAnalyzer(edge_case_csv_file, backend=backend)
+        raw = CrocodileAnalyzer(edge_case_csv_file, validate=False, backend=backend)
+
+        # A linha com 31-02 vai para a quarentena no pandas e some do SQL
+        assert validated.backend.count() == 7
+        assert raw.backend.count() == 8
+        validated.backend.close()
+        raw.backend.close()
+
+    def test_9_sql_backend_opens_in_background(self, edge_case_csv_file):
+        analyzer = CrocodileAnalyzer(edge_case_csv_file, background=True, backend="sqlite")
+
+        assert analyzer.backend.count() == 7
+        assert analyzer.load_status() == "Backend de consultas: sqlite"
+        analyzer.backend.close()
+
+    def test_6_unknown_backend(self, edge_case_csv_file):
+        with pytest.raises(SystemExit):
+            CrocodileAnalyzer(edge_case_csv_file, backend="oracle")
+
+    def test_7_duckdb_queries_the_file_through_a_view(self, edge_case_csv_file):
+        pytest.importorskip("duckdb")
+        from query_backends import DuckDBBackend
+        backend = DuckDBBackend(edge_case_csv_file)
+
+        table_type = backend.scalar("SELECT table_type FROM information_schema.tables WHERE table_name = 'observations'")
+        assert table_type == 'VIEW'
+        assert backend.count() == 8
+        backend.close()
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
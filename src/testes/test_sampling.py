@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+import pytest
+from query_backends import PandasBackend
+from sampling import SampleBackend, confidence_lines, draw_sample
+from crocodile_analyzer_terminal import CrocodileAnalyzer
+
+
+@pytest.fixture
+def strata_csv_file(tmp_path):
+    """Três estratos (espécie x país) de tamanhos 40, 20 e 5"""
+    rng = np.random.default_rng(3)
+    data = pd.DataFrame({
+        'Observation ID': range(1, 66),
+        'Common Name': ['Alpha'] * 40 + ['Alpha'] * 20 + ['Beta'] * 5,
+        'Country/Region': ['Cuba'] * 40 + ['Belize'] * 20 + ['Cuba'] * 5,
+        'Observed Length (m)': np.round(np.r_[rng.normal(3, 0.5, 40), rng.normal(2, 0.5, 20), rng.normal(1, 0.1, 5)], 2),
+        'Age Class': ['Adult', 'Juvenile'] * 32 + ['Adult'],
+    })
+    csv_file = tmp_path / "strata_crocodiles.csv"
+    data.to_csv(csv_file, index=False)
+    return str(csv_file)
+
+
+@pytest.fixture
+def sample_csv_file(tmp_path):
+
+    csv_content = """Observation ID,Common Name,Scientific Name,Family,Genus,Observed Length (m),Observed Weight (kg),Age Class,Sex,Date of Observation,Country/Region,Habitat Type,Conservation Status,Observer Name,Notes
+1,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,1.9,62,Adult,Male,31-03-2018,Belize,Swamps,Least Concern,Allison Hill,Note 1
+2,American Crocodile,Crocodylus acutus,Crocodylidae,Crocodylus,4.09,334.5,Adult,Male,28-01-2015,Venezuela,Mangroves,Vulnerable,Brandon Hall,Note 2
+3,Orinoco Crocodile,Crocodylus intermedius,Crocodylidae,Crocodylus,1.08,118.2,Juvenile,Unknown,07-12-2010,Venezuela,Flooded Savannas,Critically Endangered,Melissa Peterson,Note 3
+4,Morelet's Crocodile,Crocodylus moreletii,Crocodylidae,Crocodylus,2.42,90.4,Adult,Male,01-11-2019,Mexico,Rivers,Least Concern,Edward Fuller,Note 4
+5,Mugger Crocodile,Crocodylus palustris,Crocodylidae,Crocodylus,3.75,269.4,Adult,Unknown,15-07-2019,India,Rivers,Vulnerable,Donald Reid,Note 5"""
+
+    csv_file = tmp_path / "sample_crocodiles.csv"
+    csv_file.write_text(csv_content)
+    return str(csv_file)
+
+
+class TestSampling:
+
+    def test_1_sample_is_capped_per_stratum(self, strata_csv_file):
+        sample = draw_sample(strata_csv_file, per_stratum=10, seed=1)
+
+        sizes = sample.data.groupby(['Common Name', 'Country/Region']).size()
+        assert sizes.to_dict() == {('Alpha', 'Belize'): 10, ('Alpha', 'Cuba'): 10, ('Beta', 'Cuba'): 5}
+        assert sample.complete
+        assert sample.population == 65
+
+    def test_2_weighted_counts_are_exact_for_strata(self, strata_csv_file):
+        backend = SampleBackend(draw_sample(strata_csv_file, per_stratum=10, seed=1))
+
+        assert backend.count() == 65
+        assert backend.value_counts('Common Name').to_dict() == {'Alpha': 60, 'Beta': 5}
+        assert backend.value_counts('Country/Region').to_dict() == {'Cuba': 45, 'Belize': 20}
+
+    def test_3_stratified_mean_interval_covers_exact_mean(self, strata_csv_file):
+        sample = draw_sample(strata_csv_file, per_stratum=10, seed=1)
+        exact = pd.read_csv(strata_csv_file)['Observed Length (m)'].mean()
+
+        estimate, half_width = sample.stratified_mean(sample.data['Observed Length (m)'])
+        assert half_width > 0
+        assert estimate - half_width <= exact <= estimate + half_width
+
+    def test_4_full_sample_matches_exact_answer(self, strata_csv_file):
+        sample = draw_sample(strata_csv_file, per_stratum=100, seed=1)
+        exact = PandasBackend(lambda: pd.read_csv(strata_csv_file))
+
+        estimate, half_width = sample.stratified_mean(sample.data['Observed Length (m)'])
+        summary = SampleBackend(sample).numeric_summary('Observed Length (m)')
+        assert half_width == 0
+        assert estimate == pytest.approx(exact.numeric_summary('Observed Length (m)')['mean'])
+        assert summary['median'] == pytest.approx(exact.numeric_summary('Observed Length (m)')['median'])
+        assert summary['count'] == 65
+
+    def test_5_time_budget_extrapolates_population(self, strata_csv_file):
+        sample = draw_sample(strata_csv_file, per_stratum=10, seconds=0, chunksize=13, seed=1)
+
+        assert not sample.complete
+        assert 0 < sample.rows_read < 65
+        assert sample.population > sample.rows_read
+        assert "extrapolado" in confidence_lines(sample, [])[0]
+
+    def test_6_confidence_lines(self, strata_csv_file):
+        sample = draw_sample(strata_csv_file, per_stratum=10, seed=1)
+
+        lines = confidence_lines(sample, ['Observed Length (m)', 'Age Class'])
+        assert lines[0] == "Total de registros: 65 (exato)"
+        assert lines[1].startswith("Média de Observed Length (m): ")
+        assert any(line.startswith("Age Class = Adult: ~") for line in lines)
+
+    def test_7_analyzer_runs_reports_on_sample_while_loading(self, sample_csv_file, capsys):
+        analyzer = CrocodileAnalyzer(sample_csv_file, background=True, preview=True)
+        analyzer.wait_until_loaded()
+        analyzer.sample_ready.wait()
+        # Simula a carga completa ainda em andamento
+        analyzer.loaded.clear()
+
+        assert analyzer.run_report('function_2_species_count') is True
+        captured = capsys.readouterr()
+        assert "PRÉVIA" in captured.out
+        assert "Intervalos de confiança (95%)" in captured.out
+        assert "Total de espécies únicas: 4" in captured.out
+        assert "modo prévia" in analyzer.load_status()
+
+    def test_8_exact_report_after_loading(self, sample_csv_file, capsys):
+        analyzer = CrocodileAnalyzer(sample_csv_file, background=True, preview=True)
+        analyzer.wait_until_loaded()
+
+        assert analyzer.run_report('function_2_species_count') is False
+        assert analyzer.run_report('function_1_basic_info') is False
+        captured = capsys.readouterr()
+        assert "PRÉVIA" not in captured.out
+
+    def test_9_partial_sample_is_not_a_prefix(self, strata_csv_file):
+        first_ids = set()
+        for seed in range(5):
+            sample = draw_sample(strata_csv_file, per_stratum=10, seconds=0, chunksize=13, seed=seed)
+            first_ids.add(int(sample.data['Observation ID'].min()))
+
+        # Os blocos são sorteados pelo arquivo todo, não lidos a partir do início
+        assert max(first_ids) > 13
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
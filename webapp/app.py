@@ -1,22 +1,160 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
+from werkzeug.middleware.proxy_fix import ProxyFix
 import psycopg2
 import redis
 import os
-import json
+import hashlib
+import math
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from cache import LocalCache
+from codec import CacheCodec
+from rollups import DIMENSIONS, RESOLUTIONS, CalendarRollups
+
+# allometry.py é o mesmo módulo do analisador de terminal (src/): na imagem é
+# copiado ao lado deste arquivo; fora dela, vem direto de src/
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if os.path.isdir(SRC_DIR) and SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+import allometry
 
 app = Flask(__name__)
 
 # Configurações
 DATABASE_URL = os.getenv('DATABASE_URL')
 REDIS_URL = os.getenv('REDIS_URL', 'redis://redis:6379')
+DATASET_PATH = os.getenv('DATASET_PATH', '/workspace/crocodile_dataset.csv')
+
+# Cache (TTL com jitter para evitar expiração simultânea das chaves)
+CACHE_TTL = int(os.getenv('CACHE_TTL', '300'))
+CACHE_TTL_JITTER = float(os.getenv('CACHE_TTL_JITTER', '0.1'))
+# TTL por chave: CACHE_TTL vale para um resultado que custa CACHE_TTL_REF_COST
+# segundos por CACHE_TTL_REF_BYTES bytes; mais caros por byte duram mais
+CACHE_TTL_MIN = int(os.getenv('CACHE_TTL_MIN', '60'))
+CACHE_TTL_MAX = int(os.getenv('CACHE_TTL_MAX', '1800'))
+CACHE_TTL_REF_COST = float(os.getenv('CACHE_TTL_REF_COST', '0.01'))
+CACHE_TTL_REF_BYTES = int(os.getenv('CACHE_TTL_REF_BYTES', '4096'))
+
+# Cache L1 em memória do processo, na frente do Redis
+L1_MAX_BYTES = int(os.getenv('L1_MAX_BYTES', str(32 * 1024 * 1024)))
+L1_MAX_ENTRIES = int(os.getenv('L1_MAX_ENTRIES', '2048'))
+L1_MAX_TTL = int(os.getenv('L1_MAX_TTL', '300'))
+CACHE_INVALIDATION_CHANNEL = os.getenv('CACHE_INVALIDATION_CHANNEL', 'cache-invalidate')
+
+# Pré-aquecimento do cache
+WARMUP_ON_STARTUP = os.getenv('WARMUP_ON_STARTUP', '1') == '1'
+WARMUP_WORKERS = int(os.getenv('WARMUP_WORKERS', '2'))
+WARMUP_TOP_VALUES = int(os.getenv('WARMUP_TOP_VALUES', '5'))
+WARMUP_REFRESH_INTERVAL = int(os.getenv('WARMUP_REFRESH_INTERVAL', '240'))
+DATASET_CHECK_INTERVAL = int(os.getenv('DATASET_CHECK_INTERVAL', '30'))
 
-# Conecta ao Redis
+# Rate limiting (token bucket por cliente e rota)
+RATE_LIMIT_CAPACITY = int(os.getenv('RATE_LIMIT_CAPACITY', '60'))
+RATE_LIMIT_REFILL_PER_SEC = float(os.getenv('RATE_LIMIT_REFILL_PER_SEC', '1'))
+
+# Controle de admissão para cálculos pandas (por worker)
+COMPUTE_CONCURRENCY = int(os.getenv('COMPUTE_CONCURRENCY', '4'))
+COMPUTE_QUEUE_DEPTH = int(os.getenv('COMPUTE_QUEUE_DEPTH', '8'))
+COMPUTE_QUEUE_TIMEOUT = float(os.getenv('COMPUTE_QUEUE_TIMEOUT', '5'))
+
+# Proxies reversos confiáveis na frente do app (0 = acesso direto, ignora X-Forwarded-For)
+TRUSTED_PROXY_HOPS = int(os.getenv('TRUSTED_PROXY_HOPS', '0'))
+if TRUSTED_PROXY_HOPS > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+
+# Conecta ao Redis; as entradas do cache usam um cliente binário
 r = redis.from_url(REDIS_URL, decode_responses=True)
+cache_r = redis.from_url(REDIS_URL)
+
+# Serialização das entradas do cache (vazio = melhor codec instalado)
+cache_codec = CacheCodec(
+    os.getenv('CACHE_SERIALIZER') or None,
+    os.getenv('CACHE_COMPRESSION') or None,
+    int(os.getenv('CACHE_COMPRESS_MIN_BYTES', '1024'))
+)
+
+def get_dataset_version(path):
+    """Versão do dataset derivada do mtime e tamanho do arquivo"""
+    stat = os.stat(path)
+    return hashlib.md5(f'{stat.st_mtime_ns}:{stat.st_size}'.encode()).hexdigest()[:12]
 
 # Carrega dataset
-df = pd.read_csv('/workspace/crocodile_dataset.csv')
+df = pd.read_csv(DATASET_PATH)
+dataset_version = get_dataset_version(DATASET_PATH)
+# Agregados de calendário da versão atual, servidos por /api/timeseries
+rollups = CalendarRollups(df)
+# Troca df/rollups/versão juntos no reload; o aquecimento lê os três sob o mesmo lock
+dataset_lock = threading.Lock()
+
+def cache_ttl(base=None):
+    """TTL do cache com jitter aleatório"""
+    base = CACHE_TTL if base is None else base
+    jitter = base * CACHE_TTL_JITTER
+    return max(1, int(base + random.uniform(-jitter, jitter)))
+
+def cost_ttl(cost, size):
+    """TTL (com jitter) pelo custo de recálculo por byte do resultado.
+
+    Cresce com a raiz da razão para o valor de referência e fica entre
+    CACHE_TTL_MIN e CACHE_TTL_MAX: relatórios caros e pequenos ficam mais
+    tempo; respostas grandes e baratas de recalcular expiram antes.
+    """
+    ratio = (cost / CACHE_TTL_REF_COST) / (max(size, 1) / CACHE_TTL_REF_BYTES)
+    base = min(max(CACHE_TTL * math.sqrt(ratio), CACHE_TTL_MIN), CACHE_TTL_MAX)
+    # Limita de novo depois do jitter: nenhum TTL sai de [CACHE_TTL_MIN, CACHE_TTL_MAX]
+    return min(max(cache_ttl(base), CACHE_TTL_MIN), CACHE_TTL_MAX)
+
+l1 = LocalCache(L1_MAX_BYTES, L1_MAX_ENTRIES)
+tier_stats = {'l1_hits': 0, 'l2_hits': 0, 'misses': 0}
+tier_stats_lock = threading.Lock()
+
+def record_tier(tier, count=1):
+    with tier_stats_lock:
+        tier_stats[tier] += count
+
+def l1_store(cache_key, result, size, cost, ttl):
+    """Guarda o resultado já decodificado no L1; size é o tamanho serializado (sem compressão)"""
+    l1.set(cache_key, result, size, cost, min(ttl, L1_MAX_TTL))
+
+def invalidate_cache(prefix='*'):
+    """Remove entradas do L1 deste worker e avisa os demais via pub/sub.
+
+    prefix='*' limpa tudo; caso contrário remove as chaves com o prefixo.
+    """
+    apply_invalidation(prefix)
+    try:
+        r.publish(CACHE_INVALIDATION_CHANNEL, prefix)
+    except Exception:
+        pass
+
+def apply_invalidation(prefix):
+    if prefix == '*':
+        l1.clear()
+    else:
+        l1.delete_prefix(prefix)
+
+def listen_invalidations():
+    """Aplica no L1 local as invalidações publicadas pelos outros workers"""
+    while True:
+        try:
+            pubsub = r.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+            for message in pubsub.listen():
+                if message.get('type') == 'message':
+                    apply_invalidation(message['data'])
+        except Exception as e:
+            print(f'Erro no canal de invalidação do cache: {e}')
+        # Reconecta; o L1 pode ter perdido mensagens enquanto estava desconectado
+        l1.clear()
+        time.sleep(1)
 
 def get_db_connection():
     conn = psycopg2.connect(DATABASE_URL)
@@ -36,18 +174,134 @@ def init_db():
     cur.close()
     conn.close()
 
-def get_cached_or_compute(cache_key, compute_func):
-    """Função para cache Redis"""
+# Token bucket atômico no Redis: retorna (permitido, segundos até o próximo token)
+TOKEN_BUCKET_SCRIPT = r.register_script('''
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(wait)}
+''')
+
+class ComputeSaturated(Exception):
+    """Limite de cálculos simultâneos (e da fila de espera) atingido"""
+
+    def __init__(self, retry_after):
+        super().__init__('Limite de cálculos simultâneos atingido')
+        self.retry_after = retry_after
+
+compute_slots = threading.BoundedSemaphore(COMPUTE_CONCURRENCY)
+compute_lock = threading.Lock()
+compute_pending = 0
+
+@contextmanager
+def compute_admission():
+    """Limita cálculos simultâneos; rejeita quando a fila de espera está cheia"""
+    global compute_pending
+    with compute_lock:
+        if compute_pending >= COMPUTE_CONCURRENCY + COMPUTE_QUEUE_DEPTH:
+            raise ComputeSaturated(math.ceil(COMPUTE_QUEUE_TIMEOUT))
+        compute_pending += 1
     try:
-        cached = r.get(cache_key)
+        if not compute_slots.acquire(timeout=COMPUTE_QUEUE_TIMEOUT):
+            raise ComputeSaturated(math.ceil(COMPUTE_QUEUE_TIMEOUT))
+        try:
+            yield
+        finally:
+            compute_slots.release()
+    finally:
+        with compute_lock:
+            compute_pending -= 1
+
+def get_client_id():
+    """Identifica o cliente pelo endereço remoto.
+
+    X-Forwarded-For só é considerado atrás de proxies confiáveis
+    (TRUSTED_PROXY_HOPS), via ProxyFix; caso contrário qualquer cliente
+    trocaria o cabeçalho a cada requisição para escapar do limite.
+    """
+    return request.remote_addr or 'unknown'
+
+def check_rate_limit(client_id, route):
+    """Consome um token do bucket do cliente na rota; retorna (permitido, retry_after)"""
+    try:
+        allowed, wait = TOKEN_BUCKET_SCRIPT(
+            keys=[f'ratelimit:{route}:{client_id}'],
+            args=[RATE_LIMIT_CAPACITY, RATE_LIMIT_REFILL_PER_SEC, time.time()]
+        )
+    except Exception:
+        # Sem Redis não há como limitar entre workers: deixa passar
+        return True, 0
+    return bool(int(allowed)), math.ceil(float(wait))
+
+@app.before_request
+def rate_limit():
+    if request.url_rule is None or not request.path.startswith('/api/'):
+        return None
+    allowed, retry_after = check_rate_limit(get_client_id(), request.url_rule.rule)
+    if not allowed:
+        response = jsonify({'error': 'Limite de requisições excedido'})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(max(retry_after, 1))
+        return response
+    return None
+
+@app.errorhandler(ComputeSaturated)
+def compute_saturated(error):
+    response = jsonify({'error': 'Servidor ocupado, tente novamente mais tarde'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+def get_cached_or_compute(cache_key, compute_func, ttl=None):
+    """Cache em dois níveis (L1 local + Redis); só as faltas passam pelo controle de admissão.
+
+    Sem ttl explícito, o TTL de um resultado calculado vem de cost_ttl.
+    """
+    result = l1.get(cache_key)
+    if result is not None:
+        record_tier('l1_hits')
+        return result
+
+    try:
+        started = time.perf_counter()
+        cached = cache_r.get(cache_key)
         if cached:
-            return json.loads(cached)
-        
+            result, size = cache_codec.decode(cached)
+            record_tier('l2_hits')
+            # Custo de perder a entrada no L1 é buscá-la de novo no Redis
+            l1_store(cache_key, result, size, time.perf_counter() - started, cache_ttl(ttl))
+            return result
+    except Exception:
+        pass
+
+    record_tier('misses')
+    with compute_admission():
+        started = time.perf_counter()
         result = compute_func()
-        r.setex(cache_key, 300, json.dumps(result))  # Cache por 5 minutos
-        return result
-    except:
-        return compute_func()
+        cost = time.perf_counter() - started
+
+    payload, size = cache_codec.encode(result)
+    ttl = cache_ttl(ttl) if ttl is not None else cost_ttl(cost, size)
+    l1_store(cache_key, result, size, cost, ttl)
+    try:
+        cache_r.setex(cache_key, ttl, payload)
+    except Exception:
+        pass
+    return result
 
 @app.route('/health')
 def health():
@@ -67,83 +321,640 @@ def health():
         redis_ok = False
     
     status = 'ok' if (postgres_ok and redis_ok) else 'error'
-    
-    return jsonify({
+    warmup = dict(warmup_status)
+    ready = warmup['state'] in ('done', 'disabled')
+
+    response = jsonify({
         'status': status,
         'postgres': 'ok' if postgres_ok else 'error',
-        'redis': 'ok' if redis_ok else 'error'
+        'redis': 'ok' if redis_ok else 'error',
+        'ready': ready,
+        'warmup': warmup
     })
+    # /health?probe=readiness responde 503 até o cache estar aquecido
+    if request.args.get('probe') == 'readiness' and not (ready and status == 'ok'):
+        response.status_code = 503
+    return response
+
+# Filtros aceitos pelos endpoints (parâmetro -> coluna do dataset)
+FILTER_COLUMNS = {
+    'species': 'Common Name',
+    'country': 'Country/Region',
+    'habitat': 'Habitat Type',
+    'status': 'Conservation Status',
+    'age_class': 'Age Class',
+    'sex': 'Sex'
+}
+
+def get_filters(source):
+    """Extrai os filtros suportados de um dict (query string ou corpo JSON)"""
+    return {name: source[name] for name in FILTER_COLUMNS if source.get(name)}
+
+def filter_mask(data, filters):
+    """Máscara booleana com todos os filtros combinados"""
+    mask = pd.Series(True, index=data.index)
+    for name, value in filters.items():
+        mask &= data[FILTER_COLUMNS[name]] == value
+    return mask
+
+def apply_filters(data, filters):
+    """Aplica os filtros ao DataFrame em uma única máscara"""
+    if not filters:
+        return data
+    return data[filter_mask(data, filters)]
+
+def make_cache_key(report, filters=None, version=None):
+    """Chave de cache do relatório na versão do dataset (padrão: a atual).
+
+    Sem filtros é igual à dos endpoints individuais.
+    """
+    version = dataset_version if version is None else version
+    if not filters:
+        return f'{version}:{report}'
+    # urlencode escapa '&' e '=' dos valores: filtros distintos nunca geram a mesma chave
+    return f'{version}:{report}?{urllib.parse.urlencode(sorted(filters.items()))}'
+
+def safe_round(value, digits=2):
+    """Arredonda valores numéricos; NaN (ex.: filtro sem dados) vira None"""
+    return None if pd.isna(value) else round(float(value), digits)
+
+def compute_basic_info(data):
+    return {
+        'total_observations': len(data),
+        'total_columns': len(data.columns),
+        'columns': list(data.columns),
+        'memory_usage_kb': round(float(data.memory_usage(deep=True).sum()) / 1024, 2)
+    }
+
+def compute_species_count(data):
+    species_counts = data['Common Name'].value_counts()
+    return {
+        'species_count': species_counts.to_dict(),
+        'total_unique_species': len(species_counts)
+    }
+
+def compute_size_statistics(data):
+    length_col = 'Observed Length (m)'
+    return {
+        'mean': safe_round(data[length_col].mean()),
+        'median': safe_round(data[length_col].median()),
+        'std': safe_round(data[length_col].std()),
+        'min': safe_round(data[length_col].min()),
+        'max': safe_round(data[length_col].max())
+    }
+
+def compute_weight_statistics(data):
+    weight_col = 'Observed Weight (kg)'
+    return {
+        'mean': safe_round(data[weight_col].mean()),
+        'median': safe_round(data[weight_col].median()),
+        'std': safe_round(data[weight_col].std()),
+        'min': safe_round(data[weight_col].min()),
+        'max': safe_round(data[weight_col].max()),
+        'valid_measurements': int(data[weight_col].notna().sum())
+    }
+
+def compute_habitat_distribution(data):
+    habitat_counts = data['Habitat Type'].value_counts()
+    habitat_percentages = (habitat_counts / len(data) * 100).round(1)
+    return {
+        'habitat_distribution': habitat_counts.to_dict(),
+        'habitat_percentages': habitat_percentages.to_dict()
+    }
+
+def compute_conservation_status(data):
+    status_counts = data['Conservation Status'].value_counts()
+    status_percentages = (status_counts / len(data) * 100).round(1)
+    return {
+        'conservation_status': status_counts.to_dict(),
+        'status_percentages': status_percentages.to_dict()
+    }
+
+def coefficient_summary(row):
+    return {
+        'n': int(row['n']),
+        'slope': safe_round(row['slope'], 6),
+        'intercept': safe_round(row['intercept'], 6),
+        'r_log': safe_round(row['r_log'], 4),
+        'r': safe_round(row['r'], 4),
+        'rmse_log': safe_round(row['rmse'], 4)
+    }
+
+def compute_species_correlation(data):
+    """Modelo alométrico log-log e correlações por espécie, ajustados numa só agregação"""
+    coefficients = allometry.fit_allometry(data)
+    species = coefficients.drop(index=allometry.GLOBAL_KEY, errors='ignore')
+    result = {
+        'model': 'log(peso_kg) = intercept + slope * log(comprimento_m)',
+        'species': {name: coefficient_summary(row) for name, row in species.iterrows()},
+        'global': None
+    }
+    if allometry.GLOBAL_KEY in coefficients.index:
+        result['global'] = coefficient_summary(coefficients.loc[allometry.GLOBAL_KEY])
+    return result
+
+def coefficients_from_report(report):
+    """Reconstrói o DataFrame de coeficientes a partir do relatório em cache"""
+    rows = dict(report['species'])
+    if report['global'] is not None:
+        rows[allometry.GLOBAL_KEY] = report['global']
+    coefficients = pd.DataFrame.from_dict(rows, orient='index', columns=['n', 'slope', 'intercept'])
+    return coefficients.astype({'slope': float, 'intercept': float})
+
+def get_allometry_coefficients():
+    """Coeficientes do dataset completo, em cache por versão do dataset"""
+    report = get_cached_or_compute(make_cache_key('species_correlation'), lambda: compute_species_correlation(df))
+    return coefficients_from_report(report)
+
+# Exportação de observações brutas
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '5000'))
+
+# Limite de comprimentos por chamada de /api/predict-weight
+PREDICT_MAX_LENGTHS = int(os.getenv('PREDICT_MAX_LENGTHS', '10000'))
+
+def export_positions(data, filters, after_id=None):
+    """Posições das linhas a exportar, ordenadas por Observation ID.
+
+    Trabalha só com índices para não copiar as linhas filtradas.
+    """
+    mask = filter_mask(data, filters)
+    if after_id is not None:
+        mask &= data['Observation ID'] > after_id
+    positions = np.flatnonzero(mask.to_numpy())
+    ids = data['Observation ID'].to_numpy()
+    if not data['Observation ID'].is_monotonic_increasing:
+        positions = positions[np.argsort(ids[positions], kind='stable')]
+    return positions
+
+def generate_export(data, positions, columns, fmt, coefficients=None):
+    """Gera a exportação em blocos de EXPORT_CHUNK_SIZE linhas.
+
+    Com coefficients, medidas ausentes são imputadas bloco a bloco.
+    """
+    read_columns = list(columns)
+    if coefficients is not None:
+        read_columns += [col for col in allometry.IMPUTATION_COLUMNS if col not in read_columns]
+    col_positions = [data.columns.get_loc(col) for col in read_columns]
+    if fmt == 'csv' and len(positions) == 0:
+        # Exportação vazia ainda traz o cabeçalho
+        yield pd.DataFrame(columns=columns).to_csv(index=False)
+        return
+    for start in range(0, len(positions), EXPORT_CHUNK_SIZE):
+        chunk = data.iloc[positions[start:start + EXPORT_CHUNK_SIZE], col_positions]
+        if coefficients is not None:
+            chunk, _ = allometry.impute_measurements(chunk, coefficients)
+            chunk = chunk[columns]
+        if fmt == 'csv':
+            yield chunk.to_csv(index=False, header=(start == 0))
+        else:
+            yield chunk.to_json(orient='records', lines=True, force_ascii=False)
+
+# Relatórios disponíveis (nome -> função de cálculo sobre um DataFrame)
+REPORTS = {
+    'basic_info': compute_basic_info,
+    'species_count': compute_species_count,
+    'size_statistics': compute_size_statistics,
+    'weight_statistics': compute_weight_statistics,
+    'habitat_distribution': compute_habitat_distribution,
+    'conservation_status': compute_conservation_status,
+    'species_correlation': compute_species_correlation
+}
+
+def get_many_cached_or_compute(report_names, filters=None):
+    """Busca vários relatórios com um único MGET e calcula as faltas em uma passada"""
+    results = {}
+    remote = []
+    for name in report_names:
+        result = l1.get(make_cache_key(name, filters))
+        if result is not None:
+            results[name] = result
+        else:
+            remote.append(name)
+    record_tier('l1_hits', len(results))
+
+    missing = []
+    if remote:
+        keys = [make_cache_key(name, filters) for name in remote]
+        started = time.perf_counter()
+        try:
+            cached = cache_r.mget(keys)
+        except Exception:
+            cached = [None] * len(keys)
+        fetch_cost = (time.perf_counter() - started) / len(keys)
+
+        for name, key, value in zip(remote, keys, cached):
+            result = None
+            if value:
+                try:
+                    result, size = cache_codec.decode(value)
+                except Exception:
+                    pass
+            if result is None:
+                missing.append(name)
+                continue
+            results[name] = result
+            l1_store(key, result, size, fetch_cost, cache_ttl())
+        record_tier('l2_hits', len(remote) - len(missing))
+        record_tier('misses', len(missing))
+
+    if missing:
+        # Filtra o dataset uma única vez para todos os relatórios faltantes
+        with compute_admission():
+            started = time.perf_counter()
+            data = apply_filters(df, filters)
+            computed = {name: REPORTS[name](data) for name in missing}
+            cost = (time.perf_counter() - started) / len(missing)
+        results.update(computed)
+        try:
+            pipe = cache_r.pipeline(transaction=False)
+            for name, result in computed.items():
+                key = make_cache_key(name, filters)
+                payload, size = cache_codec.encode(result)
+                ttl = cost_ttl(cost, size)
+                l1_store(key, result, size, cost, ttl)
+                pipe.setex(key, ttl, payload)
+            pipe.execute()
+        except Exception:
+            pass
+
+    return results
+
+# Estado do pré-aquecimento, exposto em /health
+warmup_status = {
+    'state': 'pending' if WARMUP_ON_STARTUP else 'disabled',
+    'dataset_version': dataset_version,
+    'total': 0,
+    'completed': 0,
+    'failed': 0,
+    'started_at': None,
+    'finished_at': None,
+    'duration_seconds': None
+}
+warmup_lock = threading.Lock()
+
+def warmup_filter_combinations(data):
+    """Sem filtro e cada um dos valores mais frequentes de cada filtro"""
+    combinations = [{}]
+    for name, column in FILTER_COLUMNS.items():
+        for value in data[column].value_counts().head(WARMUP_TOP_VALUES).index:
+            combinations.append({name: value})
+    return combinations
+
+def warmup_ttl():
+    """TTL mínimo (com jitter) das chaves aquecidas: vale até o próximo refresh.
+
+    O refresh começa WARMUP_REFRESH_INTERVAL após o fim do aquecimento
+    anterior, notado pelo watcher em até DATASET_CHECK_INTERVAL, e regrava
+    as chaves na mesma ordem; a duração do último aquecimento entra como folga.
+    """
+    if WARMUP_REFRESH_INTERVAL <= 0:
+        return 0
+    base = WARMUP_REFRESH_INTERVAL + DATASET_CHECK_INTERVAL + (warmup_status['duration_seconds'] or 0)
+    # Jitter só para cima: nenhuma chave aquecida expira antes do refresh
+    return int(math.ceil(base + random.uniform(0, base * CACHE_TTL_JITTER)))
+
+def warm_filters(data, version, filters):
+    """Calcula todos os relatórios de uma combinação de filtros e grava no Redis"""
+    filtered = apply_filters(data, filters)
+    pipe = cache_r.pipeline(transaction=False)
+    for name, compute_func in REPORTS.items():
+        started = time.perf_counter()
+        result = compute_func(filtered)
+        cost = time.perf_counter() - started
+        key = make_cache_key(name, filters, version)
+        payload, size = cache_codec.encode(result)
+        ttl = max(cost_ttl(cost, size), warmup_ttl())
+        l1_store(key, result, size, cost, ttl)
+        pipe.setex(key, ttl, payload)
+    pipe.execute()
+
+def warm_cache(wait=False):
+    """Pré-calcula em paralelo todas as chaves conhecidas do cache.
+
+    Com um aquecimento em andamento, retorna False sem fazer nada, ou, com
+    wait=True, espera por ele (que para ao notar a troca de versão) e
+    aquece de novo. Um aquecimento nunca grava resultados de um df sob a
+    versão de outro.
+    """
+    if not warmup_lock.acquire(blocking=wait):
+        return False
+    try:
+        with dataset_lock:
+            data, version = df, dataset_version
+        combinations = warmup_filter_combinations(data)
+        warmup_status.update({
+            'state': 'running',
+            'dataset_version': version,
+            'total': len(combinations) * len(REPORTS),
+            'completed': 0,
+            'failed': 0,
+            'started_at': datetime.now().isoformat(),
+            'finished_at': None
+        })
+
+        progress_lock = threading.Lock()
+        started = time.monotonic()
+
+        def run(filters):
+            if version != dataset_version:
+                # Dataset recarregado: quem fez o reload aquece a nova versão
+                return
+            try:
+                warm_filters(data, version, filters)
+                field = 'completed'
+            except Exception:
+                field = 'failed'
+            with progress_lock:
+                warmup_status[field] += len(REPORTS)
+
+        with ThreadPoolExecutor(max_workers=WARMUP_WORKERS) as executor:
+            list(executor.map(run, combinations))
+
+        if version != dataset_version:
+            warmup_status['state'] = 'cancelled'
+        else:
+            warmup_status['state'] = 'error' if warmup_status['failed'] else 'done'
+        warmup_status['finished_at'] = datetime.now().isoformat()
+        warmup_status['duration_seconds'] = round(time.monotonic() - started, 2)
+        return True
+    finally:
+        warmup_lock.release()
+
+def reload_dataset():
+    """Recarrega o dataset; df, agregados e versão são trocados juntos"""
+    global df, dataset_version, rollups
+    new_version = get_dataset_version(DATASET_PATH)
+    new_df = pd.read_csv(DATASET_PATH)
+    new_rollups = CalendarRollups(new_df)
+    with dataset_lock:
+        old_version = dataset_version
+        df, rollups, dataset_version = new_df, new_rollups, new_version
+    invalidate_cache(f'{old_version}:')
+
+def watch_dataset():
+    """Reaquece o cache quando o dataset muda ou antes de o TTL expirar"""
+    last_warmup = time.monotonic()
+    while True:
+        time.sleep(DATASET_CHECK_INTERVAL)
+        try:
+            changed = get_dataset_version(DATASET_PATH) != dataset_version
+            if changed:
+                reload_dataset()
+            refresh_due = (WARMUP_REFRESH_INTERVAL > 0
+                           and time.monotonic() - last_warmup >= WARMUP_REFRESH_INTERVAL)
+            # Após um reload espera (e substitui) o aquecimento da versão antiga;
+            # num refresh, um aquecimento já em andamento basta
+            if (changed or refresh_due) and warm_cache(wait=changed):
+                last_warmup = time.monotonic()
+        except Exception as e:
+            print(f'Erro ao verificar dataset: {e}')
+
+def start_background_jobs():
+    if WARMUP_ON_STARTUP:
+        threading.Thread(target=warm_cache, daemon=True).start()
+    threading.Thread(target=watch_dataset, daemon=True).start()
+    threading.Thread(target=listen_invalidations, daemon=True).start()
 
 @app.route('/api/basic-info')
 def basic_info():
-    def compute():
-        return {
-            'total_observations': len(df),
-            'total_columns': len(df.columns),
-            'columns': list(df.columns),
-            'memory_usage_kb': round(df.memory_usage(deep=True).sum() / 1024, 2)
-        }
-    return jsonify(get_cached_or_compute('basic_info', compute))
+    return jsonify(get_cached_or_compute(make_cache_key('basic_info'), lambda: compute_basic_info(df)))
 
 @app.route('/api/species-count')
 def species_count():
-    def compute():
-        species_counts = df['Common Name'].value_counts()
-        return {
-            'species_count': species_counts.to_dict(),
-            'total_unique_species': len(species_counts)
-        }
-    return jsonify(get_cached_or_compute('species_count', compute))
+    return jsonify(get_cached_or_compute(make_cache_key('species_count'), lambda: compute_species_count(df)))
 
 @app.route('/api/size-statistics')
 def size_statistics():
-    def compute():
-        length_col = 'Observed Length (m)'
-        return {
-            'mean': round(df[length_col].mean(), 2),
-            'median': round(df[length_col].median(), 2),
-            'std': round(df[length_col].std(), 2),
-            'min': round(df[length_col].min(), 2),
-            'max': round(df[length_col].max(), 2)
-        }
-    return jsonify(get_cached_or_compute('size_statistics', compute))
+    return jsonify(get_cached_or_compute(make_cache_key('size_statistics'), lambda: compute_size_statistics(df)))
 
 @app.route('/api/weight-statistics')
 def weight_statistics():
-    def compute():
-        weight_col = 'Observed Weight (kg)'
-        return {
-            'mean': round(df[weight_col].mean(), 2),
-            'median': round(df[weight_col].median(), 2),
-            'std': round(df[weight_col].std(), 2),
-            'min': round(df[weight_col].min(), 2),
-            'max': round(df[weight_col].max(), 2),
-            'valid_measurements': df[weight_col].notna().sum()
-        }
-    return jsonify(get_cached_or_compute('weight_statistics', compute))
+    return jsonify(get_cached_or_compute(make_cache_key('weight_statistics'), lambda: compute_weight_statistics(df)))
 
 @app.route('/api/habitat-distribution')
 def habitat_distribution():
-    def compute():
-        habitat_counts = df['Habitat Type'].value_counts()
-        habitat_percentages = (habitat_counts / len(df) * 100).round(1)
-        return {
-            'habitat_distribution': habitat_counts.to_dict(),
-            'habitat_percentages': habitat_percentages.to_dict()
-        }
-    return jsonify(get_cached_or_compute('habitat_distribution', compute))
+    return jsonify(get_cached_or_compute(make_cache_key('habitat_distribution'), lambda: compute_habitat_distribution(df)))
 
 @app.route('/api/conservation-status')
 def conservation_status():
-    def compute():
-        status_counts = df['Conservation Status'].value_counts()
-        status_percentages = (status_counts / len(df) * 100).round(1)
-        return {
-            'conservation_status': status_counts.to_dict(),
-            'status_percentages': status_percentages.to_dict()
-        }
-    return jsonify(get_cached_or_compute('conservation_status', compute))
+    return jsonify(get_cached_or_compute(make_cache_key('conservation_status'), lambda: compute_conservation_status(df)))
+
+@app.route('/api/batch', methods=['GET', 'POST'])
+def batch():
+    """Retorna vários relatórios em uma única requisição.
+
+    GET: /api/batch?reports=basic_info,species_count&country=Belize
+    POST: {"reports": ["basic_info", "species_count"], "filters": {"country": "Belize"}}
+    """
+    if request.method == 'POST':
+        body = request.get_json(silent=True) or {}
+        if not isinstance(body, dict):
+            return jsonify({'error': 'O corpo deve ser um objeto JSON'}), 400
+        report_names = body.get('reports') or []
+        raw_filters = body.get('filters') or {}
+        if not isinstance(report_names, list) or not all(isinstance(name, str) for name in report_names):
+            return jsonify({'error': 'reports deve ser uma lista de nomes de relatórios'}), 400
+        if not isinstance(raw_filters, dict) or not all(isinstance(value, str) for value in raw_filters.values()):
+            return jsonify({'error': 'filters deve ser um objeto com valores de texto'}), 400
+        filters = get_filters(raw_filters)
+    else:
+        report_names = [name for name in request.args.get('reports', '').split(',') if name]
+        filters = get_filters(request.args)
+
+    if not report_names:
+        report_names = list(REPORTS)
+
+    unknown = [name for name in report_names if name not in REPORTS]
+    if unknown:
+        return jsonify({
+            'error': 'Relatórios desconhecidos',
+            'unknown_reports': unknown,
+            'available_reports': list(REPORTS)
+        }), 400
+
+    # Remove duplicados preservando a ordem
+    report_names = list(dict.fromkeys(report_names))
+
+    return jsonify({
+        'filters': filters,
+        'reports': get_many_cached_or_compute(report_names, filters)
+    })
+
+@app.route('/api/cache-stats')
+def cache_stats():
+    """Taxas de acerto por nível do cache e métricas do codec neste worker"""
+    with tier_stats_lock:
+        stats = dict(tier_stats)
+    lookups = stats['l1_hits'] + stats['l2_hits'] + stats['misses']
+    l2_lookups = stats['l2_hits'] + stats['misses']
+    return jsonify({
+        'lookups': lookups,
+        'l1': dict(l1.stats(), hit_ratio=round(stats['l1_hits'] / lookups, 4) if lookups else None),
+        'l2': {
+            'hits': stats['l2_hits'],
+            'misses': stats['misses'],
+            'hit_ratio': round(stats['l2_hits'] / l2_lookups, 4) if l2_lookups else None
+        },
+        'overall_hit_ratio': round((stats['l1_hits'] + stats['l2_hits']) / lookups, 4) if lookups else None,
+        'codec': cache_codec.stats()
+    })
+
+@app.route('/api/export')
+def export():
+    """Exporta observações filtradas em NDJSON ou CSV via streaming.
+
+    Parâmetros: format (ndjson|csv), columns (lista separada por vírgulas),
+    after_id e limit para paginação retomável por Observation ID, impute=1
+    para preencher medidas ausentes pelo modelo alométrico, e os filtros de
+    FILTER_COLUMNS.
+    """
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({
+            'error': 'Formato inválido',
+            'available_formats': list(EXPORT_FORMATS)
+        }), 400
+
+    columns = [col for col in request.args.get('columns', '').split(',') if col]
+    if not columns:
+        columns = list(df.columns)
+    unknown = [col for col in columns if col not in df.columns]
+    if unknown:
+        return jsonify({
+            'error': 'Colunas desconhecidas',
+            'unknown_columns': unknown,
+            'available_columns': list(df.columns)
+        }), 400
+
+    # type=int descartaria um cursor inválido e a exportação recomeçaria do início
+    try:
+        after_id = int(request.args['after_id']) if 'after_id' in request.args else None
+        limit = int(request.args['limit']) if 'limit' in request.args else None
+    except ValueError:
+        return jsonify({'error': 'after_id e limit devem ser números inteiros'}), 400
+    if limit is not None and limit <= 0:
+        return jsonify({'error': 'limit deve ser maior que zero'}), 400
+
+    # Filtro e ordenação sobre o df inteiro, sem cache: passa pelo controle de admissão
+    with compute_admission():
+        positions = export_positions(df, get_filters(request.args), after_id)
+    headers = {}
+    if limit is not None and len(positions) > limit:
+        positions = positions[:limit]
+        # Cursor para a próxima página
+        headers['X-Next-After-Id'] = str(int(df['Observation ID'].iloc[positions[-1]]))
+
+    coefficients = get_allometry_coefficients() if request.args.get('impute') == '1' else None
+
+    return Response(
+        stream_with_context(generate_export(df, positions, columns, fmt, coefficients)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers=headers
+    )
+
+@app.route('/api/species-correlation')
+def species_correlation():
+    return jsonify(get_cached_or_compute(make_cache_key('species_correlation'), lambda: compute_species_correlation(df)))
+
+@app.route('/api/predict-weight', methods=['GET', 'POST'])
+def predict_weight():
+    """Prevê pesos a partir de comprimentos pelo modelo alométrico por espécie.
+
+    GET: /api/predict-weight?lengths=1.5,2.4&species=Nile Crocodile
+    POST: {"lengths": [1.5, 2.4], "species": "Nile Crocodile"} (species pode
+    ser uma lista do mesmo tamanho de lengths ou omitido para o ajuste global)
+    """
+    if request.method == 'POST':
+        body = request.get_json(silent=True) or {}
+        if not isinstance(body, dict):
+            return jsonify({'error': 'O corpo deve ser um objeto JSON'}), 400
+        lengths = body.get('lengths')
+        species = body.get('species')
+    else:
+        lengths = [value for value in request.args.get('lengths', '').split(',') if value]
+        species = request.args.get('species')
+
+    if not isinstance(lengths, list) or not lengths:
+        return jsonify({'error': 'Informe uma lista não vazia de comprimentos em lengths'}), 400
+    if len(lengths) > PREDICT_MAX_LENGTHS:
+        return jsonify({'error': f'No máximo {PREDICT_MAX_LENGTHS} comprimentos por requisição'}), 400
+    # Lista plana de números finitos (no GET chegam como texto); bool não conta como número
+    if any(isinstance(value, (bool, list, dict)) or value is None for value in lengths):
+        return jsonify({'error': 'lengths deve conter apenas números'}), 400
+    try:
+        length_values = np.asarray(lengths, dtype=float)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'lengths deve conter apenas números'}), 400
+    if not np.isfinite(length_values).all():
+        return jsonify({'error': 'lengths deve conter apenas números finitos'}), 400
+    if species is not None and not isinstance(species, str) and not (
+            isinstance(species, list) and all(isinstance(name, str) for name in species)):
+        return jsonify({'error': 'species deve ser um nome ou uma lista de nomes'}), 400
+    if isinstance(species, list) and len(species) != len(lengths):
+        return jsonify({'error': 'species deve ter o mesmo tamanho de lengths'}), 400
+
+    coefficients = get_allometry_coefficients()
+    species_values = np.broadcast_to(np.asarray(species if species is not None else allometry.GLOBAL_KEY, dtype=object),
+                                     length_values.shape)
+    weights = allometry.predict_weight(coefficients, species_values, length_values)
+    fitted = set(coefficients.index[coefficients['slope'].notna()]) - {allometry.GLOBAL_KEY}
+
+    return jsonify({
+        'lengths': length_values.tolist(),
+        'weights_kg': [safe_round(weight) if length > 0 else None for length, weight in zip(length_values, weights)],
+        'models': ['species' if name in fitted else 'global' for name in species_values]
+    })
+
+def parse_iso_date(value):
+    return pd.Timestamp(datetime.strptime(value, '%Y-%m-%d')) if value else None
+
+@app.route('/api/timeseries')
+def timeseries():
+    """Séries temporais de contagens e médias de comprimento/peso.
+
+    Parâmetros: resolution (day|month|year), start e end (AAAA-MM-DD,
+    inclusivos), no máximo um filtro entre species, country e status, ou
+    group_by (species|country|status) para uma série por valor.
+    """
+    resolution = request.args.get('resolution', 'month')
+    if resolution not in RESOLUTIONS:
+        return jsonify({'error': 'Resolução inválida', 'available_resolutions': list(RESOLUTIONS)}), 400
+    try:
+        start = parse_iso_date(request.args.get('start'))
+        end = parse_iso_date(request.args.get('end'))
+    except ValueError:
+        return jsonify({'error': 'start e end devem estar no formato AAAA-MM-DD'}), 400
+    if start is not None and end is not None and start > end:
+        return jsonify({'error': 'start deve ser anterior a end'}), 400
+
+    filters = {name: request.args[name] for name in DIMENSIONS if request.args.get(name)}
+    group_by = request.args.get('group_by')
+    if len(filters) > 1 or (group_by and filters):
+        return jsonify({'error': 'Use no máximo um filtro entre species, country e status, ou group_by'}), 400
+    if group_by and group_by not in DIMENSIONS:
+        return jsonify({'error': 'group_by inválido', 'available_dimensions': list(DIMENSIONS)}), 400
+
+    # Referência local: um reload troca os agregados sem afetar esta requisição
+    current = rollups
+    result = {
+        'resolution': resolution,
+        'start': request.args.get('start'),
+        'end': request.args.get('end'),
+        'filters': filters
+    }
+    if group_by:
+        result['group_by'] = group_by
+        result['series'] = {value: current.query(resolution, start, end, group_by, value)
+                            for value in current.values(group_by)}
+    else:
+        dimension, value = next(iter(filters.items()), (None, None))
+        result.update(current.query(resolution, start, end, dimension, value))
+    return jsonify(result)
 
 if __name__ == '__main__':
     init_db()
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    start_background_jobs()
+    # Sem o reloader: ele roda este bloco também no processo pai, carregando
+    # e aquecendo o dataset duas vezes
+    app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
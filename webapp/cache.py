@@ -0,0 +1,121 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class LocalCache:
+    """Cache em memória do processo (L1) limitado por bytes e por número de entradas.
+
+    A remoção usa GreedyDual-Size-Frequency: a prioridade de uma entrada é
+    L + frequência * custo / tamanho, e a de menor prioridade sai primeiro.
+    Entradas grandes, pouco acessadas ou baratas de recalcular são removidas
+    antes das pequenas, quentes e caras. Cada entrada tem seu próprio TTL.
+    """
+
+    def __init__(self, max_bytes, max_entries=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries = {}
+        self.heap = []
+        self.clock = 0.0  # valor L do GDSF: prioridade da última entrada removida
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.counter = itertools.count()
+
+    def _push(self, key, entry):
+        entry['priority'] = self.clock + entry['frequency'] * entry['cost'] / max(entry['size'], 1)
+        entry['seq'] = next(self.counter)
+        heapq.heappush(self.heap, (entry['priority'], entry['seq'], key))
+        # Cada acerto deixa um item obsoleto no heap: reconstrói quando eles
+        # passam a dominar, para o heap não crescer sem limite só com leituras
+        if len(self.heap) > 4 * len(self.entries) + 64:
+            self.heap = [(e['priority'], e['seq'], k) for k, e in self.entries.items()]
+            heapq.heapify(self.heap)
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes_used -= entry['size']
+
+    def _evict_one(self):
+        while self.heap:
+            priority, seq, key = heapq.heappop(self.heap)
+            entry = self.entries.get(key)
+            # Itens antigos do heap (entrada atualizada ou removida) são ignorados
+            if entry is None or entry['seq'] != seq:
+                continue
+            self.clock = priority
+            self._remove(key)
+            self.evictions += 1
+            return True
+        return False
+
+    def get(self, key):
+        """Retorna o valor armazenado ou None se ausente/expirado"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry['expires_at'] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry['frequency'] += 1
+            self._push(key, entry)
+            return entry['value']
+
+    def set(self, key, value, size, cost, ttl):
+        """Armazena value ocupando size bytes, com custo de recálculo cost (segundos)"""
+        if size > self.max_bytes or ttl <= 0:
+            return
+        with self.lock:
+            self._remove(key)
+            while self.entries and (
+                self.bytes_used + size > self.max_bytes
+                or (self.max_entries and len(self.entries) >= self.max_entries)
+            ):
+                if not self._evict_one():
+                    break
+            entry = {
+                'value': value,
+                'size': size,
+                'cost': max(cost, 1e-6),
+                'frequency': 1,
+                'expires_at': time.monotonic() + ttl
+            }
+            self.entries[key] = entry
+            self.bytes_used += size
+            self._push(key, entry)
+
+    def delete(self, key):
+        with self.lock:
+            self._remove(key)
+
+    def delete_prefix(self, prefix):
+        with self.lock:
+            for key in [key for key in self.entries if key.startswith(prefix)]:
+                self._remove(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.heap = []
+            self.bytes_used = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes_used': self.bytes_used,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None
+            }
@@ -0,0 +1,193 @@
+import json
+import threading
+import time
+import zlib
+
+
+# Formato das entradas do cache no Redis:
+#   MAGIC (2 bytes) | versão (1) | serializador (1) | compressão (1) | dados
+# Entradas antigas, em JSON puro e sem cabeçalho, continuam legíveis; um
+# formato novo só precisa de outra versão, sem limpar o Redis.
+MAGIC = b'\x00C'
+FORMAT_VERSION = 1
+HEADER_SIZE = len(MAGIC) + 3
+
+
+def json_dumps(value):
+    return json.dumps(value).encode('utf-8')
+
+
+def orjson_serializer():
+    import orjson
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    return lambda value: orjson.dumps(value, option=options), orjson.loads
+
+
+def msgpack_serializer():
+    import msgpack
+    return (lambda value: msgpack.packb(value, use_bin_type=True),
+            lambda payload: msgpack.unpackb(payload, raw=False, strict_map_key=False))
+
+
+def zstd_compressor():
+    import zstandard
+    # Compressores do zstandard não podem ser usados por duas threads ao mesmo tempo
+    local = threading.local()
+
+    def compress(payload):
+        if not hasattr(local, 'compressor'):
+            local.compressor = zstandard.ZstdCompressor(level=3)
+        return local.compressor.compress(payload)
+
+    def decompress(payload):
+        if not hasattr(local, 'decompressor'):
+            local.decompressor = zstandard.ZstdDecompressor()
+        return local.decompressor.decompress(payload)
+
+    return compress, decompress
+
+
+def lz4_compressor():
+    import lz4.frame
+    return lz4.frame.compress, lz4.frame.decompress
+
+
+# nome -> (código no cabeçalho, pacote pip, fábrica de (codificar, decodificar))
+SERIALIZERS = {
+    'json': (1, None, lambda: (json_dumps, json.loads)),
+    'orjson': (2, 'orjson', orjson_serializer),
+    'msgpack': (3, 'msgpack', msgpack_serializer),
+}
+
+COMPRESSORS = {
+    'none': (0, None, lambda: (None, None)),
+    'zlib': (1, None, lambda: (zlib.compress, zlib.decompress)),
+    'zstd': (2, 'zstandard', zstd_compressor),
+    'lz4': (3, 'lz4', lz4_compressor),
+}
+
+# Preferência quando nada é configurado: o primeiro disponível
+DEFAULT_SERIALIZERS = ['orjson', 'msgpack', 'json']
+DEFAULT_COMPRESSORS = ['zstd', 'lz4', 'zlib']
+
+
+def load_codec(registry, name):
+    code, package, factory = registry[name]
+    try:
+        return factory()
+    except ImportError:
+        raise RuntimeError(f"Codec '{name}' do cache requer o pacote {package} (pip install {package})")
+
+
+def first_available(registry, names):
+    for name in names:
+        try:
+            return name, load_codec(registry, name)
+        except RuntimeError:
+            continue
+    raise RuntimeError('Nenhum codec disponível')
+
+
+class CacheCodec:
+    """Serialização e compressão das entradas do cache no Redis.
+
+    Payloads a partir de min_compress_bytes são comprimidos (se ficarem
+    menores). A leitura usa o serializador/compressão gravados no cabeçalho
+    de cada entrada, então trocar a configuração não invalida o Redis.
+    """
+
+    def __init__(self, serializer=None, compression=None, min_compress_bytes=1024):
+        for name, registry in [(serializer, SERIALIZERS), (compression, COMPRESSORS)]:
+            if name and name not in registry:
+                raise RuntimeError(f"Codec desconhecido: {name}. Opções: {', '.join(registry)}")
+        if serializer:
+            self.serializer, (self.dumps, self.loads) = serializer, load_codec(SERIALIZERS, serializer)
+        else:
+            self.serializer, (self.dumps, self.loads) = first_available(SERIALIZERS, DEFAULT_SERIALIZERS)
+        if compression:
+            self.compression, (self.compress, _) = compression, load_codec(COMPRESSORS, compression)
+        else:
+            self.compression, (self.compress, _) = first_available(COMPRESSORS, DEFAULT_COMPRESSORS)
+        self.min_compress_bytes = min_compress_bytes
+        self.header = MAGIC + bytes([FORMAT_VERSION, SERIALIZERS[self.serializer][0]])
+        # Codecs de leitura carregados sob demanda, por código do cabeçalho
+        self.decoders = {}
+        self.lock = threading.Lock()
+        self.metrics = {
+            'encoded': 0, 'decoded': 0, 'compressed': 0, 'legacy_decoded': 0,
+            'serialized_bytes': 0, 'stored_bytes': 0,
+            'encode_seconds': 0.0, 'decode_seconds': 0.0,
+        }
+
+    def decoder(self, registry, code):
+        key = (id(registry), code)
+        if key not in self.decoders:
+            names = [name for name, (entry_code, _, _) in registry.items() if entry_code == code]
+            if not names:
+                raise ValueError(f'Código de codec desconhecido no cabeçalho: {code}')
+            self.decoders[key] = load_codec(registry, names[0])[1]
+        return self.decoders[key]
+
+    def encode(self, value):
+        """Retorna (bytes para o Redis, tamanho serializado antes da compressão)"""
+        started = time.perf_counter()
+        payload = self.dumps(value)
+        serialized_size = len(payload)
+        compression = 'none'
+        if self.compress is not None and serialized_size >= self.min_compress_bytes:
+            compressed = self.compress(payload)
+            if len(compressed) < serialized_size:
+                payload, compression = compressed, self.compression
+        entry = self.header + bytes([COMPRESSORS[compression][0]]) + payload
+        with self.lock:
+            self.metrics['encoded'] += 1
+            self.metrics['compressed'] += compression != 'none'
+            self.metrics['serialized_bytes'] += serialized_size
+            self.metrics['stored_bytes'] += len(entry)
+            self.metrics['encode_seconds'] += time.perf_counter() - started
+        return entry, serialized_size
+
+    def decode(self, entry):
+        """Retorna (valor, tamanho serializado); aceita entradas JSON sem cabeçalho"""
+        started = time.perf_counter()
+        if isinstance(entry, str):
+            entry = entry.encode('utf-8')
+        legacy = not entry.startswith(MAGIC)
+        if legacy:
+            payload = entry
+            value = json.loads(payload)
+        else:
+            version, serializer_code, compression_code = entry[len(MAGIC):HEADER_SIZE]
+            if version != FORMAT_VERSION:
+                raise ValueError(f'Versão de formato do cache não suportada: {version}')
+            payload = entry[HEADER_SIZE:]
+            if compression_code != COMPRESSORS['none'][0]:
+                payload = self.decoder(COMPRESSORS, compression_code)(payload)
+            value = self.decoder(SERIALIZERS, serializer_code)(payload)
+        with self.lock:
+            self.metrics['decoded'] += 1
+            self.metrics['legacy_decoded'] += legacy
+            self.metrics['decode_seconds'] += time.perf_counter() - started
+        return value, len(payload)
+
+    def stats(self):
+        with self.lock:
+            metrics = dict(self.metrics)
+        return {
+            'serializer': self.serializer,
+            'compression': self.compression,
+            'min_compress_bytes': self.min_compress_bytes,
+            'format_version': FORMAT_VERSION,
+            'encoded': metrics['encoded'],
+            'decoded': metrics['decoded'],
+            'compressed': metrics['compressed'],
+            'legacy_decoded': metrics['legacy_decoded'],
+            'serialized_bytes': metrics['serialized_bytes'],
+            'stored_bytes': metrics['stored_bytes'],
+            'compression_ratio': (round(metrics['stored_bytes'] / metrics['serialized_bytes'], 4)
+                                  if metrics['serialized_bytes'] else None),
+            'avg_encode_ms': (round(metrics['encode_seconds'] * 1000 / metrics['encoded'], 4)
+                              if metrics['encoded'] else None),
+            'avg_decode_ms': (round(metrics['decode_seconds'] * 1000 / metrics['decoded'], 4)
+                              if metrics['decoded'] else None),
+        }
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+
+DATE_COLUMN = 'Date of Observation'
+DATE_FORMAT = '%d-%m-%Y'
+
+# Resolução -> (frequência do pandas, formato do rótulo do período)
+RESOLUTIONS = {
+    'day': ('D', '%Y-%m-%d'),
+    'month': ('M', '%Y-%m'),
+    'year': ('Y', '%Y'),
+}
+
+# Dimensões com séries próprias (parâmetro -> coluna do dataset)
+DIMENSIONS = {
+    'species': 'Common Name',
+    'country': 'Country/Region',
+    'status': 'Conservation Status',
+}
+
+MEASURES = {
+    'length': 'Observed Length (m)',
+    'weight': 'Observed Weight (kg)',
+}
+
+# Colunas agregadas de cada período: contagem e momentos das medidas
+MOMENT_COLUMNS = ['count'] + [f'{stat}_{measure}' for measure in MEASURES for stat in ('n', 'sum', 'sumsq')]
+
+
+def moment_summary(n, total, total_sq):
+    """Média e desvio padrão amostral a partir de n, soma e soma dos quadrados"""
+    if n == 0:
+        return {'n': 0, 'mean': None, 'std': None}
+    mean = total / n
+    std = None
+    if n > 1:
+        std = round(float(np.sqrt(max(total_sq - total * total / n, 0.0) / (n - 1))), 2)
+    return {'n': int(n), 'mean': round(float(mean), 2), 'std': std}
+
+
+class CalendarRollups:
+    """Agregados por dia/mês/ano, gerais e por espécie, país e status.
+
+    Construídos uma vez por versão do dataset. Cada série guarda os períodos
+    ordenados, os momentos de cada período e suas somas acumuladas, então um
+    intervalo de datas é respondido com duas buscas binárias.
+    """
+
+    def __init__(self, data):
+        dates = pd.to_datetime(data[DATE_COLUMN], format=DATE_FORMAT, errors='coerce')
+        frame = pd.DataFrame({'count': 1}, index=data.index)
+        for measure, column in MEASURES.items():
+            values = pd.to_numeric(data[column], errors='coerce')
+            frame[f'n_{measure}'] = values.notna().astype(int)
+            frame[f'sum_{measure}'] = values.fillna(0.0)
+            frame[f'sumsq_{measure}'] = values.fillna(0.0) ** 2
+        for dimension, column in DIMENSIONS.items():
+            frame[dimension] = data[column]
+        frame = frame[dates.notna()].copy()
+        dates = dates[dates.notna()]
+
+        self.series = {}
+        for resolution, (freq, label_format) in RESOLUTIONS.items():
+            frame['period'] = dates.dt.to_period(freq).dt.start_time
+            self.add_series(resolution, None, None, frame.groupby('period')[MOMENT_COLUMNS].sum(), label_format)
+            for dimension in DIMENSIONS:
+                sums = frame.groupby([dimension, 'period'])[MOMENT_COLUMNS].sum()
+                for value, group in sums.groupby(level=0):
+                    self.add_series(resolution, dimension, value, group.droplevel(0), label_format)
+        self.total_rows = len(data)
+        self.dated_rows = len(frame)
+
+    def add_series(self, resolution, dimension, value, sums, label_format):
+        sums = sums.sort_index()
+        moments = sums.to_numpy(dtype=float)
+        self.series[(resolution, dimension, value)] = {
+            'periods': sums.index.to_numpy(dtype='datetime64[ns]'),
+            'labels': sums.index.strftime(label_format).tolist(),
+            'moments': moments,
+            # Linha i = soma dos períodos anteriores a i
+            'cumulative': np.vstack([np.zeros(len(MOMENT_COLUMNS)), np.cumsum(moments, axis=0)]),
+        }
+
+    def values(self, dimension):
+        """Valores com série própria na dimensão"""
+        return sorted({value for (_, dim, value) in self.series if dim == dimension})
+
+    def query(self, resolution, start=None, end=None, dimension=None, value=None):
+        """Pontos da série no intervalo [start, end] e os totais do intervalo.
+
+        start/end são Timestamps (ou None para aberto) e são levados ao
+        início do seu período na resolução pedida.
+        """
+        series = self.series.get((resolution, dimension, value))
+        if series is None:
+            return {'points': [], 'totals': self.summarize(np.zeros(len(MOMENT_COLUMNS)))}
+        freq = RESOLUTIONS[resolution][0]
+        periods = series['periods']
+        lo = 0 if start is None else np.searchsorted(periods, start.to_period(freq).start_time.to_datetime64(), 'left')
+        hi = len(periods) if end is None else np.searchsorted(periods, end.to_period(freq).start_time.to_datetime64(), 'right')
+        hi = max(hi, lo)
+
+        points = []
+        for i in range(lo, hi):
+            point = self.summarize(series['moments'][i])
+            point['period'] = series['labels'][i]
+            points.append(point)
+        return {'points': points, 'totals': self.summarize(series['cumulative'][hi] - series['cumulative'][lo])}
+
+    @staticmethod
+    def summarize(moments):
+        values = dict(zip(MOMENT_COLUMNS, moments))
+        summary = {'count': int(values['count'])}
+        for measure in MEASURES:
+            summary[measure] = moment_summary(
+                values[f'n_{measure}'], values[f'sum_{measure}'], values[f'sumsq_{measure}']
+            )
+        return summary
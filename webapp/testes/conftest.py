@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import pytest
+
+WEBAPP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, WEBAPP_DIR)
+
+
+@pytest.fixture(scope="session")
+def webapp():
+    """Módulo app.py importado contra um Redis em memória (fakeredis), sem aquecimento"""
+    import fakeredis
+    import redis
+
+    os.environ.setdefault('DATASET_PATH', os.path.join(WEBAPP_DIR, 'crocodile_dataset.csv'))
+    os.environ['WARMUP_ON_STARTUP'] = '0'
+    server = fakeredis.FakeServer()
+    original = redis.from_url
+    redis.from_url = lambda url, **kwargs: fakeredis.FakeRedis(server=server, **kwargs)
+    try:
+        import app
+    finally:
+        redis.from_url = original
+    return app
+
+
+@pytest.fixture
+def client(webapp):
+    """Cliente de teste com L1, Redis e contadores limpos a cada teste"""
+    webapp.l1.clear()
+    webapp.cache_r.flushall()
+    with webapp.tier_stats_lock:
+        webapp.tier_stats.update({name: 0 for name in webapp.tier_stats})
+    return webapp.app.test_client()
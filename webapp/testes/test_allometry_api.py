@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import pytest
+
+
+class TestPredictWeight:
+
+    def test_1_get_and_post(self, client):
+        by_get = client.get('/api/predict-weight?lengths=1.5,2.0').get_json()
+        by_post = client.post('/api/predict-weight', json={'lengths': [1.5, 2.0]}).get_json()
+
+        assert by_get == by_post
+        assert by_get['models'] == ['global', 'global']
+        assert all(weight > 0 for weight in by_get['weights_kg'])
+
+    def test_2_species_list(self, client):
+        name = next(iter(client.get('/api/species-count').get_json()['species_count']))
+        response = client.post('/api/predict-weight', json={'lengths': [2.0, 0], 'species': [name, 'Desconhecido']})
+
+        result = response.get_json()
+        assert response.status_code == 200
+        assert result['models'] == ['species', 'global']
+        assert result['weights_kg'][1] is None
+
+    @pytest.mark.parametrize("body", [
+        {'lengths': [[1, 2]]},
+        {'lengths': [1.5, None]},
+        {'lengths': [True]},
+        {'lengths': ['abc']},
+        {'lengths': []},
+        {'lengths': [1.5], 'species': [['Nile Crocodile']]},
+        {'lengths': [1.5], 'species': {'a': 1}},
+        {'lengths': [1.5, 2.0], 'species': ['Nile Crocodile']},
+        [1.5, 2.0],
+        "1.5",
+    ])
+    def test_3_malformed_post_body(self, client, body):
+        response = client.post('/api/predict-weight', json=body)
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("lengths", ["inf", "1.5,nan", "-inf"])
+    def test_4_non_finite_lengths(self, client, lengths):
+        response = client.get(f'/api/predict-weight?lengths={lengths}')
+
+        assert response.status_code == 400
+
+    def test_5_species_correlation(self, client):
+        response = client.get('/api/species-correlation')
+
+        assert response.status_code == 200
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+import pytest
+
+
+class TestBatch:
+
+    def test_1_batch_get_and_post_match(self, client):
+        by_get = client.get('/api/batch?reports=basic_info,species_count&country=Belize').get_json()
+        by_post = client.post('/api/batch', json={'reports': ['basic_info', 'species_count'],
+                                                  'filters': {'country': 'Belize'}}).get_json()
+
+        assert by_get == by_post
+        assert set(by_get['reports']) == {'basic_info', 'species_count'}
+
+    def test_2_unknown_report(self, client):
+        response = client.get('/api/batch?reports=basic_info,nope')
+
+        assert response.status_code == 400
+        assert response.get_json()['unknown_reports'] == ['nope']
+
+    def test_3_filter_values_do_not_collide_in_cache_keys(self, client):
+        injected = client.post('/api/batch', json={'reports': ['basic_info'],
+                                                   'filters': {'country': 'Belize&habitat=Swamps'}}).get_json()
+        real = client.get('/api/batch?reports=basic_info&country=Belize&habitat=Swamps').get_json()
+
+        assert injected['reports']['basic_info']['total_observations'] == 0
+        assert real['reports']['basic_info']['total_observations'] > 0
+
+    @pytest.mark.parametrize("body", [
+        {'reports': [['x']]},
+        {'reports': 'basic_info'},
+        {'filters': ['x']},
+        {'filters': {'country': ['Belize']}},
+        ['basic_info'],
+    ])
+    def test_4_malformed_post_body(self, client, body):
+        response = client.post('/api/batch', json=body)
+
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+
+
+class TestExport:
+
+    def test_1_csv_pagination_cursor(self, client):
+        first = client.get('/api/export?format=csv&limit=5&columns=Observation ID,Common Name')
+        lines = first.get_data(as_text=True).splitlines()
+        assert lines[0] == 'Observation ID,Common Name'
+        assert len(lines) == 6
+
+        after_id = first.headers['X-Next-After-Id']
+        second = client.get(f'/api/export?format=csv&limit=5&columns=Observation ID&after_id={after_id}')
+        ids = [int(line) for line in second.get_data(as_text=True).splitlines()[1:]]
+        assert min(ids) > int(after_id)
+
+    def test_2_ndjson_with_filter(self, client):
+        response = client.get('/api/export?format=ndjson&country=Belize&columns=Country/Region')
+        lines = response.get_data(as_text=True).splitlines()
+
+        assert lines
+        assert all(line == '{"Country\\/Region":"Belize"}' for line in lines)
+
+    @pytest.mark.parametrize("query", ["after_id=abc", "limit=1.5", "limit=0", "format=xml", "columns=nope"])
+    def test_3_invalid_parameters(self, client, query):
+        response = client.get(f'/api/export?{query}')
+
+        assert response.status_code == 400
+
+    def test_4_empty_csv_keeps_header(self, client):
+        response = client.get('/api/export?format=csv&country=Atlantis&columns=Observation ID,Sex')
+
+        assert response.status_code == 200
+        assert response.get_data(as_text=True) == 'Observation ID,Sex\n'
+
+
+class TestRateLimit:
+
+    def test_1_rotating_forwarded_for_does_not_bypass_limit(self, client, webapp, monkeypatch):
+        monkeypatch.setattr(webapp, 'RATE_LIMIT_CAPACITY', 3)
+        monkeypatch.setattr(webapp, 'RATE_LIMIT_REFILL_PER_SEC', 0.001)
+
+        statuses = [client.get('/api/basic-info', headers={'X-Forwarded-For': f'10.0.0.{i}'}).status_code
+                    for i in range(5)]
+        assert statuses == [200, 200, 200, 429, 429]
+
+    def test_2_retry_after_header(self, client, webapp, monkeypatch):
+        monkeypatch.setattr(webapp, 'RATE_LIMIT_CAPACITY', 1)
+        monkeypatch.setattr(webapp, 'RATE_LIMIT_REFILL_PER_SEC', 0.5)
+
+        client.get('/api/species-count')
+        response = client.get('/api/species-count')
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+
+    def test_3_limit_is_per_route(self, client, webapp, monkeypatch):
+        monkeypatch.setattr(webapp, 'RATE_LIMIT_CAPACITY', 1)
+        monkeypatch.setattr(webapp, 'RATE_LIMIT_REFILL_PER_SEC', 0.001)
+
+        assert client.get('/api/basic-info').status_code == 200
+        assert client.get('/api/species-count').status_code == 200
+        assert client.get('/api/basic-info').status_code == 429
+
+    def test_4_compute_saturated_returns_503(self, client, webapp, monkeypatch):
+        monkeypatch.setattr(webapp, 'COMPUTE_CONCURRENCY', 0)
+        monkeypatch.setattr(webapp, 'COMPUTE_QUEUE_DEPTH', 0)
+
+        response = client.get('/api/basic-info')
+        assert response.status_code == 503
+        assert 'Retry-After' in response.headers
+
+    def test_5_export_goes_through_admission(self, client, webapp, monkeypatch):
+        monkeypatch.setattr(webapp, 'COMPUTE_CONCURRENCY', 0)
+        monkeypatch.setattr(webapp, 'COMPUTE_QUEUE_DEPTH', 0)
+
+        response = client.get('/api/export?format=csv&country=Belize')
+        assert response.status_code == 503
+        assert 'Retry-After' in response.headers
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
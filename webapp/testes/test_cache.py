@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import time
+import pytest
+from cache import LocalCache
+
+
+class TestLocalCache:
+
+    def test_1_get_and_set(self):
+        cache = LocalCache(max_bytes=1000)
+        cache.set('a', {'x': 1}, size=10, cost=0.1, ttl=60)
+
+        assert cache.get('a') == {'x': 1}
+        assert cache.get('b') is None
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_2_entry_expires_after_ttl(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+        cache = LocalCache(max_bytes=1000)
+        cache.set('a', 1, size=10, cost=0.1, ttl=5)
+
+        now[0] += 4
+        assert cache.get('a') == 1
+        now[0] += 2
+        assert cache.get('a') is None
+        assert cache.stats()['bytes_used'] == 0
+
+    def test_3_gdsf_evicts_cheap_large_entries_first(self):
+        cache = LocalCache(max_bytes=100)
+        cache.set('caro_pequeno', 1, size=10, cost=1.0, ttl=60)
+        cache.set('barato_grande', 2, size=60, cost=0.001, ttl=60)
+        cache.set('novo', 3, size=40, cost=0.5, ttl=60)
+
+        assert cache.get('barato_grande') is None
+        assert cache.get('caro_pequeno') == 1
+        assert cache.get('novo') == 3
+        assert cache.stats()['evictions'] == 1
+
+    def test_4_frequency_protects_hot_entries(self):
+        cache = LocalCache(max_bytes=100, max_entries=2)
+        cache.set('quente', 1, size=10, cost=0.1, ttl=60)
+        cache.set('frio', 2, size=10, cost=0.1, ttl=60)
+        for _ in range(5):
+            cache.get('quente')
+        cache.set('novo', 3, size=10, cost=0.1, ttl=60)
+
+        assert cache.get('quente') == 1
+        assert cache.get('frio') is None
+
+    def test_5_heap_stays_bounded_under_hits(self):
+        cache = LocalCache(max_bytes=1000)
+        cache.set('a', 1, size=10, cost=0.1, ttl=60)
+        for _ in range(100000):
+            cache.get('a')
+
+        assert len(cache.heap) <= 4 * len(cache.entries) + 65
+
+    def test_6_oversized_and_zero_ttl_are_not_stored(self):
+        cache = LocalCache(max_bytes=100)
+        cache.set('grande', 1, size=101, cost=1.0, ttl=60)
+        cache.set('sem_ttl', 2, size=10, cost=1.0, ttl=0)
+
+        assert cache.stats()['entries'] == 0
+
+    def test_7_delete_prefix(self):
+        cache = LocalCache(max_bytes=1000)
+        cache.set('v1:a', 1, size=10, cost=0.1, ttl=60)
+        cache.set('v1:b', 2, size=10, cost=0.1, ttl=60)
+        cache.set('v2:a', 3, size=10, cost=0.1, ttl=60)
+        cache.delete_prefix('v1:')
+
+        assert cache.get('v1:a') is None
+        assert cache.get('v2:a') == 3
+        assert cache.stats()['bytes_used'] == 10
+
+
+class TestCostTTL:
+
+    def test_1_ttl_follows_cost_per_byte(self, webapp, monkeypatch):
+        monkeypatch.setattr(webapp, 'CACHE_TTL_JITTER', 0)
+        reference = webapp.cost_ttl(webapp.CACHE_TTL_REF_COST, webapp.CACHE_TTL_REF_BYTES)
+
+        assert reference == webapp.CACHE_TTL
+        assert webapp.cost_ttl(0.04, webapp.CACHE_TTL_REF_BYTES) == min(2 * webapp.CACHE_TTL, webapp.CACHE_TTL_MAX)
+        assert webapp.cost_ttl(1e-6, 10 ** 7) == webapp.CACHE_TTL_MIN
+        assert webapp.cost_ttl(100, 1) == webapp.CACHE_TTL_MAX
+
+    def test_2_computed_entries_use_cost_ttl(self, webapp, client, monkeypatch):
+        monkeypatch.setattr(webapp, 'cost_ttl', lambda cost, size: 1234)
+        client.get('/api/basic-info')
+
+        assert 1200 <= webapp.cache_r.ttl(webapp.make_cache_key('basic_info')) <= 1234
+
+    def test_3_jitter_stays_within_bounds(self, webapp, monkeypatch):
+        monkeypatch.setattr(webapp, 'CACHE_TTL_JITTER', 0.1)
+        expensive = {webapp.cost_ttl(100, 1) for _ in range(200)}
+        cheap = {webapp.cost_ttl(1e-6, 10 ** 7) for _ in range(200)}
+
+        assert max(expensive) <= webapp.CACHE_TTL_MAX
+        assert min(cheap) >= webapp.CACHE_TTL_MIN
+        # Continua havendo jitter no teto, para as chaves não expirarem juntas
+        assert len(expensive) > 1
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+import json
+import pytest
+from codec import COMPRESSORS, FORMAT_VERSION, HEADER_SIZE, MAGIC, SERIALIZERS, CacheCodec
+
+
+VALUE = {'species': {'Nile Crocodile': 120, 'Cuban Crocodile': 7}, 'mean_length': 2.51, 'notes': ['a' * 50] * 40}
+
+
+def make_codec(serializer, compression, min_compress_bytes=1024):
+    try:
+        return CacheCodec(serializer, compression, min_compress_bytes)
+    except RuntimeError as e:
+        pytest.skip(str(e))
+
+
+class TestCacheCodec:
+
+    @pytest.mark.parametrize("serializer", list(SERIALIZERS))
+    @pytest.mark.parametrize("compression", list(COMPRESSORS))
+    def test_1_round_trip_and_header(self, serializer, compression):
+        codec = make_codec(serializer, compression)
+        entry, size = codec.encode(VALUE)
+
+        assert entry[:len(MAGIC)] == MAGIC
+        assert entry[len(MAGIC)] == FORMAT_VERSION
+        assert entry[len(MAGIC) + 1] == SERIALIZERS[serializer][0]
+        assert entry[len(MAGIC) + 2] in (COMPRESSORS[compression][0], COMPRESSORS['none'][0])
+        assert codec.decode(entry) == (VALUE, size)
+
+    def test_2_small_payloads_are_not_compressed(self):
+        codec = make_codec('json', 'zlib', min_compress_bytes=1024)
+        small, _ = codec.encode({'x': 1})
+        large, size = codec.encode(VALUE)
+
+        assert small[HEADER_SIZE - 1] == COMPRESSORS['none'][0]
+        assert large[HEADER_SIZE - 1] == COMPRESSORS['zlib'][0]
+        assert len(large) < size
+        assert codec.stats()['compressed'] == 1
+
+    def test_3_legacy_json_entries(self):
+        codec = make_codec('json', 'zlib')
+        legacy = json.dumps(VALUE)
+
+        assert codec.decode(legacy.encode('utf-8'))[0] == VALUE
+        assert codec.decode(legacy)[0] == VALUE
+        assert codec.stats()['legacy_decoded'] == 2
+
+    def test_4_entries_readable_after_config_change(self):
+        writer = make_codec('json', 'zlib', min_compress_bytes=0)
+        reader = make_codec('json', 'none')
+        entry, size = writer.encode(VALUE)
+
+        assert reader.decode(entry) == (VALUE, size)
+
+    def test_5_unknown_version_and_codes(self):
+        codec = make_codec('json', 'none')
+        entry, _ = codec.encode(VALUE)
+
+        with pytest.raises(ValueError):
+            codec.decode(MAGIC + bytes([FORMAT_VERSION + 1]) + entry[len(MAGIC) + 1:])
+        with pytest.raises(ValueError):
+            codec.decode(MAGIC + bytes([FORMAT_VERSION, 99, 0]) + entry[HEADER_SIZE:])
+        with pytest.raises(RuntimeError):
+            CacheCodec('pickle')
+
+    def test_6_stats(self):
+        codec = make_codec('json', 'zlib', min_compress_bytes=0)
+        entry, size = codec.encode(VALUE)
+        codec.decode(entry)
+        stats = codec.stats()
+
+        assert stats['serializer'] == 'json'
+        assert stats['compression'] == 'zlib'
+        assert stats['encoded'] == stats['decoded'] == 1
+        assert stats['serialized_bytes'] == size
+        assert stats['stored_bytes'] == len(entry)
+        assert stats['compression_ratio'] == round(len(entry) / size, 4)
+
+
+class TestCacheStatsCodec:
+
+    def test_1_cache_stats_reports_codec(self, client, webapp):
+        before = client.get('/api/cache-stats').get_json()['codec']
+        client.get('/api/basic-info')
+        webapp.l1.clear()
+        client.get('/api/basic-info')
+        codec = client.get('/api/cache-stats').get_json()['codec']
+
+        assert codec['serializer'] == webapp.cache_codec.serializer
+        assert codec['format_version'] == FORMAT_VERSION
+        assert codec['encoded'] == before['encoded'] + 1
+        assert codec['decoded'] == before['decoded'] + 1
+        assert codec['stored_bytes'] > before['stored_bytes']
+
+    def test_2_legacy_entry_in_redis_is_served(self, client, webapp):
+        expected = client.get('/api/basic-info').get_json()
+        webapp.l1.clear()
+        webapp.cache_r.set(webapp.make_cache_key('basic_info'), json.dumps(expected))
+        before = webapp.cache_codec.stats()['legacy_decoded']
+
+        assert client.get('/api/basic-info').get_json() == expected
+        assert client.get('/api/cache-stats').get_json()['codec']['legacy_decoded'] == before + 1
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import pandas as pd
+import pytest
+from rollups import CalendarRollups
+
+
+@pytest.fixture
+def observations():
+    """Oito observações em 2019-2021; uma sem data e uma sem peso"""
+    return pd.DataFrame({
+        'Date of Observation': ['05-01-2019', '20-01-2019', '03-02-2019', '15-07-2020',
+                                '01-12-2020', '10-03-2021', 'sem data', '28-02-2021'],
+        'Observed Length (m)': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0],
+        'Observed Weight (kg)': [10.0, 20.0, 30.0, 40.0, None, 60.0, 70.0, 80.0],
+        'Common Name': ['Alpha', 'Beta', 'Alpha', 'Alpha', 'Beta', 'Alpha', 'Alpha', 'Beta'],
+        'Country/Region': ['Cuba'] * 4 + ['Belize'] * 4,
+        'Conservation Status': ['Vulnerable'] * 8,
+    })
+
+
+def brute_force(data, start=None, end=None, species=None):
+    """Contagem e média do comprimento recalculadas direto das linhas"""
+    dates = pd.to_datetime(data['Date of Observation'], format='%d-%m-%Y', errors='coerce')
+    mask = dates.notna()
+    if start is not None:
+        mask &= dates >= start
+    if end is not None:
+        mask &= dates <= end
+    if species is not None:
+        mask &= data['Common Name'] == species
+    return int(mask.sum()), data.loc[mask, 'Observed Length (m)'].mean()
+
+
+class TestCalendarRollups:
+
+    def test_1_points_per_period(self, observations):
+        rollups = CalendarRollups(observations)
+        result = rollups.query('month')
+
+        assert [point['period'] for point in result['points']] == [
+            '2019-01', '2019-02', '2020-07', '2020-12', '2021-02', '2021-03']
+        assert [point['count'] for point in result['points']] == [2, 1, 1, 1, 1, 1]
+        assert result['points'][0]['length'] == {'n': 2, 'mean': 1.5, 'std': 0.71}
+        assert rollups.total_rows == 8
+        assert rollups.dated_rows == 7
+
+    @pytest.mark.parametrize("start,end", [
+        (None, None),
+        ('2019-01-10', None),
+        (None, '2020-07-15'),
+        ('2019-02-01', '2021-02-28'),
+        ('2020-08-01', '2020-11-30'),
+    ])
+    def test_2_range_totals_match_brute_force(self, observations, start, end):
+        rollups = CalendarRollups(observations)
+        start = pd.Timestamp(start) if start else None
+        end = pd.Timestamp(end) if end else None
+
+        totals = rollups.query('day', start, end)['totals']
+        count, mean = brute_force(observations, start, end)
+        assert totals['count'] == count
+        if count:
+            assert totals['length']['mean'] == pytest.approx(round(mean, 2))
+        else:
+            assert totals['length'] == {'n': 0, 'mean': None, 'std': None}
+
+    def test_3_range_is_extended_to_whole_periods(self, observations):
+        rollups = CalendarRollups(observations)
+
+        # 2019-01-20 está no mesmo mês de 2019-01-05: o mês inteiro entra
+        result = rollups.query('month', pd.Timestamp('2019-01-20'), pd.Timestamp('2019-02-01'))
+        assert result['totals']['count'] == 3
+        result = rollups.query('year', pd.Timestamp('2020-12-31'), pd.Timestamp('2020-12-31'))
+        assert result['totals']['count'] == 2
+
+    def test_4_cumulative_sums_match_moments(self, observations):
+        rollups = CalendarRollups(observations)
+
+        for series in rollups.series.values():
+            assert np.allclose(np.diff(series['cumulative'], axis=0), series['moments'])
+
+    def test_5_dimension_series_and_missing_measure(self, observations):
+        rollups = CalendarRollups(observations)
+        totals = rollups.query('year', dimension='species', value='Beta')['totals']
+
+        assert rollups.values('species') == ['Alpha', 'Beta']
+        assert totals['count'] == brute_force(observations, species='Beta')[0] == 3
+        # O peso ausente de 2020-12-01 não entra na média do peso
+        assert totals['weight']['n'] == 2
+        assert totals['weight']['mean'] == 50.0
+
+    def test_6_unknown_value_is_empty(self, observations):
+        result = CalendarRollups(observations).query('month', dimension='country', value='Brasil')
+
+        assert result['points'] == []
+        assert result['totals']['count'] == 0
+
+
+class TestTimeseriesAPI:
+
+    def test_1_year_totals_cover_dated_rows(self, client, webapp):
+        result = client.get('/api/timeseries?resolution=year').get_json()
+
+        assert result['resolution'] == 'year'
+        assert result['totals']['count'] == webapp.rollups.dated_rows
+        assert sum(point['count'] for point in result['points']) == result['totals']['count']
+
+    def test_2_range_matches_dataset(self, client, webapp):
+        result = client.get('/api/timeseries?resolution=day&start=2015-01-01&end=2016-12-31').get_json()
+        count, mean = brute_force(webapp.df, pd.Timestamp('2015-01-01'), pd.Timestamp('2016-12-31'))
+
+        assert result['totals']['count'] == count
+        assert result['totals']['length']['mean'] == pytest.approx(round(mean, 2))
+
+    def test_3_filter_and_group_by(self, client, webapp):
+        name = webapp.rollups.values('species')[0]
+        filtered = client.get('/api/timeseries', query_string={'resolution': 'year', 'species': name}).get_json()
+        grouped = client.get('/api/timeseries?resolution=year&group_by=species').get_json()
+
+        assert filtered['filters'] == {'species': name}
+        assert grouped['series'][name]['totals'] == filtered['totals']
+        assert sum(series['totals']['count'] for series in grouped['series'].values()) == webapp.rollups.dated_rows
+
+    @pytest.mark.parametrize("query", [
+        'resolution=week',
+        'start=2015-13-01',
+        'start=2016-01-01&end=2015-01-01',
+        'species=Alpha&country=Cuba',
+        'group_by=species&country=Cuba',
+        'group_by=habitat',
+    ])
+    def test_4_invalid_parameters(self, client, query):
+        response = client.get(f'/api/timeseries?{query}')
+
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
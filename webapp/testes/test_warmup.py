@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def small_dataset(webapp, client, tmp_path, monkeypatch):
+    """Troca o dataset por um recorte de 20 linhas e restaura o original no fim"""
+    csv_file = tmp_path / "small.csv"
+    webapp.df.head(20).to_csv(csv_file, index=False)
+    original = webapp.DATASET_PATH
+    monkeypatch.setattr(webapp, 'DATASET_PATH', str(csv_file))
+    yield str(csv_file)
+    webapp.DATASET_PATH = original
+    webapp.reload_dataset()
+
+
+class TestWarmup:
+
+    def test_1_warm_cache_fills_redis(self, webapp, client, monkeypatch):
+        monkeypatch.setattr(webapp, 'warmup_filter_combinations', lambda data: [{}, {'country': 'Belize'}])
+
+        assert webapp.warm_cache() is True
+        assert webapp.warmup_status['state'] == 'done'
+        assert webapp.cache_r.exists(webapp.make_cache_key('basic_info'))
+        assert webapp.cache_r.exists(webapp.make_cache_key('species_count', {'country': 'Belize'}))
+
+    def test_2_running_warmup_is_not_duplicated(self, webapp, client):
+        with webapp.warmup_lock:
+            assert webapp.warm_cache() is False
+
+    def test_3_reload_cancels_warmup_of_old_version(self, webapp, client, monkeypatch):
+        monkeypatch.setattr(webapp, 'WARMUP_WORKERS', 1)
+        monkeypatch.setattr(webapp, 'warmup_filter_combinations',
+                            lambda data: [{}, {'country': 'Belize'}, {'country': 'Cuba'}])
+        old_version = webapp.dataset_version
+        warm_filters = webapp.warm_filters
+
+        def warm_then_reload(data, version, filters):
+            warm_filters(data, version, filters)
+            # Simula um reload concorrente após a primeira combinação
+            monkeypatch.setattr(webapp, 'dataset_version', 'nova-versao')
+
+        monkeypatch.setattr(webapp, 'warm_filters', warm_then_reload)
+        webapp.warm_cache()
+
+        assert webapp.warmup_status['state'] == 'cancelled'
+        assert webapp.warmup_status['completed'] == len(webapp.REPORTS)
+        keys = [key.decode() for key in webapp.cache_r.keys('*')]
+        assert keys and all(key.startswith(f'{old_version}:') for key in keys)
+
+    def test_4_reload_swaps_dataset_and_version(self, webapp, client, small_dataset):
+        assert client.get('/api/basic-info').get_json()['total_observations'] > 20
+        old_version = webapp.dataset_version
+
+        webapp.reload_dataset()
+        assert webapp.dataset_version != old_version
+        assert len(webapp.df) == len(pd.read_csv(small_dataset))
+        assert client.get('/api/basic-info').get_json()['total_observations'] == 20
+
+    def test_5_warmed_keys_outlive_refresh_interval(self, webapp, client, monkeypatch):
+        monkeypatch.setattr(webapp, 'warmup_filter_combinations', lambda data: [{}])
+        monkeypatch.setattr(webapp, 'cost_ttl', lambda cost, size: webapp.CACHE_TTL_MIN)
+        webapp.warm_cache()
+
+        floor = webapp.WARMUP_REFRESH_INTERVAL + webapp.DATASET_CHECK_INTERVAL
+        ttls = [webapp.cache_r.ttl(webapp.make_cache_key(name)) for name in webapp.REPORTS]
+        assert min(ttls) >= floor
+        assert webapp.warmup_status['duration_seconds'] is not None
+
+    def test_6_computed_keys_keep_cost_ttl(self, webapp, client, monkeypatch):
+        monkeypatch.setattr(webapp, 'cost_ttl', lambda cost, size: webapp.CACHE_TTL_MIN)
+        client.get('/api/basic-info')
+
+        assert webapp.cache_r.ttl(webapp.make_cache_key('basic_info')) <= webapp.CACHE_TTL_MIN
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])